@@ -0,0 +1,224 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+from app.core.metrics import Counter, GaugeFunc
+
+# Controle de admissão: roda antes do roteamento (e portanto antes de get_db), sem tocar no banco.
+# Cada processo do uvicorn tem os próprios baldes e a própria medida de pressão do pool.
+
+CHEAP, EXPENSIVE = "cheap", "expensive"
+
+# Rotas cujo custo cresce com o histórico do usuário ou com o payload: relatórios, séries, export/import, lotes
+# e o dashboard (que inclui dois relatórios)
+EXPENSIVE_PATHS = (
+    "/expenses/summary", "/expenses/analytics", "/expenses/export", "/expenses/import", "/expenses/batch",
+    "/dashboard",
+)
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requisições recusadas pelo controle de admissão.", ("reason", "class")
+)
+
+def route_class(path: str) -> str:
+    return EXPENSIVE if path.startswith(EXPENSIVE_PATHS) else CHEAP
+
+# ===== Token buckets =====
+
+class TokenBuckets:
+    """Um token bucket por chave (usuário ou IP): `rate` tokens/s, até `burst` acumulados.
+
+    LRU limitado a `max_keys`; uma chave descartada volta com o balde cheio, o que só afrouxa o limite.
+    Usado só no loop de eventos (sem trava).
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """Consome um token; retorna 0 se admitido, senão os segundos até haver um token."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+# ===== Pressão no pool de conexões =====
+
+class _WatchedPool:
+    __slots__ = ("capacity", "in_use", "full_since", "freed_at")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self.full_since: Optional[float] = None
+        self.freed_at: Optional[float] = None
+
+class PoolPressure:
+    """Há quanto tempo os pools observados estão esgotados, em segundos: quem pede conexão nesse intervalo espera.
+
+    Vale a maior entre a média móvel exponencial dos períodos esgotados já encerrados (que decai pela metade a
+    cada `half_life` segundos) e o período em curso mais antigo: com o pool esgotado, a pressão sobe mesmo antes
+    de alguma conexão voltar. Acompanha as conexões em uso pelos eventos públicos `checkout`/`checkin`; uma
+    conexão devolvida e retomada em até `handoff` segundos (por quem esperava) não encerra o período.
+    """
+
+    def __init__(self, alpha: float = 0.2, half_life: float = 1.0, handoff: float = 0.05):
+        self.alpha = alpha
+        self.half_life = half_life
+        self.handoff = handoff
+        self._lock = threading.Lock()
+        self._pools: List[_WatchedPool] = []
+        self._average = 0.0
+        self._updated = time.monotonic()
+
+    def _decayed(self, now: float) -> float:
+        return self._average * 0.5 ** ((now - self._updated) / self.half_life)
+
+    def _observe(self, duration: float, now: float) -> None:
+        average = self._decayed(now)
+        self._average = average + self.alpha * (duration - average)
+        self._updated = now
+
+    def _end_full(self, pool: _WatchedPool, now: float) -> None:
+        self._observe(pool.freed_at - pool.full_since, now)
+        pool.full_since = pool.freed_at = None
+
+    def _checkout(self, pool: _WatchedPool) -> None:
+        with self._lock:
+            now = time.monotonic()
+            pool.in_use += 1
+            if pool.in_use >= pool.capacity:
+                if pool.full_since is None:
+                    pool.full_since = now
+                pool.freed_at = None
+            elif pool.full_since is not None:
+                self._end_full(pool, now)
+
+    def _checkin(self, pool: _WatchedPool) -> None:
+        with self._lock:
+            pool.in_use -= 1
+            if pool.full_since is not None and pool.in_use < pool.capacity and pool.freed_at is None:
+                pool.freed_at = time.monotonic()
+
+    def current(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            oldest = now
+            for pool in self._pools:
+                if pool.freed_at is not None and now - pool.freed_at >= self.handoff:
+                    self._end_full(pool, now)  # ninguém retomou a conexão devolvida: ninguém esperava
+                elif pool.full_since is not None:
+                    oldest = min(oldest, pool.full_since)
+            return max(self._decayed(now), now - oldest)
+
+    def watch(self, engine: Engine) -> None:
+        """Observa o pool da engine (para engines async, `.sync_engine`). Sem limite de conexões, ninguém espera."""
+        pool = engine.pool
+        max_overflow = settings.DB_MAX_OVERFLOW  # o mesmo de pool_options; QueuePool não o expõe
+        if not isinstance(pool, QueuePool) or max_overflow < 0:
+            return
+        watched = _WatchedPool(pool.size() + max_overflow)
+        self._pools.append(watched)
+        event.listen(engine, "checkout", lambda dbapi_connection, record, proxy: self._checkout(watched))
+        event.listen(engine, "checkin", lambda dbapi_connection, record: self._checkin(watched))
+
+pool_pressure = PoolPressure()
+
+GaugeFunc(
+    "admission_pool_wait_seconds", "Tempo recente com o pool esgotado usado no descarte de carga.", (),
+    lambda: {(): pool_pressure.current()},
+)
+
+# ===== Middleware =====
+
+def client_key(scope) -> str:
+    """Usuário do token (verificado: uma chave forjada não pode esgotar o balde de outro) ou IP do cliente."""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+                except JWTError:
+                    break
+                subject = payload.get("uid") or payload.get("sub")
+                if subject is not None:
+                    return f"user:{subject}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else '-'}"
+
+class AdmissionMiddleware:
+    """Middleware ASGI: recusa cedo, com `Retry-After`, o que o pool de conexões não vai atender a tempo.
+
+    1. Descarte de carga (503): com o pool esgotado há mais de `pool_wait_ms`, rotas caras são recusadas;
+       as baratas só acima do dobro.
+    2. Cota por cliente (429): token buckets separados para rotas baratas e caras.
+    """
+
+    def __init__(
+        self,
+        app,
+        cheap: Tuple[float, int] = (settings.ADMISSION_CHEAP_RATE, settings.ADMISSION_CHEAP_BURST),
+        expensive: Tuple[float, int] = (settings.ADMISSION_EXPENSIVE_RATE, settings.ADMISSION_EXPENSIVE_BURST),
+        pool_wait_ms: float = settings.ADMISSION_POOL_WAIT_MS,
+        pressure: PoolPressure = pool_pressure,
+        skip_paths: Sequence[str] = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json"),
+    ):
+        self.app = app
+        self.buckets = {CHEAP: TokenBuckets(*cheap), EXPENSIVE: TokenBuckets(*expensive)}
+        self.pool_wait = pool_wait_ms / 1000
+        self.pressure = pressure
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        kind = route_class(scope["path"])
+        if self.pool_wait > 0:
+            wait = self.pressure.current()
+            if wait > (self.pool_wait if kind == EXPENSIVE else 2 * self.pool_wait):
+                ADMISSION_REJECTED.inc("overload", kind)
+                await _reject(send, 503, "Service overloaded, retry later", wait)
+                return
+        retry_after = self.buckets[kind].take(client_key(scope))
+        if retry_after:
+            ADMISSION_REJECTED.inc("rate_limit", kind)
+            await _reject(send, 429, "Too many requests", retry_after)
+            return
+        await self.app(scope, receive, send)
+
+async def _reject(send, status_code: int, detail: str, retry_after: float) -> None:
+    body = b'{"detail":"' + detail.encode() + b'"}'
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
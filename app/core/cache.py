@@ -0,0 +1,168 @@
+import importlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import versions
+from app.db.models import Category, Expense
+
+# ===== Backends =====
+
+class CacheBackend(ABC):
+    """Interface de armazenamento do cache de relatórios.
+
+    Um backend compartilhado (ex.: Redis) implementa `get` e `set` e é configurado em
+    REPORT_CACHE_BACKEND como "pacote.modulo:Classe"; um `__init__` próprio chama o desta classe.
+    As chaves já trazem a versão persistida do usuário (user_versions), então o backend não precisa
+    de invalidação. `lock` protege o estado do backend e os contadores do ReportCache que o usa: o
+    mesmo cache é lido ao mesmo tempo por várias threads (requisições e seções do /dashboard).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+class NullBackend(CacheBackend):
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+class MemoryLRUBackend(CacheBackend):
+    """LRU em processo, limitado por número de entradas e por bytes armazenados."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._bytes += len(value)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+
+    def _drop(self, key):
+        _, value = self._data.pop(key)
+        self._bytes -= len(value)
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self._data), "bytes": self._bytes}
+
+def _load_backend(spec: str) -> CacheBackend:
+    if spec == "memory":
+        return MemoryLRUBackend(settings.REPORT_CACHE_MAX_ENTRIES, settings.REPORT_CACHE_MAX_BYTES)
+    if spec == "none":
+        return NullBackend()
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+# ===== Cache versionado =====
+
+class ReportCache:
+    """Cache de resultados de relatórios com chave (user_id, versão dos dados, parâmetros).
+
+    A versão é a de user_versions (app.db.versions), que toda escrita de despesa/categoria sobe na
+    própria transação: entradas antigas deixam de ser lidas (e saem pelo LRU/TTL) sem varredura de
+    invalidação, em todas as instâncias da API, também depois de uma movimentação entre shards.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, user_id: int, version: int, name: str, params: Dict[str, Any]) -> str:
+        # `version` vem da mesma transação que lê o relatório: dados e versão são do mesmo snapshot
+        return f"report:{user_id}:{version}:{name}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.backend.get(key)
+        with self.backend.lock:
+            if raw is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any) -> Any:
+        self.backend.set(key, json.dumps(value, default=str).encode(), self.ttl)
+        return value
+
+    def stats(self) -> Dict[str, float]:
+        with self.backend.lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0, **self.backend.stats()}
+
+report_cache = ReportCache(_load_backend(settings.REPORT_CACHE_BACKEND), settings.REPORT_CACHE_TTL_SECONDS)
+
+# ===== Versão por usuário =====
+
+_DIRTY_KEY = "report_cache_dirty_users"
+
+def mark_user_dirty(session: Session, user_id: int) -> None:
+    """Agenda o bump da versão do usuário no próximo commit da sessão (escritas fora do ORM)."""
+    session.info.setdefault(_DIRTY_KEY, set()).add(user_id)
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_users(session: Session, flush_context) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Expense, Category)):
+            mark_user_dirty(session, obj.user_id)
+
+# A versão persistida (ETags e chaves do cache) sobe dentro da própria transação: fica visível junto com os
+# dados que ela cobre.
+@event.listens_for(Session, "before_commit")
+def _bump_user_versions(session: Session) -> None:
+    session.flush()  # o after_flush acima precisa ter visto todos os objetos alterados
+    users = session.info.get(_DIRTY_KEY, set()) - session.info.get(versions.BUMPED_KEY, set())
+    if users:
+        versions.bump(session.connection(), users)
+
+@event.listens_for(Session, "after_commit")
+def _clear_dirty_users(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(versions.BUMPED_KEY, None)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_users(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(versions.BUMPED_KEY, None)
@@ -1,14 +1,99 @@
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Modo assíncrono: engine/sessões async e routers async (aiomysql / aiosqlite)
+    ASYNC_DB: bool = False
+    # Se omitido, é derivado de DATABASE_URL (mysql+pymysql -> mysql+aiomysql, sqlite -> sqlite+aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Pool de conexões de cada engine (primário, async e réplicas): conexões fixas, extras sob pico
+    # e espera máxima por uma conexão antes de responder 503
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    # Réplicas de leitura (lista JSON de URLs); vazia = tudo no primário
+    DATABASE_REPLICA_URLS: List[str] = []
+    # "round_robin" ou "least_connections"
+    REPLICA_POLICY: str = "round_robin"
+    REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    # Após uma escrita, as leituras do usuário ficam no primário por esta janela (deve superar o lag das réplicas)
+    REPLICA_STICKY_SECONDS: float = 5.0
+    # Shards adicionais (lista JSON de URLs, shards 1..N); o shard 0 é DATABASE_URL, que guarda também as tabelas
+    # globais (users, o diretório user_shards e fx_rates). Vazia = um único banco
+    DATABASE_SHARD_URLS: List[str] = []
+    # Por quanto tempo cada processo guarda o shard de um usuário; a movimentação espera o dobro entre as fases
+    SHARD_DIRECTORY_TTL_SECONDS: float = 10.0
+    SHARD_MOVE_BATCH_SIZE: int = 1000
+    # Ids reservados de cada vez do contador global (id_sequences) por processo e tabela
+    SHARD_ID_BLOCK_SIZE: int = 100
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Cache de usuários autenticados em get_current_user (0 desativa)
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    # bcrypt: custo (log2 de rounds) e pool de processos dedicado (0 workers = inline)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
 
     APP_NAME: str = "Expense API"
     APP_VERSION: str = "0.1.0"
 
+    # Importação em massa: linhas por lote (um INSERT multi-linha + commit por lote)
+    IMPORT_BATCH_SIZE: int = 1000
+    # Coalescência de escritas (opt-in por rota; hoje "create_expense"): criações concorrentes viram um INSERT
+    # multi-linha + um commit por janela. JSON {"create_expense": {"window_ms": 5, "max_rows": 500,
+    # "durability": "full" | "relaxed"}}; vazio = uma transação por requisição. Acima de
+    # WRITE_COALESCING_MAX_PENDING linhas na fila, a rota responde 503
+    WRITE_COALESCING: Dict[str, Dict[str, Any]] = {}
+    WRITE_COALESCING_MAX_PENDING: int = 10000
+    # Exportação em streaming: linhas buscadas por vez no cursor do servidor
+    EXPORT_YIELD_PER: int = 1000
+    # GET /dashboard: threads que rodam as seções em paralelo, cada uma com a própria conexão do pool
+    # (modo síncrono; 0 = uma após a outra na sessão da requisição)
+    DASHBOARD_WORKERS: int = 16
+
+    # Cache de relatórios: "memory", "none" ou "pacote.modulo:Classe" (backend compartilhado)
+    REPORT_CACHE_BACKEND: str = "memory"
+    REPORT_CACHE_MAX_ENTRIES: int = 10000
+    REPORT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    REPORT_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Despesas recorrentes: intervalo do agendador em processo (0 desativa), recorrências por lote
+    # e ocorrências atrasadas lançadas por recorrência em cada lote (limita o tamanho de cada transação)
+    RECURRING_SCHEDULER_SECONDS: float = 60.0
+    RECURRING_BATCH_SIZE: int = 1000
+    RECURRING_MAX_CATCH_UP: int = 120
+
+    # Orçamentos: limiares (% do limite) que geram eventos em /budgets/events ao serem ultrapassados
+    BUDGET_ALERT_THRESHOLDS: List[int] = [80, 100]
+
+    # Arquivamento: despesas de meses anteriores a ARCHIVE_AFTER_MONTHS meses atrás vão para expenses_archive,
+    # em transações de ARCHIVE_BATCH_SIZE linhas
+    ARCHIVE_AFTER_MONTHS: int = 18
+    ARCHIVE_BATCH_SIZE: int = 1000
+
+    # Câmbio (tabela fx_rates): moeda de referência das cotações e recarga do cache em memória
+    FX_REFERENCE_CURRENCY: str = "BRL"
+    FX_CACHE_TTL_SECONDS: float = 300.0
+
+    # Controle de admissão: token bucket por usuário (ou IP) para rotas baratas e caras (relatórios, séries,
+    # export/import, lotes), em req/s e rajada (taxa 0 desativa); com o pool esgotado há mais de
+    # ADMISSION_POOL_WAIT_MS (0 desativa), rotas caras recebem 503 (as baratas acima do dobro). Desligado por
+    # padrão: a cota por usuário muda o contrato da API (429/503) e deve ser ligada conscientemente
+    ADMISSION_ENABLED: bool = False
+    ADMISSION_CHEAP_RATE: float = 20.0
+    ADMISSION_CHEAP_BURST: int = 40
+    ADMISSION_EXPENSIVE_RATE: float = 2.0
+    ADMISSION_EXPENSIVE_BURST: int = 10
+    ADMISSION_POOL_WAIT_MS: float = 200.0
+
+    # Observabilidade: /metrics (Prometheus) e log de queries lentas (None desativa)
+    METRICS_ENABLED: bool = True
+    SLOW_QUERY_MS: Optional[float] = None
+
     class Config:
         env_file = ".env"
         case_sensitive = True
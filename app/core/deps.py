@@ -1,38 +1,103 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+import math
+from typing import AsyncGenerator, Generator, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.db.engine import get_session
+from app.core.principals import principal_cache
+from app.db.engine import get_async_session, get_session
+from app.db.replicas import SESSION_USER_KEY, async_read_session, read_session
 from app.db.models import User
+from app.db.shards import Placement, shard_router
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-# DB session dependency
-def get_db() -> Generator[Session, None, None]:
-    with get_session() as db:
-        yield db
-
-# Current user dependency
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str) -> Tuple[str, Optional[int]]:
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
         subject: str = payload.get("sub")
         if subject is None:
-            raise credentials_exception
+            raise credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise credentials_exception()
+    # Tokens antigos não têm `uid`: seguem sempre pelo banco
+    return subject, payload.get("uid")
+
+def cached_principal(subject: str, user_id: Optional[int]) -> Optional[User]:
+    if user_id is None:
+        return None
+    user = principal_cache.get(user_id)
+    if user is not None and user.email == subject:
+        return user
+    return None
+
+# DB session dependency: aberta no primário; get_current_user a religa ao shard do usuário
+def get_db() -> Generator[Session, None, None]:
+    with get_session() as db:
+        yield db
 
+def bind_user(request: Request, db, user_id: int, placement: Placement) -> None:
+    """Prende a sessão da requisição ao usuário: janela de leitura no primário (réplicas) e shard dos dados."""
+    if placement.frozen and request.method not in ("GET", "HEAD", "OPTIONS"):
+        # Dados sendo copiados para outro shard (python -m app.db.shards move): só leituras até a virada
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Account is being moved, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(settings.SHARD_DIRECTORY_TTL_SECONDS)))},
+        )
+    db.info[SESSION_USER_KEY] = user_id
+    shard_router.bind(db, placement)
 
-    user = db.query(User).filter(User.email == subject).first()
-    if not user or not user.is_active:
-        raise credentials_exception
-    return user
\ No newline at end of file
+# Current user dependency
+def get_current_user(
+    request: Request, db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
+) -> User:
+    subject, user_id = decode_token(token)
+    user = cached_principal(subject, user_id)
+    if user is None:
+        user = db.query(User).filter(User.email == subject).first()
+        if not user or not user.is_active:
+            raise credentials_exception()
+        user = principal_cache.put(user)
+    bind_user(request, db, user.id, shard_router.locate(user.id, db))
+    return user
+
+# Sessão de leitura (réplica quando configurada) para rotas que só consultam
+def get_read_db(current_user: User = Depends(get_current_user)) -> Generator[Session, None, None]:
+    with read_session(current_user.id) as db:
+        yield db
+
+# ===== Modo assíncrono (ASYNC_DB) =====
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_session() as db:
+        yield db
+
+async def get_current_user_async(
+    request: Request, db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
+) -> User:
+    subject, user_id = decode_token(token)
+    user = cached_principal(subject, user_id)
+    if user is None:
+        user = (await db.execute(select(User).where(User.email == subject))).scalars().first()
+        if not user or not user.is_active:
+            raise credentials_exception()
+        user = principal_cache.put(user)
+    bind_user(request, db, user.id, await shard_router.locate_async(user.id, db))
+    return user
+
+async def get_async_read_db(
+    current_user: User = Depends(get_current_user_async),
+) -> AsyncGenerator[AsyncSession, None]:
+    async with async_read_session(current_user.id) as db:
+        yield db
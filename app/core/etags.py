@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Set
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.deps import get_async_read_db, get_current_user, get_current_user_async, get_read_db
+from app.db import versions
+from app.db.fx import fx_cache
+from app.db.models import User
+
+# Requisições condicionais nas leituras: o ETag (fraco) vem da versão dos dados do usuário (user_versions),
+# uma leitura por chave primária. Com If-None-Match igual, a rota responde 304 antes de carregar linhas.
+# O mesmo ETag vale como If-Match no PUT: qualquer escrita do usuário desde a leitura faz a atualização falhar.
+
+def make(user_id: int, version: int, *parts: str) -> str:
+    return 'W/"' + ".".join(str(p) for p in (user_id, version, *parts)) + '"'
+
+def headers(tag: str) -> Dict[str, str]:
+    # Dados por usuário: nenhum cache compartilhado guarda; o cliente guarda, mas revalida sempre
+    return {"ETag": tag, "Cache-Control": "private, no-cache"}
+
+def tagged(response: Response, tag: str) -> Response:
+    response.headers.update(headers(tag))
+    return response
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def _listed(header: str) -> List[str]:
+    return [_opaque(t) for t in header.split(",") if t.strip()]
+
+def check_not_modified(request: Request, tag: str) -> None:
+    """304 (via HTTPException, sem corpo) quando If-None-Match traz `tag`; comparação fraca."""
+    header = request.headers.get("if-none-match")
+    if header and (header.strip() == "*" or _opaque(tag) in _listed(header)):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers(tag))
+
+def expected_versions(request: Request, user_id: int) -> Optional[Set[int]]:
+    """Versões aceitas pelo If-Match do PUT; None sem o header (ou com `*`). ETags de outro usuário ou de
+    relatórios (com partes extras) não casam com nenhuma versão."""
+    header = request.headers.get("if-match")
+    if header is None or header.strip() == "*":
+        return None
+    accepted = set()
+    for tag in _listed(header):
+        owner, _, version = tag.strip('"').partition(".")
+        if owner == str(user_id) and version.isdigit():
+            accepted.add(int(version))
+    return accepted
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Data changed since it was read (If-Match)"
+    )
+
+# ===== Dependências =====
+
+def user_etag(
+    request: Request, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user)
+) -> str:
+    """ETag das listagens e consultas por ID (despesas e categorias); 304 se o cliente já tem essa versão."""
+    tag = make(current_user.id, versions.current(db, current_user.id))
+    check_not_modified(request, tag)
+    return tag
+
+def report_etag(
+    request: Request, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_user)
+) -> str:
+    # Relatórios convertidos dependem também das cotações (como a chave do cache de relatórios)
+    parts = [fx_cache.table(db).version[:16]] if request.query_params.get("base_currency") else []
+    tag = make(current_user.id, versions.current(db, current_user.id), *parts)
+    check_not_modified(request, tag)
+    return tag
+
+async def user_etag_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+) -> str:
+    tag = make(current_user.id, await versions.current_async(db, current_user.id))
+    check_not_modified(request, tag)
+    return tag
+
+async def report_etag_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+) -> str:
+    parts = [(await db.run_sync(fx_cache.table)).version[:16]] if request.query_params.get("base_currency") else []
+    tag = make(current_user.id, await versions.current_async(db, current_user.id), *parts)
+    check_not_modified(request, tag)
+    return tag
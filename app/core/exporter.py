@@ -0,0 +1,39 @@
+import csv
+import datetime as dt
+import io
+import json
+from enum import Enum
+from typing import Any, Iterable, Iterator, Sequence
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    return value
+
+def encode_csv(columns: Sequence[str], partitions: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    """Codifica cada partição de linhas como um bloco CSV, sem acumular o resultado inteiro."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for rows in partitions:
+        for row in rows:
+            writer.writerow([_plain(v) for v in row])
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+def encode_ndjson(columns: Sequence[str], partitions: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    for rows in partitions:
+        yield "".join(
+            json.dumps({c: _plain(v) for c, v in zip(columns, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode()
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson}
@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+# Uma linha lida do arquivo: (número da linha, dados brutos ou None, erro de parsing ou None)
+RawRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in ctype:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "ndjson"
+    return None
+
+def _iter_csv(text: IO[str]) -> Iterator[RawRow]:
+    reader = csv.DictReader(text)
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            yield reader.line_num, None, f"Invalid CSV: {exc}"
+            continue
+        # Células vazias são omitidas para que os defaults de ExpenseCreate se apliquem
+        data = {k.strip(): v for k, v in record.items() if k and v not in (None, "")}
+        yield reader.line_num, data, None
+
+def _iter_ndjson(text: IO[str]) -> Iterator[RawRow]:
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield line_num, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(data, dict):
+            yield line_num, None, "Expected a JSON object"
+            continue
+        yield line_num, data, None
+
+def iter_rows(binary: IO[bytes], fmt: str) -> Iterator[RawRow]:
+    """Lê o arquivo de forma incremental (linha a linha), sem carregá-lo inteiro em memória."""
+    text = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+    try:
+        yield from (_iter_csv(text) if fmt == "csv" else _iter_ndjson(text))
+    finally:
+        text.detach()
+
+def chunked(rows: Iterator[RawRow], size: int) -> Iterator[List[RawRow]]:
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,276 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+# Métricas em processo no formato de exposição de texto do Prometheus (sem dependências externas).
+# Com vários workers do uvicorn, cada processo expõe os próprios números.
+
+slow_query_log = logging.getLogger("app.sql.slow")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+LabelValues = Tuple[str, ...]
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# ===== Tipos de métrica =====
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_value(v)}" for k, v in items
+        ]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # por label: ([contagem por bucket], soma, total)
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = self.header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="' + _fmt_value(bound if bound == float("inf") else float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class GaugeFunc(Metric):
+    """Gauge lido na hora da coleta: `fn` devolve {valores dos labels: valor}."""
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames, fn: Callable[[], Dict[LabelValues, float]]):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def render(self):
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_value(v)}" for k, v in sorted(self.fn().items())
+        ]
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._stats: List[Tuple[str, str, Callable[[], Dict[str, float]]]] = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def register_stats(self, prefix: str, help: str, fn: Callable[[], Dict[str, float]]) -> None:
+        """Expõe cada chave numérica de `fn()` (ex.: cache.stats()) como o gauge `<prefix>_<chave>`."""
+        self._stats.append((prefix, help, fn))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for prefix, help, fn in self._stats:
+            for key, value in sorted(fn().items()):
+                if isinstance(value, (int, float)):
+                    name = f"{prefix}_{key}"
+                    lines += [f"# HELP {name} {help} ({key})", f"# TYPE {name} gauge", f"{name} {_fmt_value(value)}"]
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# ===== HTTP =====
+
+HTTP_REQUESTS = Counter("http_requests_total", "Requisições HTTP atendidas.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Latência das requisições HTTP.", ("method", "route"))
+REQUEST_STATEMENTS = Histogram(
+    "http_request_db_statements", "Comandos SQL emitidos por requisição.", ("method", "route"), COUNT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram("http_request_db_seconds", "Tempo em SQL por requisição.", ("method", "route"))
+
+class RequestStats:
+    __slots__ = ("path", "statements", "db_seconds")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.statements = 0
+        self.db_seconds = 0.0
+
+# Objeto mutável por requisição: rotas síncronas rodam no threadpool com uma cópia do contexto,
+# e as mutações continuam visíveis para o middleware.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def route_label(scope) -> str:
+    # Template da rota (/expenses/{expense_id}), não o caminho bruto: cardinalidade limitada
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """Middleware ASGI: latência até o fim do corpo (inclui respostas em streaming) e SQL por requisição."""
+
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope["path"])
+        token = current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            method, route = scope["method"], route_label(scope)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_LATENCY.observe(elapsed, method, route)
+            REQUEST_STATEMENTS.observe(stats.statements, method, route)
+            REQUEST_DB_TIME.observe(stats.db_seconds, method, route)
+
+# ===== SQL e pool de conexões =====
+
+DB_STATEMENTS = Counter("db_statements_total", "Comandos SQL executados.", ("engine",))
+DB_LATENCY = Histogram("db_statement_duration_seconds", "Duração dos comandos SQL.", ("engine",))
+POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds", "Tempo com cada conexão fora do pool (checkout até checkin).", ("engine",)
+)
+POOL_CONNECTS = Counter("db_pool_connections_total", "Conexões abertas com o banco pelo pool.", ("engine",))
+
+_engines: Dict[str, Engine] = {}
+
+def _pool_gauge(attr: str) -> Callable[[], Dict[LabelValues, float]]:
+    def collect():
+        out = {}
+        for label, eng in _engines.items():
+            fn = getattr(eng.pool, attr, None)  # nem todo pool expõe tudo (ex.: StaticPool)
+            if callable(fn):
+                out[(label,)] = fn()
+        return out
+    return collect
+
+GaugeFunc("db_pool_checked_out", "Conexões em uso.", ("engine",), _pool_gauge("checkedout"))
+GaugeFunc("db_pool_overflow", "Conexões além de pool_size (negativo = folga).", ("engine",), _pool_gauge("overflow"))
+GaugeFunc("db_pool_size", "Tamanho configurado do pool.", ("engine",), _pool_gauge("size"))
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_execute_for(label: str):
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_STATEMENTS.inc(label)
+        DB_LATENCY.observe(elapsed, label)
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+        threshold = settings.SLOW_QUERY_MS
+        if threshold is not None and elapsed * 1000 >= threshold:
+            # Só o SQL (sem parâmetros, que podem conter dados do usuário)
+            slow_query_log.warning(
+                "slow query %.1fms engine=%s path=%s: %s",
+                elapsed * 1000, label, stats.path if stats else "-", " ".join(statement.split())[:2000],
+            )
+    return after
+
+def _on_error(context) -> None:
+    # Comando que falhou não chega ao after_cursor_execute
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+def _pool_events_for(label: str):
+    # Eventos públicos do pool, registrados na engine: valem também para o pool recriado por engine.dispose()
+    def connect(dbapi_connection, connection_record):
+        POOL_CONNECTS.inc(label)
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+
+    def checkin(dbapi_connection, connection_record):
+        start = connection_record.info.pop("checkout_at", None)
+        if start is not None:
+            POOL_CHECKOUT.observe(time.perf_counter() - start, label)
+
+    return {"connect": connect, "checkout": checkout, "checkin": checkin}
+
+def instrument_engine(engine: Engine, label: str) -> None:
+    """Conta/cronometra comandos SQL e expõe gauges do pool. Para engines async, passe `.sync_engine`."""
+    _engines[label] = engine
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute_for(label))
+    event.listen(engine, "handle_error", _on_error)
+    for name, fn in _pool_events_for(label).items():
+        event.listen(engine, name, fn)
@@ -0,0 +1,18 @@
+import base64
+import datetime as dt
+import json
+from typing import Tuple
+from fastapi import HTTPException
+
+# Cursor opaco para paginação por keyset: codifica o último (date, id) visto.
+def encode_cursor(date: dt.date, id: int) -> str:
+    raw = json.dumps({"d": date.isoformat(), "i": id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[dt.date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return dt.date.fromisoformat(data["d"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from sqlalchemy import event
+from app.core.config import settings
+from app.db.models import User
+
+class PrincipalCache:
+    """Cache LRU com TTL de usuários autenticados, indexado por `user_id`.
+
+    Guarda cópias desanexadas de sessão, para que um commit na sessão do request
+    (que expira as instâncias dela) não afete o objeto compartilhado.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._data: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[user_id]
+                self.misses += 1
+                return None
+            self._data.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user: User) -> User:
+        principal = User(**user.model_dump())
+        if self.maxsize <= 0:
+            return principal
+        with self._lock:
+            self._data[user.id] = (time.monotonic() + self.ttl, principal)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+# Qualquer alteração/remoção de usuário via ORM (desativação, troca de e-mail, ...) invalida a entrada.
+# UPDATEs em massa fora do ORM só são refletidos após o TTL.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    principal_cache.invalidate(target.id)
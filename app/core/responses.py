@@ -0,0 +1,28 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # opcional: sem orjson, cai no json da stdlib (mesma saída, mais lento)
+    orjson = None
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+class FastJSONResponse(JSONResponse):
+    """Resposta para linhas já no formato do response_model (tipos simples, datas, enums).
+
+    Retornada diretamente pela rota, dispensa a validação/serialização do `response_model`;
+    o `response_model` continua declarado na rota e documenta o contrato no OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
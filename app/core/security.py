@@ -1,20 +1,94 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
-def create_access_token(subject: str, expires_minutes: Optional[int] = None) -> str:
+def create_access_token(subject: str, user_id: Optional[int] = None, expires_minutes: Optional[int] = None) -> str:
     if expires_minutes is None:
         expires_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
     payload = {"sub": subject, "exp": expire}
+    if user_id is not None:
+        payload["uid"] = user_id
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+# ===== Pool dedicado para bcrypt =====
+
+class PasswordHashPool:
+    """Executa hash/verificação de senha num pool de processos de tamanho fixo.
+
+    Fora do GIL e fora do threadpool do Starlette, um pico de logins não trava as demais rotas.
+    Quando há `max_pending` operações em andamento/na fila, novas chamadas falham na hora com 503.
+    Com `workers=0`, roda inline (útil em desenvolvimento).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: fork de um processo com threads (uvicorn) não é seguro
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if self.workers <= 0:
+            fut: Future = Future()
+            fut.set_result(fn(*args))
+            return fut
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            fut = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+password_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+# As rotas de auth aguardam o resultado sem ocupar thread nenhuma: bloquear uma thread do threadpool em
+# .result() durante o bcrypt deixaria um pico de logins esgotar as threads que as rotas síncronas usam.
+async def _pooled(fn: Callable, *args):
+    if password_pool.workers <= 0:
+        # Inline (desenvolvimento): no threadpool, nunca no loop de eventos
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.wrap_future(password_pool.submit(fn, *args))
+
+async def hash_password_async(password: str) -> str:
+    return await _pooled(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _pooled(verify_password, plain_password, hashed_password)
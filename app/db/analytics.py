@@ -0,0 +1,160 @@
+import calendar
+import datetime as dt
+from typing import Dict, Optional
+import numpy as np
+from sqlalchemy import func, select
+from app.db import archive
+from app.db.fx import FxTable
+
+MOVING_AVERAGE_WINDOWS = (7, 30)
+MAX_DAYS = 20 * 366
+SERIES_COLUMNS = ("user_id", "date", "amount", "currency", "status", "category_id")
+
+def _previous_month_start(day: dt.date) -> dt.date:
+    return (day.replace(day=1) - dt.timedelta(days=1)).replace(day=1)
+
+class Series:
+    """Série diária de gastos de um usuário em [start, end] e estatísticas derivadas.
+
+    Uma consulta agrega por dia (só no índice idx_expenses_user_date_totals, e no do arquivo quando o
+    período o alcança); o restante é calculado em arrays NumPy.
+    A consulta começa antes de `start` o suficiente para que as médias móveis dos primeiros dias
+    e a variação do primeiro mês usem dados reais, não janelas truncadas.
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        start: dt.date,
+        end: dt.date,
+        currency: str = "BRL",
+        category_id: Optional[int] = None,
+        base_currency: Optional[str] = None,
+        include_archive: bool = False,
+    ):
+        if start > end:
+            raise ValueError("start must not be after end")
+        if (end - start).days >= MAX_DAYS:
+            raise ValueError(f"range must be shorter than {MAX_DAYS} days")
+        self.user_id = user_id
+        self.start = start
+        self.end = end
+        self.currency = currency
+        self.category_id = category_id
+        self.base_currency = base_currency
+        self.include_archive = include_archive
+        self.lo = min(start - dt.timedelta(days=max(MOVING_AVERAGE_WINDOWS) - 1), _previous_month_start(start))
+
+    @property
+    def archive_probe(self):
+        if self.include_archive:
+            return None
+        return archive.overlap_statement(self.user_id, self.lo, self.end + dt.timedelta(days=1))
+
+    def with_archive(self) -> "Series":
+        return Series(
+            self.user_id, self.start, self.end, self.currency, self.category_id, self.base_currency,
+            include_archive=True,
+        )
+
+    def _conditions(self, t) -> list:
+        conds = [
+            t.c.user_id == self.user_id,
+            t.c.date >= self.lo,
+            t.c.date < self.end + dt.timedelta(days=1),
+            t.c.status != "CANCELLED",
+        ]
+        if not self.base_currency:
+            conds.append(t.c.currency == self.currency)
+        if self.category_id:
+            conds.append(t.c.category_id == self.category_id)
+        return conds
+
+    @property
+    def statement(self):
+        src, conds = archive.expense_source(self._conditions, self.include_archive, SERIES_COLUMNS)
+        # Com conversão, soma por (dia, moeda) e converte depois; sem, só a moeda pedida entra
+        keys = [src.c.date, src.c.currency] if self.base_currency else [src.c.date]
+        return select(*keys, func.sum(src.c.amount)).select_from(src).where(*conds).group_by(*keys).order_by(*keys)
+
+    def _daily(self, result, fx: Optional[FxTable]) -> np.ndarray:
+        rows = list(result)
+        size = (self.end - self.lo).days + 1
+        if not rows:
+            return np.zeros(size)
+        columns = list(zip(*rows))
+        dates, amounts = columns[0], [float(a or 0) for a in columns[-1]]
+        if self.base_currency:
+            amounts = fx.convert(dates, columns[1], amounts, self.base_currency)
+        lo = self.lo.toordinal()
+        offsets = np.fromiter((d.toordinal() - lo for d in dates), dtype=np.int64, count=len(dates))
+        return np.bincount(offsets, weights=amounts, minlength=size)
+
+    def rows(self, result, fx: Optional[FxTable] = None) -> Dict:
+        daily = self._daily(result, fx)
+        first = (self.start - self.lo).days
+        in_range = daily[first:]
+
+        # Médias móveis (janela terminando em cada dia) por diferença de somas acumuladas
+        cumsum = np.concatenate(([0.0], np.cumsum(daily)))
+        averages = {
+            w: (cumsum[first + 1:] - cumsum[first + 1 - w:len(cumsum) - w]) / w for w in MOVING_AVERAGE_WINDOWS
+        }
+
+        days = np.arange(np.datetime64(self.lo), np.datetime64(self.end) + 1)
+        months = days.astype("datetime64[M]")
+        month_starts = np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+        month_totals = np.add.reduceat(daily, month_starts)
+        month_deltas = np.diff(month_totals)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            month_pcts = np.where(month_totals[:-1] != 0, month_deltas * 100 / month_totals[:-1], np.nan)
+        # O primeiro mês lido é só o de referência (pode estar incompleto); a saída começa no mês de `start`
+        shown = months[month_starts[1:]] >= np.datetime64(self.start, "M")
+        month_labels = months[month_starts[1:]][shown].astype(str).tolist()
+
+        # Projeção do mês de `end`: reta (mínimos quadrados) ajustada ao gasto acumulado do mês até `end`,
+        # avaliada no último dia; nunca abaixo do já gasto. Com um dia só, vale o ritmo médio
+        month_to_date = np.cumsum(daily[month_starts[-1]:])
+        elapsed = len(month_to_date)
+        days_in_month = calendar.monthrange(self.end.year, self.end.month)[1]
+        if elapsed >= 2:
+            slope, intercept = np.polyfit(np.arange(1, elapsed + 1), month_to_date, 1)
+            projected = max(slope * days_in_month + intercept, month_to_date[-1])
+        else:
+            projected = month_to_date[-1] * days_in_month
+
+        dates = days[first:].astype(str).tolist()
+        amounts = np.round(in_range, 2).tolist()
+        cumulative = np.round(np.cumsum(in_range), 2).tolist()
+        avg_7d = np.round(averages[7], 2).tolist()
+        avg_30d = np.round(averages[30], 2).tolist()
+        totals = np.round(month_totals[1:][shown], 2).tolist()
+        deltas = np.round(month_deltas[shown], 2).tolist()
+        pcts = np.round(month_pcts[shown], 2).tolist()
+        return {
+            "currency": self.base_currency or self.currency,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "days": [
+                {"date": d, "amount": a, "cumulative": c, "avg_7d": m7, "avg_30d": m30}
+                for d, a, c, m7, m30 in zip(dates, amounts, cumulative, avg_7d, avg_30d)
+            ],
+            "months": [
+                {
+                    "year": int(label[:4]),
+                    "month": int(label[5:7]),
+                    "total_amount": total,
+                    "delta": delta,
+                    "delta_pct": None if pct != pct else pct,
+                }
+                for label, total, delta, pct in zip(month_labels, totals, deltas, pcts)
+            ],
+            "projection": {
+                "year": self.end.year,
+                "month": self.end.month,
+                "month_to_date": round(float(month_to_date[-1]), 2),
+                "days_elapsed": elapsed,
+                "days_in_month": days_in_month,
+                "projected_total": round(float(projected), 2),
+            },
+        }
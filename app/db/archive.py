@@ -0,0 +1,104 @@
+import argparse
+import datetime as dt
+import sys
+import time
+from typing import Callable, Optional, Sequence, Tuple
+from sqlalchemy import delete, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import FromClause, Select
+from sqlalchemy.sql.schema import Table
+from app.core.config import settings
+from app.db.models import Expense, ExpenseArchive
+
+# Colunas comuns às duas tabelas (expenses_archive só acrescenta archived_at)
+COLUMNS = tuple(c.name for c in Expense.__table__.columns)
+
+HOT = Expense.__table__
+COLD = ExpenseArchive.__table__
+
+# ===== Leitura =====
+
+def overlap_statement(user_id: int, lo: Optional[dt.date], hi: Optional[dt.date]) -> Select:
+    """Existe despesa arquivada do usuário em [lo, hi)? Uma busca no índice (user_id, date) do arquivo."""
+    stmt = select(COLD.c.id).where(COLD.c.user_id == user_id)
+    if lo is not None:
+        stmt = stmt.where(COLD.c.date >= lo)
+    if hi is not None:
+        stmt = stmt.where(COLD.c.date < hi)
+    return stmt.limit(1)
+
+def overlaps(db: Session, user_id: int, lo: Optional[dt.date], hi: Optional[dt.date]) -> bool:
+    return db.execute(overlap_statement(user_id, lo, hi)).first() is not None
+
+def archived_statement(expense_id: int, user_id: int) -> Select:
+    return select(COLD.c.id).where(COLD.c.id == expense_id, COLD.c.user_id == user_id)
+
+def expense_source(
+    where: Callable[[Table], list], include_archive: bool, columns: Sequence[str] = COLUMNS
+) -> Tuple[FromClause, list]:
+    """(FROM, condições) das leituras de despesas: `expenses` ou o UNION ALL com expenses_archive.
+
+    `where(tabela)` monta as condições sobre uma das tabelas. No UNION elas vão dentro de cada ramo,
+    para que cada um use o próprio índice; as colunas do resultado têm os mesmos nomes de `expenses`.
+    """
+    if not include_archive:
+        return HOT, where(HOT)
+    branches = [select(*(t.c[c] for c in columns)).where(*where(t)) for t in (HOT, COLD)]
+    return union_all(*branches).subquery("expenses_all"), []
+
+# ===== Arquivamento =====
+
+def cutoff_date(today: dt.date, months: int = settings.ARCHIVE_AFTER_MONTHS) -> dt.date:
+    """Primeiro dia do mês `months` meses antes do mês de `today`: arquiva-se sempre em meses inteiros."""
+    month0 = today.year * 12 + today.month - 1 - months
+    return dt.date(month0 // 12, month0 % 12 + 1, 1)
+
+def _archive_batch(db: Session, ids: list) -> None:
+    now = dt.datetime.utcnow()
+    rows = select(*(HOT.c[c] for c in COLUMNS), literal(now, COLD.c.archived_at.type)).where(HOT.c.id.in_(ids))
+    db.execute(insert(COLD).from_select(list(COLUMNS) + ["archived_at"], rows))
+    db.execute(delete(HOT).where(HOT.c.id.in_(ids)))
+    db.commit()
+
+def archive_before(db: Session, cutoff: dt.date, batch_size: int = settings.ARCHIVE_BATCH_SIZE) -> int:
+    """Move para expenses_archive as despesas com date < cutoff; retorna quantas foram movidas.
+
+    Percorre `expenses` uma vez, em ordem de id, e move cada lote (INSERT ... SELECT + DELETE) numa
+    transação curta: as travas duram um lote, não a tarefa inteira. O rollup mensal e os orçamentos não
+    mudam (as despesas continuam existindo, só em outra tabela) e os relatórios que leem o rollup
+    continuam cobrindo os meses arquivados.
+    """
+    moved, last_id = 0, 0
+    while True:
+        ids = db.execute(
+            select(HOT.c.id).where(HOT.c.id > last_id, HOT.c.date < cutoff).order_by(HOT.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return moved
+        _archive_batch(db, ids)
+        moved += len(ids)
+        last_id = ids[-1]
+
+def main(argv=None) -> int:
+    from app.db.shards import shard_router
+
+    parser = argparse.ArgumentParser(description="Move despesas antigas de expenses para expenses_archive.")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument(
+        "--months", type=int, default=settings.ARCHIVE_AFTER_MONTHS,
+        help="Arquiva meses anteriores a este número de meses atrás.",
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--today", type=dt.date.fromisoformat, default=None, help="Referência (padrão: hoje).")
+    args = parser.parse_args(argv)
+    cutoff = cutoff_date(args.today or dt.date.today(), args.months)
+    started = time.perf_counter()
+    moved = 0
+    for shard in shard_router.shards:
+        with shard.session() as db:
+            moved += archive_before(db, cutoff, args.batch_size)
+    print(f"{moved} expenses before {cutoff.isoformat()} archived in {time.perf_counter() - started:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
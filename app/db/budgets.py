@@ -0,0 +1,150 @@
+import argparse
+import datetime as dt
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import bindparam, event, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import archive, rollups
+from app.db.models import Budget, BudgetEvent, Expense, ExpenseMonthlyRollup
+
+def add_contribution(deltas: rollups.Deltas, row, sign: int) -> None:
+    """Como rollups.add_contribution, com chave (usuário, ano, mês, moeda, categoria)."""
+    get = row.get if isinstance(row, dict) else lambda k: getattr(row, k)
+    if not rollups._counts(get("status")) or get("date") is None:
+        return
+    d = get("date")
+    delta = deltas[(get("user_id"), d.year, d.month, get("currency"), get("category_id"))]
+    delta[0] += sign * float(get("amount"))
+    delta[1] += sign
+
+def threshold_events(
+    budget_id: int, user_id: int, old_spent: float, old_limit: float, new_spent: float, new_limit: float,
+    thresholds: Iterable[int] = settings.BUDGET_ALERT_THRESHOLDS,
+) -> List[dict]:
+    """Eventos dos limiares (em % do limite) que passaram a ser atingidos: por novo gasto ou por limite menor."""
+    return [
+        {
+            "budget_id": budget_id, "user_id": user_id, "threshold": t,
+            "spent": round(new_spent, 2), "limit_amount": new_limit,
+        }
+        for t in thresholds
+        if old_spent < old_limit * t / 100 and new_spent >= new_limit * t / 100
+    ]
+
+def record_events(conn: Connection, events: List[dict]) -> None:
+    if events:
+        now = dt.datetime.utcnow()
+        conn.execute(insert(BudgetEvent.__table__), [{**e, "created_at": now} for e in events])
+
+_ADD_SPENT = (
+    update(Budget.__table__)
+    .where(Budget.__table__.c.id == bindparam("b_id"))
+    .values(spent=Budget.__table__.c.spent + bindparam("b_delta"))
+)
+
+def apply_deltas(conn: Connection, deltas: rollups.Deltas) -> None:
+    """Soma os deltas nos orçamentos afetados e registra os limiares cruzados.
+
+    Uma leitura dos orçamentos dos usuários/meses tocados (pelo índice de budgets, travando as linhas
+    no MySQL/PostgreSQL para que escritas concorrentes vejam o `spent` uma da outra) e um UPDATE
+    incremental por orçamento afetado; `expenses` não é relida.
+    """
+    by_month: Dict[tuple, Dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+    for (user_id, year, month, currency, category_id), (amount, _) in deltas.items():
+        if amount:
+            by_month[(user_id, year, month)][(currency, category_id)] += amount
+    if not by_month:
+        return
+    b = Budget
+    stmt = select(b.id, b.user_id, b.year, b.month, b.currency, b.category_id, b.limit_amount, b.spent).where(
+        b.user_id.in_({k[0] for k in by_month}), b.year.in_({k[1] for k in by_month}),
+    )
+    if conn.dialect.name in ("mysql", "postgresql"):
+        stmt = stmt.with_for_update()
+    updates, events = [], []
+    for budget in conn.execute(stmt):
+        amounts = by_month.get((budget.user_id, budget.year, budget.month))
+        if not amounts:
+            continue
+        delta = sum(
+            a for (currency, category_id), a in amounts.items()
+            if currency == budget.currency and (budget.category_id is None or category_id == budget.category_id)
+        )
+        if not delta:
+            continue
+        updates.append({"b_id": budget.id, "b_delta": delta})
+        events += threshold_events(
+            budget.id, budget.user_id, budget.spent, budget.limit_amount, budget.spent + delta, budget.limit_amount
+        )
+    if updates:
+        conn.execute(_ADD_SPENT, updates)
+    record_events(conn, events)
+
+# Toda escrita de Expense via ORM (sync ou async) passa por aqui, na transação do flush (como o rollup).
+# Escritas via Core (importação, lotes, recorrências) chamam add_contribution/apply_deltas.
+@event.listens_for(Session, "after_flush")
+def _maintain_budgets(session: Session, flush_context) -> None:
+    deltas = rollups.new_deltas()
+    for obj in session.new:
+        if isinstance(obj, Expense):
+            add_contribution(deltas, obj, +1)
+    for obj in session.deleted:
+        if isinstance(obj, Expense):
+            add_contribution(deltas, rollups._previous_state(obj), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Expense) and session.is_modified(obj, include_collections=False):
+            add_contribution(deltas, rollups._previous_state(obj), -1)
+            add_contribution(deltas, obj, +1)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+# ===== Valor inicial / reconstrução =====
+
+def current_spent(session: Session, budget: Budget) -> float:
+    """Gasto do mês do orçamento: do rollup mensal quando vale para todas as categorias, senão pelas despesas
+    (inclusive as arquivadas)."""
+    if budget.category_id is None:
+        r = ExpenseMonthlyRollup
+        stmt = select(r.total_amount).where(
+            r.user_id == budget.user_id, r.year == budget.year, r.month == budget.month, r.currency == budget.currency
+        )
+    else:
+        lo = dt.date(budget.year, budget.month, 1)
+        hi = dt.date(lo.year + lo.month // 12, lo.month % 12 + 1, 1)
+        src, _ = archive.expense_source(lambda t: [
+            t.c.user_id == budget.user_id, t.c.date >= lo, t.c.date < hi,
+            t.c.currency == budget.currency, t.c.category_id == budget.category_id, t.c.status != "CANCELLED",
+        ], True, ("amount",))
+        stmt = select(func.sum(src.c.amount))
+    return float(session.execute(stmt).scalar() or 0)
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+    """Recalcula `spent` de cada orçamento a partir das despesas (reparo; não gera eventos)."""
+    stmt = select(Budget)
+    if user_id is not None:
+        stmt = stmt.where(Budget.user_id == user_id)
+    budgets = db.execute(stmt).scalars().all()
+    for budget in budgets:
+        budget.spent = current_spent(db, budget)
+    db.commit()
+    return len(budgets)
+
+def main(argv=None) -> int:
+    from app.db.shards import shard_router
+
+    parser = argparse.ArgumentParser(description="Recalcula o gasto acumulado dos orçamentos a partir das despesas.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user-id", type=int, default=None, help="Restringe a um usuário.")
+    args = parser.parse_args(argv)
+    rebuilt = 0
+    for shard in shard_router.shards_for(args.user_id):
+        with shard.session() as db:
+            rebuilt += rebuild(db, args.user_id)
+    print(f"{rebuilt} budgets rebuilt")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.schema import Table
+from app.core.cache import mark_user_dirty
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, instrument_engine
+from app.db import budgets, rollups
+from app.db.models import Expense
+from app.db.replicas import recent_writers
+
+log = logging.getLogger("app.db.coalescer")
+
+DURABILITIES = ("full", "relaxed")
+
+BATCH_ROWS = Histogram(
+    "write_coalescer_batch_rows", "Linhas por INSERT coalescido.", ("route",),
+    (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+REJECTED_ROWS = Counter(
+    "write_coalescer_rejected_rows_total", "Linhas recusadas pelo banco num lote coalescido.", ("route",)
+)
+
+class CoalescerOverloaded(Exception):
+    """Fila do coalescedor cheia: a requisição deve ser recusada (503), não enfileirada."""
+
+class CoalescePolicy:
+    """Janela e durabilidade de uma rota coalescida (uma entrada de WRITE_COALESCING).
+
+    `durability="full"` responde depois do commit do lote, com a mesma garantia do caminho normal;
+    "relaxed" faz o commit sem esperar o fsync (PostgreSQL: synchronous_commit=off; SQLite:
+    synchronous=NORMAL, seguro em WAL): uma queda de energia pode perder os últimos lotes confirmados.
+    No MySQL, sem ajuste por sessão, "relaxed" equivale a "full".
+    """
+
+    def __init__(self, window_ms: float = 5.0, max_rows: int = 500, durability: str = "full"):
+        if window_ms < 0 or max_rows < 1:
+            raise ValueError("window_ms must be >= 0 and max_rows >= 1")
+        if durability not in DURABILITIES:
+            raise ValueError(f"durability must be one of: {', '.join(DURABILITIES)}")
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self.durability = durability
+
+# ===== Escrita de um lote =====
+
+def _relax_connection(conn: Connection) -> None:
+    """Durabilidade relaxada para os commits de `conn` (SQLite: o PRAGMA vale por conexão)."""
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA synchronous = NORMAL")
+        conn.commit()
+
+def insert_returning_ids(db: Session, table: Table, rows: List[dict]) -> List[int]:
+    """INSERT de `rows` em `table` devolvendo os ids gerados, na ordem das linhas."""
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        # Um INSERT multi-linha (insertmanyvalues) com RETURNING, ids na ordem das linhas
+        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        return list(db.execute(stmt, rows).scalars())
+    # MySQL: sem RETURNING, e ids de um INSERT multi-linha não são garantidamente consecutivos.
+    # Um INSERT por linha, na mesma transação: o commit (e o fsync) continua sendo um por lote
+    return [db.execute(insert(table), row).inserted_primary_key[0] for row in rows]
+
+def write_expenses(db: Session, rows: List[dict], durability: str = "full") -> List[int]:
+    """Grava `rows` numa transação (com rollup, orçamentos e versão do cache) e devolve os ids gerados."""
+    try:
+        if durability == "relaxed" and db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SET LOCAL synchronous_commit = off"))  # vale só para esta transação
+        ids = insert_returning_ids(db, Expense.__table__, rows)
+        deltas = rollups.new_deltas()
+        for row in rows:
+            budgets.add_contribution(deltas, row, +1)
+            mark_user_dirty(db, row["user_id"])
+        rollups.apply_deltas(db.connection(), rollups.by_month(deltas))
+        budgets.apply_deltas(db.connection(), deltas)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    for user_id in {row["user_id"] for row in rows}:
+        recent_writers.mark(user_id)
+    return ids
+
+# ===== Coalescedor =====
+
+Pending = Tuple[dict, int, Future]  # (linha, shard do usuário, id gerado)
+
+class WriteCoalescer:
+    """Junta criações de despesas concorrentes num INSERT multi-linha + um commit por janela.
+
+    `submit` enfileira a linha e devolve um Future com o id gerado. Uma thread recolhe a fila: o primeiro
+    item abre a janela, que fecha após `policy.window` segundos ou `policy.max_rows` linhas. Se o lote
+    falhar no banco, ele é dividido ao meio e regravado até isolar as linhas recusadas: só os Futures
+    delas recebem o erro. Com `max_pending` linhas na fila, novas chamadas falham com CoalescerOverloaded.
+
+    A thread grava por uma engine própria por shard, de uma conexão: o lote não disputa o pool com as
+    requisições que esperam por ele (nem precisa de uma vaga nele). Com sharding, cada janela vira um
+    INSERT + commit por shard presente nela.
+    """
+
+    def __init__(self, route: str, policy: CoalescePolicy, max_pending: int):
+        self.route = route
+        self.policy = policy
+        self._queue: "queue.Queue[Optional[Pending]]" = queue.Queue(maxsize=max(max_pending, 1))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._engines: Dict[int, Engine] = {}
+        self._conns: Dict[int, Connection] = {}
+
+    def submit(self, row: dict, shard: int = 0) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((row, shard, future))
+        except queue.Full:
+            raise CoalescerOverloaded(f"write queue for {self.route} is full")
+        return future
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"coalescer-{self.route}", daemon=True)
+                self._thread.start()
+
+    def _collect(self, first: Pending) -> Tuple[List[Pending], bool]:
+        batch, stop = [first], False
+        deadline = time.monotonic() + self.policy.window
+        while len(batch) < self.policy.max_rows:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _connection(self, shard: int) -> Connection:
+        from app.db.engine import pool_options
+        from app.db.shards import shard_router
+
+        if shard not in self._engines:
+            shared = shard_router.shard(shard).engine
+            url = shared.url
+            # SQLite em memória é um banco por conexão: aí só a engine compartilhada enxerga os mesmos dados
+            self._engines[shard] = shared
+            if pool_options(url.render_as_string(hide_password=False)):
+                self._engines[shard] = create_engine(url, pool_pre_ping=True, pool_size=1, max_overflow=0)
+                if settings.METRICS_ENABLED:
+                    suffix = f"_shard{shard}" if shard else ""
+                    instrument_engine(self._engines[shard], f"coalescer_{self.route}{suffix}")
+        if shard not in self._conns:
+            self._conns[shard] = self._engines[shard].connect()
+            if self.policy.durability == "relaxed":
+                _relax_connection(self._conns[shard])
+        return self._conns[shard]
+
+    def _release(self, shard: Optional[int] = None) -> None:
+        for index in ([shard] if shard is not None else list(self._conns)):
+            conn = self._conns.pop(index, None)
+            if conn is not None:
+                conn.close()
+
+    def _run(self) -> None:
+        stop = False
+        try:
+            while True:
+                # Depois do pedido de parada, só esvazia a fila (nenhuma requisição fica esperando para sempre)
+                try:
+                    first = self._queue.get(block=not stop)
+                except queue.Empty:
+                    return
+                if first is None:
+                    stop = True
+                    continue
+                batch, stopped = self._collect(first)
+                stop = stop or stopped
+                # Futures cancelados (cliente desconectou antes do lote sair) ficam fora do INSERT
+                batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+                by_shard: Dict[int, List[Pending]] = {}
+                for item in batch:
+                    by_shard.setdefault(item[1], []).append(item)
+                for shard, items in by_shard.items():
+                    self._flush(shard, items)
+        finally:
+            self._release()
+
+    def _flush(self, shard: int, batch: List[Pending]) -> None:
+        BATCH_ROWS.observe(len(batch), self.route)
+        try:
+            with Session(bind=self._connection(shard), autoflush=False) as db:
+                self._write(db, batch)
+        except Exception as exc:  # falha que não é de uma linha (conexão, timeout, bug): o lote todo recebe o erro
+            log.exception("coalesced write for %s failed", self.route)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            self._release(shard)  # a conexão pode ter caído: o próximo lote abre outra
+
+    def _write(self, db: Session, batch: List[Pending]) -> None:
+        try:
+            ids = write_expenses(db, [row for row, _, _ in batch], self.policy.durability)
+        except (IntegrityError, DataError) as exc:
+            # Erro causado pelos dados: divide o lote até isolar a(s) linha(s) recusada(s)
+            if len(batch) == 1:
+                REJECTED_ROWS.inc(self.route)
+                batch[0][2].set_exception(exc)
+                return
+            mid = len(batch) // 2
+            self._write(db, batch[:mid])
+            self._write(db, batch[mid:])
+            return
+        for (_, _, future), expense_id in zip(batch, ids):
+            future.set_result(expense_id)
+
+    def stop(self) -> None:
+        """Grava o que já está na fila e encerra a thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=30)
+
+coalescers: Dict[str, WriteCoalescer] = {
+    route: WriteCoalescer(route, CoalescePolicy(**options), settings.WRITE_COALESCING_MAX_PENDING)
+    for route, options in settings.WRITE_COALESCING.items()
+}
+
+# Rotas com coalescência disponível; None = caminho normal (uma transação por requisição)
+expense_writes: Optional[WriteCoalescer] = coalescers.get("create_expense")
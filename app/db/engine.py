@@ -1,11 +1,49 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlmodel import SQLModel
 from app.core.config import settings
+from app.core.admission import pool_pressure
+from app.core.metrics import instrument_engine
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+def pool_options(url: str) -> dict:
+    """Dimensionamento do pool (Settings) quando o dialeto usa QueuePool; SQLite em memória e aiosqlite
+    usam pools sem esses parâmetros."""
+    u = make_url(url)
+    if not issubclass(u.get_dialect().get_pool_class(u), QueuePool):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
+engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, **pool_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "primary")
+pool_pressure.watch(engine)
+
+ASYNC_DRIVERS = {"mysql+pymysql": "mysql+aiomysql", "mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+def async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _async_url = settings.ASYNC_DATABASE_URL or async_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(_async_url, pool_pre_ping=True, **pool_options(_async_url))
+    if settings.METRICS_ENABLED:
+        instrument_engine(async_engine.sync_engine, "primary_async")
+    pool_pressure.watch(async_engine.sync_engine)
+    # expire_on_commit=False: atributos expirados exigiriam lazy-load (I/O implícito), proibido no modo async
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 @contextmanager
 def get_session():
@@ -13,4 +51,9 @@ def get_session():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@asynccontextmanager
+async def get_async_session():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,171 @@
+import argparse
+import bisect
+import csv
+import datetime as dt
+import hashlib
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import FxRate
+
+class FxRateMissing(ValueError):
+    pass
+
+# ===== Tabela em memória =====
+
+class FxTable:
+    """Snapshot imutável de fx_rates: por moeda, datas (ordinais) ordenadas e as cotações correspondentes.
+
+    A cotação de uma data é a da data mais recente <= ela (fins de semana e feriados herdam o último
+    fechamento). `version` identifica o conteúdo e entra na chave do cache de relatórios.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[dt.date, str, float]], reference: str):
+        self.reference = reference
+        series: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        digest = hashlib.blake2b(digest_size=8)
+        for day, currency, rate in rows:
+            series[currency].append((day.toordinal(), float(rate)))
+        self._dates: Dict[str, List[int]] = {}
+        self._rates: Dict[str, List[float]] = {}
+        for currency in sorted(series):
+            points = sorted(series[currency])
+            self._dates[currency] = [d for d, _ in points]
+            self._rates[currency] = [r for _, r in points]
+            digest.update(repr((currency, points)).encode())
+        self.version = digest.hexdigest()
+
+    def rates(self, currency: str, ordinals: Sequence[int]) -> List[float]:
+        """Cotações de `currency` para datas (ordinais) em ordem crescente, numa única passada."""
+        if currency == self.reference:
+            return [1.0] * len(ordinals)
+        dates = self._dates.get(currency)
+        if not dates:
+            raise FxRateMissing(f"No FX rates for currency {currency}")
+        rates = self._rates[currency]
+        if ordinals and ordinals[0] < dates[0]:
+            raise FxRateMissing(
+                f"No FX rate for {currency} on or before {dt.date.fromordinal(ordinals[0]).isoformat()}"
+            )
+        out = []
+        # As datas pedidas vêm ordenadas: o índice só avança (merge), com bisect para saltos longos
+        i = 0
+        last = len(dates) - 1
+        for day in ordinals:
+            if i < last and dates[i + 1] <= day:
+                i = bisect.bisect_right(dates, day, i) - 1
+            out.append(rates[i])
+        return out
+
+    def convert(
+        self, dates: Sequence[dt.date], currencies: Sequence[str], amounts: Sequence[float], target: str
+    ) -> List[float]:
+        """Converte colunas (data, moeda, valor) para `target`: uma busca de cotações por moeda, não por linha."""
+        out = list(amounts)
+        ordinals = [d.toordinal() for d in dates]
+        by_currency: Dict[str, List[int]] = defaultdict(list)
+        for idx, currency in enumerate(currencies):
+            if currency != target:
+                by_currency[currency].append(idx)
+        if not by_currency:
+            return out
+        days = sorted({ordinals[idx] for idxs in by_currency.values() for idx in idxs})
+        target_rates = dict(zip(days, self.rates(target, days)))
+        for currency, idxs in by_currency.items():
+            cur_days = sorted({ordinals[idx] for idx in idxs})
+            factor = {d: r / target_rates[d] for d, r in zip(cur_days, self.rates(currency, cur_days))}
+            for idx in idxs:
+                out[idx] = amounts[idx] * factor[ordinals[idx]]
+        return out
+
+class FxCache:
+    """Mantém o FxTable do processo, relido do banco a cada `ttl` segundos."""
+
+    def __init__(self, ttl: float, reference: str):
+        self.ttl = ttl
+        self.reference = reference
+        self._table: Optional[FxTable] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def table(self, db: Session) -> FxTable:
+        if self._table is None or time.monotonic() - self._loaded_at >= self.ttl:
+            with self._lock:
+                if self._table is None or time.monotonic() - self._loaded_at >= self.ttl:
+                    rows = db.execute(select(FxRate.date, FxRate.currency, FxRate.rate)).all()
+                    self._table = FxTable(rows, self.reference)
+                    self._loaded_at = time.monotonic()
+        return self._table
+
+    def invalidate(self) -> None:
+        self._table = None
+
+fx_cache = FxCache(settings.FX_CACHE_TTL_SECONDS, settings.FX_REFERENCE_CURRENCY)
+
+# ===== Carga =====
+
+def read_csv(path: str) -> List[dict]:
+    """Lê um CSV com cabeçalho date,currency,rate (data ISO, código de 3 letras, cotação > 0)."""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for line, rec in enumerate(csv.DictReader(f), start=2):
+            try:
+                row = {
+                    "date": dt.date.fromisoformat(rec["date"].strip()),
+                    "currency": rec["currency"].strip().upper(),
+                    "rate": float(rec["rate"]),
+                }
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"line {line}: expected date,currency,rate ({exc})")
+            if len(row["currency"]) != 3 or row["rate"] <= 0:
+                raise ValueError(f"line {line}: invalid currency or rate")
+            rows.append(row)
+    return rows
+
+def load(db: Session, rows: List[dict]) -> int:
+    """Upsert das cotações por (date, currency)."""
+    if not rows:
+        return 0
+    table = FxRate.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as upsert
+        stmt = upsert(table)
+        stmt = stmt.on_duplicate_key_update(rate=stmt.inserted.rate)
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.date, table.c.currency], set_={"rate": stmt.excluded.rate}
+        )
+    db.execute(stmt, rows)
+    db.commit()
+    fx_cache.invalidate()
+    return len(rows)
+
+def main(argv=None) -> int:
+    from app.db.engine import get_session
+
+    parser = argparse.ArgumentParser(description="Carrega cotações (CSV date,currency,rate) em fx_rates.")
+    parser.add_argument("command", choices=["load"])
+    parser.add_argument("path", help="Arquivo CSV com cabeçalho date,currency,rate.")
+    args = parser.parse_args(argv)
+    try:
+        rows = read_csv(args.path)
+    except ValueError as exc:
+        print(f"{args.path}: {exc}")
+        return 1
+    with get_session() as db:
+        print(f"{load(db, rows)} FX rates loaded")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
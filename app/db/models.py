@@ -1,7 +1,9 @@
 from datetime import datetime, date
 from enum import Enum
 from typing import Optional
+from sqlalchemy import DDL, Index, PrimaryKeyConstraint, UniqueConstraint, event
 from sqlmodel import SQLModel, Field
+from app.core.config import settings
 
 class PaymentMethod(str, Enum):
     CASH = "CASH"
@@ -14,6 +16,24 @@ class ExpenseStatus(str, Enum):
     PAID = "PAID"
     CANCELLED = "CANCELLED"
 
+class RecurrenceFrequency(str, Enum):
+    MONTHLY = "MONTHLY"
+    WEEKLY = "WEEKLY"
+    INSTALLMENTS = "INSTALLMENTS"
+
+def sharded_id(table: str) -> dict:
+    """Com shards, o id das tabelas por usuário sai do contador global (app.db.shards.global_ids), não do
+    autoincremento de cada shard: não se repete entre shards, e uma movimentação copia as linhas com o mesmo id."""
+    if not settings.DATABASE_SHARD_URLS:
+        return {}
+
+    def next_id(context) -> int:
+        from app.db.shards import global_ids
+
+        return global_ids.take(table, context.connection)
+
+    return {"default": next_id}
+
 class User(SQLModel, table=True):
     __tablename__ = "users"
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -26,7 +46,7 @@ class User(SQLModel, table=True):
 
 class Category(SQLModel, table=True):
     __tablename__ = "categories"
-    id: Optional[int] = Field(default=None, primary_key=True)
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs=sharded_id("categories"))
     user_id: int = Field(foreign_key="users.id")
     name: str
     color: Optional[str] = None
@@ -35,7 +55,21 @@ class Category(SQLModel, table=True):
 
 class Expense(SQLModel, table=True):
     __tablename__ = "expenses"
-    id: Optional[int] = Field(default=None, primary_key=True)
+    # Mesmos índices de scripts/ddl.sql (para bancos criados via metadata, ex.: SQLite local)
+    __table_args__ = (
+        Index("idx_expenses_user_date", "user_id", "date"),
+        # Cobre as somas por dia (séries de app.db.analytics) sem ler as linhas da tabela
+        Index("idx_expenses_user_date_totals", "user_id", "date", "currency", "status", "amount"),
+        # Também cobre as somas por categoria (status e amount no índice): o relatório não lê as linhas
+        Index("idx_expenses_user_category", "user_id", "category_id", "status", "amount"),
+        Index("idx_expenses_user_status", "user_id", "status"),
+        # Uma despesa por ocorrência de cada recorrência: o agendador pode repetir um lote sem duplicar
+        UniqueConstraint("recurring_id", "occurrence", name="uq_expenses_recurring_occurrence"),
+        # SQLite: sem AUTOINCREMENT o próximo id é max(id) + 1 e reusaria ids de despesas já arquivadas
+        # (expenses_archive guarda os mesmos ids)
+        {"sqlite_autoincrement": True},
+    )
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs=sharded_id("expenses"))
     user_id: int = Field(foreign_key="users.id")
     category_id: Optional[int] = Field(default=None, foreign_key="categories.id")
     amount: float
@@ -45,5 +79,163 @@ class Expense(SQLModel, table=True):
     paid_at: Optional[datetime] = None
     payment_method: PaymentMethod = Field(default=PaymentMethod.CARD)
     status: ExpenseStatus = Field(default=ExpenseStatus.PLANNED)
+    recurring_id: Optional[int] = Field(default=None, foreign_key="recurring_expenses.id")
+    occurrence: Optional[int] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+# Despesas recorrentes: o agendador (app.db.recurring) materializa cada ocorrência vencida em `expenses`.
+# `next_occurrence`/`next_date` apontam a próxima ocorrência ainda não criada; `next_date` nulo = encerrada.
+class RecurringExpense(SQLModel, table=True):
+    __tablename__ = "recurring_expenses"
+    __table_args__ = (
+        Index("idx_recurring_next_date", "next_date", "id"),
+        Index("idx_recurring_user", "user_id"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs=sharded_id("recurring_expenses"))
+    user_id: int = Field(foreign_key="users.id")
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")
+    amount: float
+    currency: str = Field(default="BRL", max_length=3)
+    description: Optional[str] = None
+    payment_method: PaymentMethod = Field(default=PaymentMethod.CARD)
+    frequency: RecurrenceFrequency
+    start_date: date
+    end_date: Optional[date] = None
+    installments: Optional[int] = None
+    next_occurrence: int = 0
+    next_date: Optional[date] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+# Busca textual no SQLite (o MySQL usa o FULLTEXT de scripts/ddl.sql): um índice FTS5 external content para
+# `expenses` e outro para `expenses_archive`. A coluna user_id entra no índice: a busca cruza o doclist do usuário
+# com o dos termos, e os resultados dos outros usuários saem antes do ranking. Triggers cobrem também as escritas
+# Core (importação, lotes, arquivamento).
+def _sqlite_fts_ddl(table: str) -> tuple:
+    fts = f"{table}_fts"
+    new = f"INSERT INTO {fts}(rowid, description, user_id) VALUES (new.id, new.description, new.user_id);"
+    old = (
+        f"INSERT INTO {fts}({fts}, rowid, description, user_id) "
+        "VALUES ('delete', old.id, old.description, old.user_id);"
+    )
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"description, user_id, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF description, user_id ON {table} BEGIN {old} {new} END",
+    )
+
+def _sqlite_fts_drop(table: str) -> tuple:
+    fts = f"{table}_fts"
+    return tuple(f"DROP TRIGGER IF EXISTS {fts}_{t}" for t in ("ai", "ad", "au")) + (f"DROP TABLE IF EXISTS {fts}",)
+
+FTS_TABLES = ("expenses", "expenses_archive")
+SQLITE_FTS_DDL = tuple(stmt for table in FTS_TABLES for stmt in _sqlite_fts_ddl(table))
+SQLITE_FTS_DROP = tuple(stmt for table in FTS_TABLES for stmt in _sqlite_fts_drop(table))
+
+for _stmt in _sqlite_fts_ddl("expenses"):
+    event.listen(Expense.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+
+# Despesas antigas movidas de `expenses` por app.db.archive (mesmas colunas e ids). Só leitura: as
+# leituras fazem UNION ALL com `expenses` quando o intervalo pedido alcança dados arquivados.
+class ExpenseArchive(SQLModel, table=True):
+    __tablename__ = "expenses_archive"
+    __table_args__ = (
+        # Um único índice: cobre as buscas por (usuário, data) e as somas dos relatórios
+        Index("idx_expenses_archive_user_date", "user_id", "date", "currency", "status", "amount"),
+    )
+    id: int = Field(primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    category_id: Optional[int] = None
+    amount: float
+    currency: str = Field(default="BRL", max_length=3)
+    description: Optional[str] = None
+    date: date
+    paid_at: Optional[datetime] = None
+    payment_method: PaymentMethod = Field(default=PaymentMethod.CARD)
+    status: ExpenseStatus = Field(default=ExpenseStatus.PLANNED)
+    recurring_id: Optional[int] = None
+    occurrence: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+for _stmt in _sqlite_fts_ddl("expenses_archive"):
+    event.listen(ExpenseArchive.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+
+# Totais por (usuário, ano, mês, moeda), mantidos na mesma transação das escritas em `expenses`
+class ExpenseMonthlyRollup(SQLModel, table=True):
+    __tablename__ = "expense_monthly_rollups"
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    year: int = Field(primary_key=True)
+    month: int = Field(primary_key=True)
+    currency: str = Field(max_length=3, primary_key=True)
+    total_amount: float = 0
+    expense_count: int = 0
+
+# Cotações diárias: valor de 1 unidade de `currency` na moeda de referência (FX_REFERENCE_CURRENCY)
+class FxRate(SQLModel, table=True):
+    __tablename__ = "fx_rates"
+    __table_args__ = (PrimaryKeyConstraint("date", "currency"),)
+    date: date
+    currency: str = Field(max_length=3)
+    rate: float
+
+# Orçamento mensal por categoria (ou de todas, com category_id nulo) numa moeda. `spent` é mantido
+# incrementalmente pelas escritas em `expenses` (app.db.budgets), sem reler as despesas.
+class Budget(SQLModel, table=True):
+    __tablename__ = "budgets"
+    __table_args__ = (
+        Index("idx_budgets_user_month", "user_id", "year", "month"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs=sharded_id("budgets"))
+    user_id: int = Field(foreign_key="users.id")
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")
+    year: int
+    month: int
+    currency: str = Field(default="BRL", max_length=3)
+    limit_amount: float
+    spent: float = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+# Cruzamentos de limiar (ex.: 80%, 100%) registrados para o cliente consultar por polling
+class BudgetEvent(SQLModel, table=True):
+    __tablename__ = "budget_events"
+    __table_args__ = (
+        Index("idx_budget_events_user", "user_id", "id"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs=sharded_id("budget_events"))
+    budget_id: int = Field(foreign_key="budgets.id")
+    user_id: int = Field(foreign_key="users.id")
+    threshold: int
+    spent: float
+    limit_amount: float
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+# Diretório global de shards (só no shard 0, ao lado de `users`): onde estão os dados de cada usuário.
+# Sem linha = shard 0 (usuários anteriores ao sharding). `move_to` congela as escritas durante a cópia para
+# outro shard; `move_from` marca o shard antigo ainda por limpar (app.db.shards move).
+class UserShard(SQLModel, table=True):
+    __tablename__ = "user_shards"
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    shard: int = 0
+    move_to: Optional[int] = None
+    move_from: Optional[int] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+# Contadores globais de ids (só no shard 0, com shards): próximo id livre de cada tabela por usuário em todos os
+# shards. Os processos reservam faixas dele (app.db.shards.GlobalIds).
+class IdSequence(SQLModel, table=True):
+    __tablename__ = "id_sequences"
+    name: str = Field(max_length=64, primary_key=True)
+    next_id: int
+
+# Versão dos dados de cada usuário (despesas e categorias), no shard dele: sobe a cada commit que os altera.
+# Base dos ETags das leituras e da pré-condição If-Match das atualizações (app.db.versions).
+class UserVersion(SQLModel, table=True):
+    __tablename__ = "user_versions"
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    version: int = 0
@@ -0,0 +1,247 @@
+import argparse
+import calendar
+import datetime as dt
+import logging
+import sys
+import threading
+import time
+from typing import Collection, List, Optional, Tuple
+from sqlalchemy import and_, bindparam, insert, or_, select, update
+from sqlalchemy.orm import Session
+from app.core.cache import mark_user_dirty
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+from app.db import budgets, rollups
+from app.db.models import Expense, ExpenseStatus, RecurrenceFrequency, RecurringExpense
+
+log = logging.getLogger("app.db.recurring")
+
+MATERIALIZED = Counter("recurring_expenses_materialized_total", "Despesas lançadas pelo agendador de recorrências.")
+RUN_DURATION = Histogram("recurring_scheduler_run_seconds", "Duração de cada execução do agendador de recorrências.")
+
+# ===== Calendário =====
+
+def add_months(day: dt.date, months: int) -> dt.date:
+    """Mesmo dia `months` meses depois, limitado ao último dia do mês (31/01 + 1 mês = 28 ou 29/02)."""
+    month0 = day.month - 1 + months
+    year, month = day.year + month0 // 12, month0 % 12 + 1
+    return dt.date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+def occurrence_date(
+    frequency: str, start_date: dt.date, end_date: Optional[dt.date], installments: Optional[int], occurrence: int
+) -> Optional[dt.date]:
+    """Data da ocorrência `occurrence` (0 = primeira), ou None se a recorrência já terminou."""
+    frequency = getattr(frequency, "value", frequency)
+    if frequency == RecurrenceFrequency.INSTALLMENTS.value and occurrence >= (installments or 0):
+        return None
+    if frequency == RecurrenceFrequency.WEEKLY.value:
+        day = start_date + dt.timedelta(weeks=occurrence)
+    else:
+        day = add_months(start_date, occurrence)
+    return None if end_date is not None and day > end_date else day
+
+def first_date(schedule: RecurringExpense) -> Optional[dt.date]:
+    return occurrence_date(schedule.frequency, schedule.start_date, schedule.end_date, schedule.installments, 0)
+
+# ===== Materialização =====
+
+SCHEDULE_COLUMNS = (
+    RecurringExpense.id, RecurringExpense.user_id, RecurringExpense.category_id, RecurringExpense.amount,
+    RecurringExpense.currency, RecurringExpense.description, RecurringExpense.payment_method,
+    RecurringExpense.frequency, RecurringExpense.start_date, RecurringExpense.end_date,
+    RecurringExpense.installments, RecurringExpense.next_occurrence,
+)
+
+def _due_batch(
+    db: Session, today: dt.date, after: Tuple[dt.date, int], batch_size: int, skip_users: Collection[int] = ()
+) -> list:
+    r = RecurringExpense
+    # Keyset em (next_date, id), na ordem do índice: cada lote é uma busca no índice, sem reordenar o restante
+    stmt = (
+        select(*SCHEDULE_COLUMNS, r.next_date)
+        .where(
+            r.next_date <= today,
+            r.next_date >= after[0],
+            or_(r.next_date > after[0], and_(r.next_date == after[0], r.id > after[1])),
+        )
+        .order_by(r.next_date, r.id)
+        .limit(batch_size)
+    )
+    if skip_users:
+        stmt = stmt.where(r.user_id.not_in(skip_users))
+    if db.get_bind().dialect.name in ("mysql", "postgresql"):
+        # Várias instâncias do agendador dividem o trabalho: linhas travadas por outra ficam para ela
+        stmt = stmt.with_for_update(skip_locked=True)
+    return db.execute(stmt).all()
+
+def _occurrence_description(s, occurrence: int) -> Optional[str]:
+    if getattr(s.frequency, "value", s.frequency) != RecurrenceFrequency.INSTALLMENTS.value:
+        return s.description
+    label = f"{occurrence + 1}/{s.installments}"
+    return f"{s.description} ({label})" if s.description else f"Parcela {label}"
+
+def plan_batch(schedules: list, today: dt.date, max_catch_up: int, now: dt.datetime) -> Tuple[List[dict], List[dict]]:
+    """Despesas vencidas (até `today`, no máximo `max_catch_up` por recorrência no lote) e o novo estado de cada uma."""
+    rows, states = [], []
+    for s in schedules:
+        occurrence = s.next_occurrence
+        day = occurrence_date(s.frequency, s.start_date, s.end_date, s.installments, occurrence)
+        while day is not None and day <= today and occurrence - s.next_occurrence < max_catch_up:
+            rows.append({
+                "user_id": s.user_id,
+                "category_id": s.category_id,
+                "amount": s.amount,
+                "currency": s.currency,
+                "description": _occurrence_description(s, occurrence),
+                "date": day,
+                "paid_at": None,
+                "payment_method": s.payment_method,
+                "status": ExpenseStatus.PLANNED,
+                "recurring_id": s.id,
+                "occurrence": occurrence,
+                "created_at": now,
+                "updated_at": now,
+            })
+            occurrence += 1
+            day = occurrence_date(s.frequency, s.start_date, s.end_date, s.installments, occurrence)
+        states.append({"b_id": s.id, "b_next_occurrence": occurrence, "b_next_date": day, "b_updated_at": now})
+    return rows, states
+
+def _insert_ignoring_duplicates(db: Session, rows: List[dict]) -> int:
+    table = Expense.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = insert(table).prefix_with("IGNORE")
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(table).on_conflict_do_nothing(index_elements=[table.c.recurring_id, table.c.occurrence])
+    return db.execute(stmt, rows).rowcount
+
+_ADVANCE = (
+    update(RecurringExpense.__table__)
+    # Só avança: uma instância atrasada nunca faz uma recorrência voltar a ocorrências já lançadas
+    .where(
+        RecurringExpense.__table__.c.id == bindparam("b_id"),
+        RecurringExpense.__table__.c.next_occurrence < bindparam("b_next_occurrence"),
+    )
+    .values(
+        next_occurrence=bindparam("b_next_occurrence"),
+        next_date=bindparam("b_next_date"),
+        updated_at=bindparam("b_updated_at"),
+    )
+)
+
+def _write_batch(db: Session, rows: List[dict], states: List[dict]) -> int:
+    """Grava o lote numa transação: um INSERT multi-linha, o avanço das recorrências, o rollup e os orçamentos."""
+    inserted = _insert_ignoring_duplicates(db, rows) if rows else 0
+    if inserted != len(rows):
+        # Parte do lote já existia (outra instância chegou antes): refaz linha a linha para
+        # contar no rollup e nos orçamentos só as despesas realmente criadas agora
+        db.rollback()
+        new_rows = [row for row in rows if _insert_ignoring_duplicates(db, [row])]
+    else:
+        new_rows = rows
+    db.execute(_ADVANCE, states)
+    deltas = rollups.new_deltas()
+    for row in new_rows:
+        budgets.add_contribution(deltas, row, +1)
+        mark_user_dirty(db, row["user_id"])
+    rollups.apply_deltas(db.connection(), rollups.by_month(deltas))
+    budgets.apply_deltas(db.connection(), deltas)
+    db.commit()
+    return len(new_rows)
+
+def materialize_due(
+    db: Session,
+    today: Optional[dt.date] = None,
+    batch_size: int = settings.RECURRING_BATCH_SIZE,
+    max_catch_up: int = settings.RECURRING_MAX_CATCH_UP,
+    skip_users: Collection[int] = (),
+) -> int:
+    """Lança em `expenses` (PLANNED) todas as ocorrências vencidas até `today`; retorna quantas foram criadas.
+
+    Percorre as recorrências vencidas em lotes por (next_date, id), com um commit por lote. Uma recorrência
+    com mais de `max_catch_up` ocorrências atrasadas avança em partes e volta mais adiante na mesma
+    varredura (com o next_date novo). Idempotente: o estado de cada recorrência avança na mesma transação
+    das despesas e (recurring_id, occurrence) é único. Recorrências de `skip_users` (usuários mudando de
+    shard) ficam para a próxima execução.
+    """
+    today = today or dt.date.today()
+    created, after = 0, (dt.date.min, 0)
+    while True:
+        schedules = _due_batch(db, today, after, batch_size, skip_users)
+        if not schedules:
+            return created
+        rows, states = plan_batch(schedules, today, max_catch_up, dt.datetime.utcnow())
+        created += _write_batch(db, rows, states)
+        after = (schedules[-1].next_date, schedules[-1].id)
+
+# ===== Agendador =====
+
+class RecurringScheduler:
+    """Thread que roda materialize_due na subida e depois a cada `interval` segundos (recupera períodos perdidos)."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        from app.db.shards import shard_router
+
+        started = time.perf_counter()
+        created = 0
+        moving = shard_router.moving_users()
+        for shard in shard_router.shards:
+            with shard.session() as db:
+                created += materialize_due(db, skip_users=moving)
+        RUN_DURATION.observe(time.perf_counter() - started)
+        MATERIALIZED.inc(amount=created)
+        if created:
+            log.info("materialized %d recurring expenses in %.2fs", created, time.perf_counter() - started)
+        return created
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run_once()
+            except Exception:  # a próxima execução retoma de onde o banco parou
+                log.exception("recurring scheduler run failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> None:
+        if self._thread is None and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="recurring-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+recurring_scheduler = RecurringScheduler(settings.RECURRING_SCHEDULER_SECONDS)
+
+def main(argv=None) -> int:
+    from app.db.shards import shard_router
+
+    parser = argparse.ArgumentParser(description="Lança em expenses as ocorrências vencidas das despesas recorrentes.")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--today", type=dt.date.fromisoformat, default=None, help="Data de corte (padrão: hoje).")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    created = 0
+    moving = shard_router.moving_users()
+    for shard in shard_router.shards:
+        with shard.session() as db:
+            created += materialize_due(db, args.today, skip_users=moving)
+    print(f"{created} recurring expenses materialized in {time.perf_counter() - started:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
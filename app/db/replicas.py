@@ -0,0 +1,174 @@
+import itertools
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.admission import pool_pressure
+from app.core.config import settings
+from app.core.metrics import GaugeFunc, instrument_engine
+from app.db.engine import async_url, pool_options
+from app.db.shards import shard_router
+
+log = logging.getLogger("app.db.replicas")
+
+POLICIES = ("round_robin", "least_connections")
+
+# ===== Réplicas =====
+
+class Replica:
+    def __init__(self, index: int, url: str):
+        self.name = f"replica{index}"
+        self.engine: Engine = create_engine(url, pool_pre_ping=True, **pool_options(url))
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_engine = None
+        self.async_session_factory = None
+        if settings.ASYNC_DB:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            _url = async_url(url)
+            self.async_engine = create_async_engine(_url, pool_pre_ping=True, **pool_options(_url))
+            self.async_session_factory = async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+        self.healthy = True
+
+    def checked_out(self) -> int:
+        engine = self.async_engine.sync_engine if self.async_engine is not None else self.engine
+        return engine.pool.checkedout()
+
+    def probe(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                # Lê uma página da tabela principal: além de conectividade, confirma que o schema está lá
+                conn.execute(text("SELECT 1 FROM expenses LIMIT 1"))
+            return True
+        except Exception as exc:  # qualquer falha tira a réplica de rotação até o próximo probe
+            log.warning("replica %s failed health check: %s", self.name, exc)
+            return False
+
+class ReplicaSet:
+    """Réplicas de leitura com escolha round-robin ou por menos conexões em uso.
+
+    Um thread de health check testa cada réplica a cada `health_interval` segundos; réplicas com falha
+    saem da rotação até voltarem a responder. Sem réplica saudável, as leituras vão para o primário.
+    """
+
+    def __init__(self, urls: List[str], policy: str, health_interval: float):
+        if policy not in POLICIES:
+            raise ValueError(f"REPLICA_POLICY must be one of: {', '.join(POLICIES)}")
+        self.replicas = [Replica(i, url) for i, url in enumerate(urls)]
+        self.policy = policy
+        self.health_interval = health_interval
+        self._counter = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def pick(self) -> Optional[Replica]:
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        if self.policy == "least_connections":
+            return min(healthy, key=Replica.checked_out)
+        return healthy[next(self._counter) % len(healthy)]
+
+    def check_health(self) -> None:
+        for replica in self.replicas:
+            ok = replica.probe()
+            if ok != replica.healthy:
+                log.warning("replica %s is now %s", replica.name, "healthy" if ok else "unhealthy")
+            replica.healthy = ok
+
+    def _run_health_checks(self) -> None:
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def start(self) -> None:
+        if self._thread is None and self.health_interval > 0:
+            self._thread = threading.Thread(target=self._run_health_checks, name="replica-health", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+replica_set: Optional[ReplicaSet] = None
+if settings.DATABASE_REPLICA_URLS:
+    replica_set = ReplicaSet(
+        settings.DATABASE_REPLICA_URLS, settings.REPLICA_POLICY, settings.REPLICA_HEALTH_CHECK_SECONDS
+    )
+    for _replica in replica_set.replicas:
+        _engine = _replica.async_engine.sync_engine if _replica.async_engine is not None else _replica.engine
+        if settings.METRICS_ENABLED:
+            instrument_engine(_engine, _replica.name)
+        pool_pressure.watch(_engine)
+    GaugeFunc(
+        "db_replica_healthy", "Réplica em rotação (1) ou fora por falha no health check (0).", ("engine",),
+        lambda: {(r.name,): int(r.healthy) for r in replica_set.replicas},
+    )
+
+# ===== Read-your-writes =====
+
+class RecentWriters:
+    """Usuários que escreveram há menos de `window` segundos: suas leituras ficam no primário.
+
+    O registro é por processo; com várias instâncias atrás de um balanceador sem afinidade, a janela
+    vale só na instância que recebeu a escrita.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._until[user_id] = now + self.window
+            if len(self._until) > 10000:
+                self._until = {u: t for u, t in self._until.items() if t > now}
+
+    def is_recent(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+recent_writers = RecentWriters(settings.REPLICA_STICKY_SECONDS)
+
+# Sessões do primário guardam o usuário autenticado (deps.get_current_user); qualquer commit
+# dessa sessão abre a janela de leitura no primário para ele.
+SESSION_USER_KEY = "user_id"
+
+@event.listens_for(Session, "after_commit")
+def _stick_writer_to_primary(session: Session) -> None:
+    user_id = session.info.get(SESSION_USER_KEY)
+    if user_id is not None:
+        recent_writers.mark(user_id)
+
+# ===== Sessões de leitura =====
+
+def _read_replica(user_id: Optional[int]) -> Optional[Replica]:
+    if replica_set is None or (user_id is not None and recent_writers.is_recent(user_id)):
+        return None
+    return replica_set.pick()
+
+@contextmanager
+def read_session(user_id: Optional[int] = None):
+    """Sessão para consultas somente leitura no shard do usuário: réplica (só o shard 0 tem réplicas), ou o
+    primário logo após uma escrita do usuário."""
+    shard = shard_router.shard(shard_router.locate(user_id).shard if user_id is not None else 0)
+    replica = _read_replica(user_id) if shard.index == 0 else None
+    db = (replica.session_factory if replica else shard.session_factory)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def async_read_session(user_id: Optional[int] = None):
+    shard = shard_router.shard((await shard_router.locate_async(user_id)).shard if user_id is not None else 0)
+    replica = _read_replica(user_id) if shard.index == 0 else None
+    async with (replica.async_session_factory if replica else shard.async_session_factory)() as db:
+        yield db
@@ -0,0 +1,287 @@
+import datetime as dt
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Date, and_, extract, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from app.db import archive
+from app.db.fx import FxTable
+from app.db.models import Category, ExpenseMonthlyRollup
+
+TIME_GRAINS = ("day", "week", "month", "year")
+DIMENSIONS = TIME_GRAINS + ("category", "payment_method", "status", "currency")
+REPORT_COLUMNS = ("id", "user_id", "date", "amount", "currency", "status", "category_id", "payment_method")
+
+# ===== Expressões por dialeto =====
+
+class week_start(FunctionElement):
+    """Segunda-feira da semana (ISO) de uma data."""
+    type = Date()
+    inherit_cache = True
+    name = "week_start"
+
+@compiles(week_start)
+def _week_start_mysql(element, compiler, **kw):
+    arg = compiler.process(element.clauses, **kw)
+    return f"DATE_SUB({arg}, INTERVAL WEEKDAY({arg}) DAY)"
+
+@compiles(week_start, "sqlite")
+def _week_start_sqlite(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)}, 'weekday 0', '-6 days')"
+
+@compiles(week_start, "postgresql")
+def _week_start_pg(element, compiler, **kw):
+    return f"CAST(date_trunc('week', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+# ===== Especificação do relatório =====
+
+def half_open_range(
+    start: Optional[dt.date], end: Optional[dt.date], year: Optional[int]
+) -> Tuple[Optional[dt.date], Optional[dt.date]]:
+    """Converte (start, end inclusivo, year) em [lo, hi): comparações diretas em `date`, que usam os índices."""
+    lo, hi = start, (end + dt.timedelta(days=1)) if end else None
+    if year:
+        y_lo, y_hi = dt.date(year, 1, 1), dt.date(year + 1, 1, 1)
+        lo = max(lo, y_lo) if lo else y_lo
+        hi = min(hi, y_hi) if hi else y_hi
+    return lo, hi
+
+class ReportSpec:
+    """Agrupamento + filtros de um relatório sobre as despesas de um usuário.
+
+    Sem `status`, despesas CANCELLED ficam de fora (mesma regra dos relatórios originais).
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        group_by: Sequence[str],
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+        year: Optional[int] = None,
+        category_id: Optional[int] = None,
+        payment_method: Optional[str] = None,
+        status: Optional[str] = None,
+        currency: Optional[str] = None,
+        order_by_total: bool = False,
+        base_currency: Optional[str] = None,
+    ):
+        unknown = [d for d in group_by if d not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown group_by dimension(s): {', '.join(unknown)}")
+        if len([d for d in group_by if d in TIME_GRAINS]) > 1:
+            raise ValueError("Use at most one time grain (day, week, month or year) in group_by")
+        self.user_id = user_id
+        self.group_by = list(dict.fromkeys(group_by))
+        self.lo, self.hi = half_open_range(start, end, year)
+        self.category_id = category_id
+        self.payment_method = payment_method
+        self.status = status
+        self.currency = currency
+        self.order_by_total = order_by_total
+        self.base_currency = base_currency.upper() if base_currency else None
+
+    @property
+    def grain(self) -> Optional[str]:
+        return next((d for d in self.group_by if d in TIME_GRAINS), None)
+
+    def rollup_compatible(self) -> bool:
+        """O rollup mensal responde quando só há ano/mês/moeda e o intervalo cai em limites de mês."""
+        return (
+            set(self.group_by) <= {"year", "month", "currency"}
+            and self.status is None
+            and self.category_id is None
+            and self.payment_method is None
+            and self.base_currency is None
+            and all(d is None or d.day == 1 for d in (self.lo, self.hi))
+        )
+
+# ===== Planejamento =====
+
+class Report:
+    """Monta o SELECT de um ReportSpec e converte as linhas do resultado em dicts.
+
+    Com `base_currency`, o banco agrupa por dia e moeda de origem; as linhas são convertidas em lote
+    pelas cotações (FxTable) e reagregadas aqui no grão pedido.
+    """
+
+    def __init__(self, spec: ReportSpec, include_archive: bool = False):
+        self.spec = spec
+        self.include_archive = include_archive
+        self.uses_rollup = spec.rollup_compatible()
+        self.converts = spec.base_currency is not None
+        self._keys: List[str] = []
+        self.statement = self._rollup_statement() if self.uses_rollup else self._expenses_statement()
+
+    @property
+    def archive_probe(self):
+        """Consulta que diz se o período alcança despesas arquivadas (o rollup já as inclui)."""
+        if self.uses_rollup or self.include_archive:
+            return None
+        return archive.overlap_statement(self.spec.user_id, self.spec.lo, self.spec.hi)
+
+    def with_archive(self) -> "Report":
+        return Report(self.spec, include_archive=True)
+
+    def _time_columns(self, year_col, month_col, date_col=None) -> list:
+        grain = self.spec.grain
+        if grain == "year":
+            self._keys += ["year"]
+            return [year_col]
+        if grain == "month":
+            self._keys += ["year", "month"]
+            return [year_col, month_col]
+        if grain == "day":
+            self._keys += ["period"]
+            return [date_col]
+        if grain == "week":
+            self._keys += ["period"]
+            return [week_start(date_col)]
+        return []
+
+    def _finish(self, stmt, cols: list, total, count):
+        stmt = stmt.add_columns(*cols, total.label("total_amount"), count.label("expense_count"))
+        if cols:
+            stmt = stmt.group_by(*cols)
+        order = [total.desc()] if self.spec.order_by_total and not self.converts else cols
+        return stmt.order_by(*order) if order else stmt
+
+    def _conditions(self, t) -> list:
+        spec = self.spec
+        conds = [t.c.user_id == spec.user_id]
+        if spec.lo:
+            conds.append(t.c.date >= spec.lo)
+        if spec.hi:
+            conds.append(t.c.date < spec.hi)
+        conds.append(t.c.status == spec.status if spec.status else t.c.status != "CANCELLED")
+        if spec.category_id is not None:
+            conds.append(t.c.category_id == spec.category_id)
+        if spec.payment_method:
+            conds.append(t.c.payment_method == spec.payment_method)
+        if spec.currency:
+            conds.append(t.c.currency == spec.currency)
+        return conds
+
+    def _expenses_statement(self):
+        spec = self.spec
+        src, conds = archive.expense_source(self._conditions, self.include_archive, REPORT_COLUMNS)
+        e = src.c
+        if self.converts:
+            cols = [e.date, e.currency]
+            self._keys += ["_date", "_currency"]
+        else:
+            cols = self._time_columns(extract("year", e.date), extract("month", e.date), e.date)
+
+        category_at = None
+        for dim in spec.group_by:
+            if dim == "category":
+                category_at = len(cols)
+                cols.append(e.category_id)
+                self._keys += ["category_id", "category_name"]
+            elif dim in ("payment_method", "status") or (dim == "currency" and not self.converts):
+                cols.append(e[dim])
+                self._keys.append(dim)
+
+        stmt = select().select_from(src)
+        if conds:
+            stmt = stmt.where(and_(*conds))
+        if category_at is None:
+            return self._finish(stmt, cols, func.sum(e.amount), func.count(e.id))
+        return self._by_category(stmt, cols, category_at, func.sum(e.amount), func.count(e.id))
+
+    def _by_category(self, stmt, cols: list, category_at: int, total, count):
+        """Agrega por category_id antes do LEFT JOIN em categories: o nome é buscado uma vez por grupo, não
+        por despesa, e sem um período a soma sai só de idx_expenses_user_category."""
+        labels = [f"g{i}" for i in range(len(cols))]
+        grouped = (
+            stmt.add_columns(
+                *(c.label(label) for c, label in zip(cols, labels)),
+                total.label("total_amount"), count.label("expense_count"),
+            )
+            .group_by(*cols)
+            .subquery("grouped")
+        )
+        g = grouped.c
+        outer = [g[label] for label in labels]
+        outer.insert(category_at + 1, Category.name)
+        stmt = select(*outer, g.total_amount, g.expense_count).select_from(
+            grouped.outerjoin(Category, Category.id == g[labels[category_at]])
+        )
+        order = [g.total_amount.desc()] if self.spec.order_by_total and not self.converts else outer
+        return stmt.order_by(*order)
+
+    def _rollup_statement(self):
+        spec = self.spec
+        r = ExpenseMonthlyRollup
+        cols = self._time_columns(r.year, r.month)
+        if "currency" in spec.group_by:
+            cols.append(r.currency)
+            self._keys.append("currency")
+        conds = [r.user_id == spec.user_id, r.expense_count > 0]
+        if spec.lo:
+            conds += [r.year >= spec.lo.year, r.year * 100 + r.month >= spec.lo.year * 100 + spec.lo.month]
+        if spec.hi:
+            conds += [r.year <= spec.hi.year, r.year * 100 + r.month < spec.hi.year * 100 + spec.hi.month]
+        if spec.currency:
+            conds.append(r.currency == spec.currency)
+        stmt = select().select_from(r).where(and_(*conds))
+        return self._finish(stmt, cols, func.sum(r.total_amount), func.sum(r.expense_count))
+
+    def rows(self, result, fx: Optional[FxTable] = None) -> List[Dict]:
+        if self.converts:
+            return self._converted_rows(result, fx)
+        out = []
+        for row in result:
+            item = dict(zip(self._keys, row[:len(self._keys)]))
+            for key in ("year", "month"):
+                if key in item:
+                    item[key] = int(item[key])
+            if "period" in item and isinstance(item["period"], str):
+                item["period"] = dt.date.fromisoformat(item["period"])
+            item["total_amount"] = float(row[-2] or 0)
+            item["expense_count"] = int(row[-1] or 0)
+            out.append(item)
+        return out
+
+    def _time_grouping(self) -> Tuple[List[str], Callable[[dt.date], tuple]]:
+        grain = self.spec.grain
+        if grain == "year":
+            return ["year"], lambda day: (day.year,)
+        if grain == "month":
+            return ["year", "month"], lambda day: (day.year, day.month)
+        if grain == "day":
+            return ["period"], lambda day: (day,)
+        if grain == "week":
+            return ["period"], lambda day: (day - dt.timedelta(days=day.weekday()),)
+        return [], lambda day: ()
+
+    def _converted_rows(self, result, fx: FxTable) -> List[Dict]:
+        spec = self.spec
+        raw = list(result)
+        amounts = fx.convert(
+            [r[0] for r in raw], [r[1] for r in raw], [float(r[-2] or 0) for r in raw], spec.base_currency
+        )
+        time_keys, time_of = self._time_grouping()
+        end = len(self._keys)
+        groups: Dict[tuple, list] = {}
+        for row, amount in zip(raw, amounts):
+            key = time_of(row[0]) + tuple(row[2:end])
+            acc = groups.get(key)
+            if acc is None:
+                groups[key] = acc = [0.0, 0]
+            acc[0] += amount
+            acc[1] += row[-1]
+
+        # Mesma ordem do ORDER BY das colunas agrupadas (NULL primeiro, como no MySQL/SQLite)
+        ordered = sorted(groups.items(), key=lambda kv: [(v is not None, v) for v in kv[0]])
+        if spec.order_by_total:
+            ordered.sort(key=lambda kv: kv[1][0], reverse=True)
+        names = time_keys + self._keys[2:]
+        out = []
+        for key, (total, count) in ordered:
+            item = dict(zip(names, key))
+            if "currency" in spec.group_by:
+                item["currency"] = spec.base_currency
+            item["total_amount"] = round(total, 2)
+            item["expense_count"] = int(count)
+            out.append(item)
+        return out
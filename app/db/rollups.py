@@ -0,0 +1,211 @@
+import argparse
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import case, delete, event, extract, func, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.db import archive
+from app.db.models import Expense, ExpenseMonthlyRollup
+
+RollupKey = Tuple[int, int, int, str]
+Deltas = Dict[RollupKey, list]
+
+def _counts(status) -> bool:
+    return getattr(status, "value", status) != "CANCELLED"
+
+def add_contribution(deltas: Deltas, row, sign: int) -> None:
+    """Acumula em `deltas` a contribuição (+1/-1) de uma despesa (objeto ou dict) para o rollup."""
+    get = row.get if isinstance(row, dict) else lambda k: getattr(row, k)
+    if not _counts(get("status")) or get("date") is None:
+        return
+    d = get("date")
+    delta = deltas[(get("user_id"), d.year, d.month, get("currency"))]
+    delta[0] += sign * float(get("amount"))
+    delta[1] += sign
+
+def new_deltas() -> Deltas:
+    return defaultdict(lambda: [0.0, 0])
+
+def apply_deltas(conn: Connection, deltas: Deltas) -> None:
+    """Aplica os deltas com upsert (INSERT ... ON DUPLICATE KEY / ON CONFLICT) no dialeto do banco."""
+    rows = [
+        {"user_id": k[0], "year": k[1], "month": k[2], "currency": k[3], "total_amount": a, "expense_count": c}
+        for k, (a, c) in deltas.items() if a or c
+    ]
+    if not rows:
+        return
+    table = ExpenseMonthlyRollup.__table__
+    dialect = conn.dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as upsert
+        stmt = upsert(table)
+        stmt = stmt.on_duplicate_key_update(
+            total_amount=table.c.total_amount + stmt.inserted.total_amount,
+            expense_count=table.c.expense_count + stmt.inserted.expense_count,
+        )
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.year, table.c.month, table.c.currency],
+            set_={
+                "total_amount": table.c.total_amount + stmt.excluded.total_amount,
+                "expense_count": table.c.expense_count + stmt.excluded.expense_count,
+            },
+        )
+    conn.execute(stmt, rows)
+
+def _previous_state(obj: Expense) -> dict:
+    state = inspect(obj)
+    old = {}
+    for attr in ("user_id", "date", "currency", "amount", "status", "category_id"):
+        hist = state.attrs[attr].history
+        if hist.deleted:
+            old[attr] = hist.deleted[0]
+        else:
+            old[attr] = getattr(obj, attr)
+    return old
+
+# Toda escrita de Expense via ORM (sync ou async) passa por aqui, dentro da transação do flush.
+# Escritas em massa via Core (ex.: importação) devem chamar add_contribution/apply_deltas.
+@event.listens_for(Session, "after_flush")
+def _maintain_rollups(session: Session, flush_context) -> None:
+    deltas = new_deltas()
+    for obj in session.new:
+        if isinstance(obj, Expense):
+            add_contribution(deltas, obj, +1)
+    for obj in session.deleted:
+        if isinstance(obj, Expense):
+            add_contribution(deltas, _previous_state(obj), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Expense) and session.is_modified(obj, include_collections=False):
+            add_contribution(deltas, _previous_state(obj), -1)
+            add_contribution(deltas, obj, +1)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+# ===== Escritas em massa (UPDATE/DELETE set-based, fora do ORM) =====
+
+def bulk_change_deltas(session: Session, conditions: list, changes: Optional[dict] = None) -> Deltas:
+    """Deltas por (usuário, ano, mês, moeda, categoria) para um UPDATE (changes) ou DELETE (changes=None).
+
+    Uma única agregação por (ano, mês, moeda, categoria, cancelada?) antes da escrita basta: os novos
+    valores são constantes do UPDATE, então a nova contribuição de cada grupo é calculada sem reler as
+    linhas. Serve ao rollup (via by_month) e aos orçamentos. Deve rodar na mesma transação e antes
+    do UPDATE/DELETE.
+    """
+    cancelled = case((Expense.status == "CANCELLED", 1), else_=0)
+    year, month = extract("year", Expense.date), extract("month", Expense.date)
+    group = (Expense.user_id, year, month, Expense.currency, Expense.category_id, cancelled)
+    stmt = select(*group, func.sum(Expense.amount), func.count()).where(*conditions).group_by(*group)
+    deltas = new_deltas()
+    for user_id, y, m, currency, category_id, was_cancelled, total, count in session.execute(stmt):
+        y, m, count = int(y), int(m), int(count)
+        if not was_cancelled:
+            delta = deltas[(user_id, y, m, currency, category_id)]
+            delta[0] -= float(total)
+            delta[1] -= count
+        if changes is None:
+            continue
+        status = changes.get("status", "CANCELLED" if was_cancelled else None)
+        if not _counts(status):
+            continue
+        new_date = changes.get("date")
+        key = (
+            user_id,
+            new_date.year if new_date else y,
+            new_date.month if new_date else m,
+            changes.get("currency") or currency,
+            changes["category_id"] if "category_id" in changes else category_id,
+        )
+        delta = deltas[key]
+        delta[0] += float(changes["amount"]) * count if changes.get("amount") is not None else float(total)
+        delta[1] += count
+    return deltas
+
+def by_month(deltas: Deltas) -> Deltas:
+    """Soma deltas por categoria (bulk_change_deltas) nas chaves do rollup mensal."""
+    monthly = new_deltas()
+    for key, (amount, count) in deltas.items():
+        delta = monthly[key[:4]]
+        delta[0] += amount
+        delta[1] += count
+    return monthly
+
+# ===== Reconstrução / verificação =====
+
+def _raw_aggregate(user_id: Optional[int]):
+    def where(t) -> list:
+        conds = [t.c.status != "CANCELLED"]
+        if user_id is not None:
+            conds.append(t.c.user_id == user_id)
+        return conds
+
+    # O rollup também cobre as despesas arquivadas
+    src, _ = archive.expense_source(where, True, ("user_id", "date", "amount", "currency", "status"))
+    e = src.c
+    year, month = extract("year", e.date), extract("month", e.date)
+    return (
+        select(e.user_id, year, month, e.currency, func.sum(e.amount), func.count())
+        .group_by(e.user_id, year, month, e.currency)
+    )
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+    purge = delete(ExpenseMonthlyRollup)
+    if user_id is not None:
+        purge = purge.where(ExpenseMonthlyRollup.user_id == user_id)
+    db.execute(purge)
+    cols = ["user_id", "year", "month", "currency", "total_amount", "expense_count"]
+    result = db.execute(insert(ExpenseMonthlyRollup).from_select(cols, _raw_aggregate(user_id)))
+    db.commit()
+    return result.rowcount
+
+def check(db: Session, user_id: Optional[int] = None, tolerance: float = 0.005) -> Iterable[tuple]:
+    """Retorna as divergências (chave, esperado, no rollup) entre o rollup e o agregado bruto."""
+    expected = {
+        (int(u), int(y), int(m), c): (float(t), int(n)) for u, y, m, c, t, n in db.execute(_raw_aggregate(user_id))
+    }
+    stmt = select(ExpenseMonthlyRollup).where(ExpenseMonthlyRollup.expense_count != 0)
+    if user_id is not None:
+        stmt = stmt.where(ExpenseMonthlyRollup.user_id == user_id)
+    actual = {
+        (r.user_id, r.year, r.month, r.currency): (float(r.total_amount), r.expense_count)
+        for r in db.execute(stmt).scalars()
+    }
+    mismatches = []
+    for key in sorted(expected.keys() | actual.keys()):
+        exp, act = expected.get(key, (0.0, 0)), actual.get(key, (0.0, 0))
+        if exp[1] != act[1] or abs(exp[0] - act[0]) > tolerance:
+            mismatches.append((key, exp, act))
+    return mismatches
+
+def main(argv=None) -> int:
+    from app.db.shards import shard_router
+
+    parser = argparse.ArgumentParser(description="Reconstrói ou verifica expense_monthly_rollups.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--user-id", type=int, default=None, help="Restringe a um usuário.")
+    args = parser.parse_args(argv)
+    shards = shard_router.shards_for(args.user_id)
+    if args.command == "rebuild":
+        rebuilt = 0
+        for shard in shards:
+            with shard.session() as db:
+                rebuilt += rebuild(db, args.user_id)
+        print(f"{rebuilt} rollup rows rebuilt")
+        return 0
+    mismatches = []
+    for shard in shards:
+        with shard.session() as db:
+            mismatches += check(db, args.user_id)
+    for key, exp, act in mismatches:
+        print(f"{key}: expected total={exp[0]:.2f} count={exp[1]}, rollup total={act[0]:.2f} count={act[1]}")
+    print("rollups consistent" if not mismatches else f"{len(mismatches)} mismatching rollup rows")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
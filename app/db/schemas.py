@@ -3,6 +3,7 @@ from typing import Optional, List
 from enum import Enum
 from sqlmodel import SQLModel, Field
 from pydantic import ConfigDict  # <- pydantic v2
+from app.db.models import RecurrenceFrequency
 
 # ===== Auth / User =====
 class UserCreate(SQLModel):
@@ -101,6 +102,119 @@ class ExpenseUpdate(SQLModel):
 class ExpenseRead(ExpenseBase):
     id: int
 
+# ---- Operações em lote ----
+class ExpenseFilterSet(SQLModel):
+    start: Optional[dt.date] = Field(default=None, description="Data inicial (inclusiva).")
+    end: Optional[dt.date] = Field(default=None, description="Data final (inclusiva).")
+    category_id: Optional[int] = Field(default=None, description="Filtra por ID de categoria.")
+    status: Optional[ExpenseStatus] = Field(default=None, description="Filtra por status.")
+    min: Optional[float] = Field(default=None, description="Valor mínimo.")
+    max: Optional[float] = Field(default=None, description="Valor máximo.")
+
+class ExpenseBatchSelector(SQLModel):
+    ids: Optional[List[int]] = Field(default=None, max_length=10000, description="IDs explícitos das despesas.")
+    filters: Optional[ExpenseFilterSet] = Field(default=None, description="Mesmos filtros de `GET /expenses`.")
+
+class ExpenseBatchUpdate(ExpenseBatchSelector):
+    changes: ExpenseUpdate = Field(description="Campos a alterar em todas as despesas selecionadas.")
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "filters": {"start": "2025-10-01", "end": "2025-10-31", "status": "PLANNED"},
+            "changes": {"status": "PAID", "paid_at": "2025-10-31T18:00:00"}
+        }
+    })
+
+class ExpenseBatchResult(SQLModel):
+    affected: int = Field(description="Quantidade de despesas afetadas.")
+
+# ---- Importação em massa ----
+class ImportRowError(SQLModel):
+    row: int = Field(description="Número da linha no arquivo enviado.")
+    error: str = Field(description="Motivo da rejeição da linha.")
+
+class ImportReport(SQLModel):
+    inserted: int = Field(description="Quantidade de despesas gravadas.")
+    failed: int = Field(description="Quantidade de linhas rejeitadas.")
+    errors: List[ImportRowError] = Field(default_factory=list, description="Erros por linha.")
+
+# ===== Recurring expense =====
+class RecurringExpenseBase(SQLModel):
+    category_id: Optional[int] = Field(default=None, description="ID da categoria (opcional).")
+    amount: float = Field(description="Valor de cada ocorrência (ou parcela).")
+    currency: str = Field(default="BRL", description="Moeda (ISO 4217).")
+    description: Optional[str] = Field(default=None, description="Descrição copiada para cada despesa gerada.")
+    payment_method: PaymentMethod = Field(default=PaymentMethod.CARD, description="Meio de pagamento.")
+
+class RecurringExpenseCreate(RecurringExpenseBase):
+    frequency: RecurrenceFrequency = Field(
+        description="MONTHLY (mesmo dia todo mês), WEEKLY (a cada 7 dias) ou INSTALLMENTS (N parcelas mensais)."
+    )
+    start_date: dt.date = Field(description="Data da primeira ocorrência (YYYY-MM-DD).")
+    end_date: Optional[dt.date] = Field(default=None, description="Última data possível (inclusiva, opcional).")
+    installments: Optional[int] = Field(default=None, description="Número de parcelas (obrigatório em INSTALLMENTS).")
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "category_id": 1,
+            "amount": 1800.00,
+            "currency": "BRL",
+            "description": "Aluguel",
+            "payment_method": "PIX",
+            "frequency": "MONTHLY",
+            "start_date": "2025-10-05"
+        }
+    })
+
+class RecurringExpenseUpdate(SQLModel):
+    category_id: Optional[int] = Field(default=None, description="Novo ID da categoria (opcional).")
+    amount: Optional[float] = Field(default=None, description="Novo valor das próximas ocorrências.")
+    currency: Optional[str] = Field(default=None, description="Nova moeda ISO 4217.")
+    description: Optional[str] = Field(default=None, description="Nova descrição.")
+    payment_method: Optional[PaymentMethod] = Field(default=None, description="Novo meio de pagamento.")
+    end_date: Optional[dt.date] = Field(default=None, description="Nova data final (encerra a recorrência).")
+
+class RecurringExpenseRead(RecurringExpenseBase):
+    id: int
+    frequency: RecurrenceFrequency
+    start_date: dt.date
+    end_date: Optional[dt.date] = None
+    installments: Optional[int] = None
+    occurrences_created: int = Field(description="Ocorrências já lançadas em `expenses`.")
+    next_date: Optional[dt.date] = Field(default=None, description="Próxima ocorrência a lançar (nulo = encerrada).")
+
+# ===== Budget =====
+class BudgetCreate(SQLModel):
+    category_id: Optional[int] = Field(default=None, description="Categoria do orçamento (nulo = todas).")
+    year: int = Field(description="Ano do orçamento.")
+    month: int = Field(description="Mês do orçamento (1-12).")
+    currency: str = Field(default="BRL", description="Moeda (ISO 4217); só despesas nessa moeda contam.")
+    limit_amount: float = Field(description="Limite de gasto no mês.")
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {"category_id": 1, "year": 2025, "month": 10, "currency": "BRL", "limit_amount": 1500.00}
+    })
+
+class BudgetUpdate(SQLModel):
+    limit_amount: float = Field(description="Novo limite de gasto no mês.")
+
+class BudgetRead(BudgetCreate):
+    id: int
+    spent: float = Field(description="Gasto acumulado no mês (despesas não canceladas).")
+
+class BudgetStatus(BudgetRead):
+    category_name: Optional[str] = None
+    remaining: float = Field(description="Limite menos o gasto (negativo quando estourado).")
+    percent_used: float = Field(description="Gasto em % do limite.")
+
+class BudgetEventRead(SQLModel):
+    id: int = Field(description="Use o maior `id` recebido como `after_id` na próxima consulta.")
+    budget_id: int
+    threshold: int = Field(description="Limiar atingido, em % do limite (ex.: 80, 100).")
+    spent: float
+    limit_amount: float
+    created_at: dt.datetime
+
 # ---- Schemas de relatório (saída) ----
 class MonthlyTotal(SQLModel):
     year: int
@@ -112,3 +226,72 @@ class CategorySum(SQLModel):
     category_id: Optional[int]
     category_name: Optional[str]
     total_amount: float
+
+class ReportDimension(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
+    CATEGORY = "category"
+    PAYMENT_METHOD = "payment_method"
+    STATUS = "status"
+    CURRENCY = "currency"
+
+class SeriesPoint(SQLModel):
+    date: dt.date
+    amount: float = Field(description="Gasto do dia.")
+    cumulative: float = Field(description="Gasto acumulado desde `start`.")
+    avg_7d: float = Field(description="Média diária dos 7 dias terminando neste.")
+    avg_30d: float = Field(description="Média diária dos 30 dias terminando neste.")
+
+class MonthOverMonth(SQLModel):
+    year: int
+    month: int
+    total_amount: float = Field(description="Total do mês (o último, até `end`).")
+    delta: float = Field(description="Diferença para o mês anterior.")
+    delta_pct: Optional[float] = Field(default=None, description="Diferença em % do mês anterior (nulo se ele foi 0).")
+
+class MonthEndProjection(SQLModel):
+    year: int
+    month: int
+    month_to_date: float = Field(description="Gasto do mês de `end` até `end`.")
+    days_elapsed: int
+    days_in_month: int
+    projected_total: float = Field(description="Total projetado para o fim do mês (tendência linear do acumulado).")
+
+class ExpenseSeries(SQLModel):
+    currency: str
+    start: dt.date
+    end: dt.date
+    days: List[SeriesPoint]
+    months: List[MonthOverMonth]
+    projection: MonthEndProjection
+
+class SummaryRow(SQLModel):
+    period: Optional[dt.date] = Field(default=None, description="Início do bucket (agrupamentos `day`/`week`).")
+    year: Optional[int] = Field(default=None, description="Ano (agrupamentos `month`/`year`).")
+    month: Optional[int] = Field(default=None, description="Mês (agrupamento `month`).")
+    category_id: Optional[int] = None
+    category_name: Optional[str] = None
+    payment_method: Optional[PaymentMethod] = None
+    status: Optional[ExpenseStatus] = None
+    currency: Optional[str] = None
+    total_amount: float
+    expense_count: int
+
+# ---- Dashboard (saída) ----
+class DashboardSection(str, Enum):
+    ME = "me"
+    CATEGORIES = "categories"
+    EXPENSES = "expenses"
+    MONTHLY = "monthly"
+    BY_CATEGORY = "by_category"
+
+class Dashboard(SQLModel):
+    """Seções pedidas em `include`; as demais ficam de fora da resposta."""
+    me: Optional[UserRead] = None
+    categories: Optional[List[CategoryRead]] = None
+    expenses: Optional[List[ExpenseRead]] = Field(default=None, description="Primeira página de GET /expenses.")
+    expenses_next_cursor: Optional[str] = Field(default=None, description="Cursor da segunda página, se houver.")
+    monthly: Optional[List[MonthlyTotal]] = None
+    by_category: Optional[List[CategorySum]] = None
@@ -0,0 +1,97 @@
+import argparse
+import re
+import sys
+from typing import Dict, List
+from sqlalchemy import Float, Integer, func, literal, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.schema import Table
+from app.db.models import FTS_TABLES, SQLITE_FTS_DDL, SQLITE_FTS_DROP, Expense
+
+# Busca textual na descrição de expenses e de expenses_archive (cada tabela com o próprio índice):
+#   MySQL  → índices FULLTEXT ft_expenses_description e ft_expenses_archive_description (scripts/ddl.sql),
+#            MATCH ... AGAINST em BOOLEAN MODE
+#   SQLite → tabelas FTS5 `<tabela>_fts` (external content) mantidas por triggers (app/db/models.py)
+#   outros → sem índice: varredura das despesas do usuário com LIKE (funciona, mas não escala nem ordena por relevância)
+# Os termos são combinados com AND e casam por prefixo ("super" encontra "supermercado"). A subquery já vem
+# restrita ao usuário: termos comuns a muitos usuários não fazem cada busca percorrer os resultados de todos.
+
+MAX_TERMS = 8
+
+def search_terms(q: str) -> List[str]:
+    return re.findall(r"\w+", q.lower())[:MAX_TERMS]
+
+def _mysql_params(terms: List[str], user_id: int) -> Dict:
+    return {"q": " ".join(f"+{t}*" for t in terms), "uid": user_id}
+
+def _fts5_params(terms: List[str], user_id: int) -> Dict:
+    # O filtro de usuário vai na própria expressão MATCH, sobre a coluna user_id do índice
+    return {"q": f'user_id:"{user_id}" AND description:(' + " ".join(f'"{t}"*' for t in terms) + ")"}
+
+# ===== Consulta por dialeto =====
+
+# (id, score) das despesas do usuário que casam, com score maior = mais relevante. Uma única passada
+# pelo índice: um score correlacionado por linha re-executaria o MATCH para cada resultado.
+# (`rank` seria o nome natural, mas é palavra reservada no MySQL 8.) `{table}` é expenses ou expenses_archive.
+_HITS_SQL = {
+    "sqlite": (
+        # Peso 0 para a coluna user_id: ela só filtra, não pesa na relevância
+        "SELECT rowid AS id, -bm25({table}_fts, 1.0, 0.0) AS score FROM {table}_fts WHERE {table}_fts MATCH :q",
+        _fts5_params,
+    ),
+    "mysql": (
+        "SELECT id, MATCH (description) AGAINST (:q IN BOOLEAN MODE) AS score FROM {table} "
+        "WHERE MATCH (description) AGAINST (:q IN BOOLEAN MODE) AND user_id = :uid",
+        _mysql_params,
+    ),
+}
+
+def _scan_hits(terms: List[str], user_id: int, table: Table):
+    # Cada termo em qualquer ponto da descrição (mais amplo que o prefixo dos índices); score igual para todos
+    description = func.lower(table.c.description)
+    return (
+        select(table.c.id.label("id"), literal(0.0, Float).label("score"))
+        .where(table.c.user_id == user_id, *(description.contains(t, autoescape=True) for t in terms))
+        .subquery("search_hits")
+    )
+
+def search_hits(q: str, user_id: int, dialect_name: str, table: Table = Expense.__table__):
+    """Subquery (id, score) das despesas de `user_id` em `table` (expenses ou expenses_archive) para fazer JOIN
+    com ela e ordenar por `score`. Os scores de tabelas diferentes vêm de índices diferentes e são só comparáveis
+    aproximadamente."""
+    if dialect_name not in _HITS_SQL:
+        return _scan_hits(search_terms(q), user_id, table)
+    sql, build = _HITS_SQL[dialect_name]
+    return (
+        text(sql.format(table=table.name))
+        .bindparams(**build(search_terms(q), user_id))
+        .columns(id=Integer, score=Float)
+        .subquery("search_hits")
+    )
+
+# ===== Índice FTS5 (SQLite) =====
+
+def rebuild(db: Session) -> None:
+    """Recria e repopula os índices de busca (e os triggers), inclusive os de versões anteriores do schema.
+    No MySQL o FULLTEXT é mantido pelo próprio InnoDB."""
+    if db.get_bind().dialect.name != "sqlite":
+        return
+    for stmt in SQLITE_FTS_DROP + SQLITE_FTS_DDL:
+        db.execute(text(stmt))
+    for table in FTS_TABLES:
+        db.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+    db.commit()
+
+def main(argv=None) -> int:
+    from app.db.shards import shard_router
+
+    parser = argparse.ArgumentParser(description="Reconstrói o índice de busca textual de despesas (SQLite/FTS5).")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args(argv)
+    for shard in shard_router.shards:
+        with shard.session() as db:
+            rebuild(db)
+    print("search index rebuilt")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
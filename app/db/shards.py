@@ -0,0 +1,531 @@
+import argparse
+import datetime as dt
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+from sqlalchemy import create_engine, delete, func, insert, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.schema import Table
+from sqlmodel import SQLModel
+from app.core.admission import pool_pressure
+from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.db.engine import AsyncSessionLocal, SessionLocal, async_engine, async_url, engine, pool_options
+from app.db.models import FxRate, IdSequence, User, UserShard
+
+# Sharding por usuário: nenhuma consulta cruza usuários, então todos os dados de um usuário ficam num shard.
+# O shard 0 é DATABASE_URL e guarda também as tabelas globais; o diretório user_shards diz onde está cada um.
+
+# Tabelas globais: no shard 0 em qualquer sessão, mesmo depois de religada ao shard do usuário
+GLOBAL_MODELS = (User, UserShard, FxRate, IdSequence)
+
+# Chave de Session.info com o shard ao qual a sessão foi religada (deps.get_current_user)
+SHARD_KEY = "shard"
+
+def _global_binds(bind) -> dict:
+    return {model: bind for model in GLOBAL_MODELS}
+
+class Placement(NamedTuple):
+    shard: int
+    move_to: Optional[int] = None
+    move_from: Optional[int] = None
+
+    @property
+    def frozen(self) -> bool:
+        """Dados sendo copiados para outro shard: leituras seguem no atual, escritas esperam o fim da cópia."""
+        return self.move_to is not None
+
+HOME = Placement(0)
+
+# ===== Shards =====
+
+class Shard:
+    def __init__(self, index: int, url: Optional[str] = None):
+        self.index = index
+        self.name = f"shard{index}"
+        if url is None:  # shard 0: as engines de app.db.engine
+            self.engine, self.session_factory = engine, SessionLocal
+            self.async_engine, self.async_session_factory = async_engine, AsyncSessionLocal
+            return
+        self.engine = create_engine(url, pool_pre_ping=True, **pool_options(url))
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine, binds=_global_binds(engine)
+        )
+        watched = [(self.engine, self.name)]
+        self.async_engine = None
+        self.async_session_factory = None
+        if settings.ASYNC_DB:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            self.async_engine = create_async_engine(async_url(url), pool_pre_ping=True, **pool_options(async_url(url)))
+            self.async_session_factory = async_sessionmaker(
+                self.async_engine, autoflush=False, expire_on_commit=False, binds=_global_binds(async_engine)
+            )
+            watched.append((self.async_engine.sync_engine, f"{self.name}_async"))
+        for watched_engine, name in watched:
+            if settings.METRICS_ENABLED:
+                instrument_engine(watched_engine, name)
+            pool_pressure.watch(watched_engine)
+
+    @contextmanager
+    def session(self):
+        db = self.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+# ===== Diretório =====
+
+def directory_statement(user_id: int):
+    return select(UserShard.shard, UserShard.move_to, UserShard.move_from).where(UserShard.user_id == user_id)
+
+class ShardDirectory:
+    """user_id -> Placement lido de user_shards, guardado por `ttl` segundos (LRU de `max_entries`).
+
+    Uma movimentação espera o TTL depois de cada mudança no diretório: nenhum processo continua escrevendo
+    no shard antigo com uma entrada vencida.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Placement]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] <= time.monotonic():
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[0]
+
+    def put(self, user_id: int, row) -> Placement:
+        placement = Placement(*row) if row is not None else HOME
+        with self._lock:
+            self._entries[user_id] = (placement, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return placement
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+# ===== Roteamento =====
+
+class ShardRouter:
+    """Mapeia user_id para o shard dos seus dados (diretório) e escolhe o shard de usuários novos (hashing)."""
+
+    def __init__(self, urls: List[str], directory_ttl: float):
+        self.shards = [Shard(0)] + [Shard(i, url) for i, url in enumerate(urls, start=1)]
+        self.directory = ShardDirectory(directory_ttl)
+        if self.sharded:
+            # Sessões do primário religadas a outro shard continuam lendo users/fx_rates no primário
+            SessionLocal.configure(binds=_global_binds(engine))
+            if AsyncSessionLocal is not None:
+                AsyncSessionLocal.configure(binds=_global_binds(async_engine))
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.shards) > 1
+
+    def shard(self, index: int) -> Shard:
+        if not 0 <= index < len(self.shards):
+            raise RuntimeError(f"shard {index} is not configured in DATABASE_SHARD_URLS")
+        return self.shards[index]
+
+    def place(self, user_id: int) -> int:
+        """Shard de um usuário novo por hashing de rendezvous: vence o maior hash de (usuário, shard).
+
+        Determinístico e uniforme; um shard a mais recebe só a sua fração dos próximos cadastros. Os usuários
+        existentes seguem o diretório (mudam de shard só com `move`).
+        """
+        def score(index: int) -> bytes:
+            return hashlib.blake2b(f"{user_id}:{index}".encode(), digest_size=8).digest()
+
+        return max(range(len(self.shards)), key=score)
+
+    def locate(self, user_id: int, db: Optional[Session] = None) -> Placement:
+        if not self.sharded:
+            return HOME
+        placement = self.directory.get(user_id)
+        if placement is None:
+            if db is None:
+                with SessionLocal() as own:
+                    row = own.execute(directory_statement(user_id)).first()
+            else:
+                row = db.execute(directory_statement(user_id)).first()
+            placement = self.directory.put(user_id, row)
+        return placement
+
+    async def locate_async(self, user_id: int, db: Optional[AsyncSession] = None) -> Placement:
+        if not self.sharded:
+            return HOME
+        placement = self.directory.get(user_id)
+        if placement is None:
+            if db is None:
+                async with AsyncSessionLocal() as own:
+                    row = (await own.execute(directory_statement(user_id))).first()
+            else:
+                row = (await db.execute(directory_statement(user_id))).first()
+            placement = self.directory.put(user_id, row)
+        return placement
+
+    def bind(self, db, placement: Placement) -> None:
+        """Religa a sessão da requisição (aberta no primário) ao shard do usuário; antes da primeira consulta
+        aos dados dele, então nenhuma transação fica pela metade em dois bancos."""
+        db.info[SHARD_KEY] = placement.shard
+        if placement.shard == 0:
+            return
+        shard = self.shard(placement.shard)
+        if isinstance(db, AsyncSession):
+            db.sync_session.bind = shard.async_engine.sync_engine
+        else:
+            db.bind = shard.engine
+
+    def moving_users(self) -> Set[int]:
+        """Usuários com movimentação em curso: as tarefas de fundo dos shards os pulam até o fim dela."""
+        if not self.sharded:
+            return set()
+        stmt = select(UserShard.user_id).where(or_(UserShard.move_to.is_not(None), UserShard.move_from.is_not(None)))
+        with SessionLocal() as db:
+            return set(db.execute(stmt).scalars())
+
+    def shards_for(self, user_id: Optional[int] = None) -> List[Shard]:
+        """Shards em que rodar uma tarefa de manutenção: todos, ou só o do usuário."""
+        if user_id is None:
+            return list(self.shards)
+        return [self.shard(self.locate(user_id).shard)]
+
+    # ----- Cadastro -----
+
+    def assign(self, db: Session, user: User) -> None:
+        """Registra o shard de um usuário recém-criado e cria o espelho dele lá, antes do commit do cadastro."""
+        if not self.sharded:
+            return
+        db.flush()
+        index = self.place(user.id)
+        db.add(UserShard(user_id=user.id, shard=index))
+        if index:
+            with self.shard(index).engine.begin() as conn:
+                ensure_user(conn, mirror_row(user))
+
+    async def assign_async(self, db: AsyncSession, user: User) -> None:
+        if not self.sharded:
+            return
+        await db.flush()
+        index = self.place(user.id)
+        db.add(UserShard(user_id=user.id, shard=index))
+        if index:
+            async with self.shard(index).async_engine.begin() as conn:
+                await conn.run_sync(ensure_user, mirror_row(user))
+
+def mirror_row(user: User) -> dict:
+    """Cópia de `users` nos outros shards, só para as chaves estrangeiras: sem senha (login é sempre no shard 0)."""
+    return {
+        "id": user.id, "email": user.email, "password_hash": "!", "full_name": user.full_name,
+        "is_active": user.is_active, "created_at": user.created_at, "updated_at": user.updated_at,
+    }
+
+def ensure_user(conn: Connection, row: dict) -> None:
+    users = User.__table__
+    if conn.execute(select(users.c.id).where(users.c.id == row["id"])).first() is None:
+        conn.execute(insert(users), row)
+
+shard_router = ShardRouter(settings.DATABASE_SHARD_URLS, settings.SHARD_DIRECTORY_TTL_SECONDS)
+
+# ===== Ids globais =====
+
+SEQUENCES = IdSequence.__table__
+
+def _max_id(name: str) -> int:
+    """Maior id de `name` em todos os shards (despesas: também as arquivadas, que usam os mesmos ids)."""
+    names = (name, "expenses_archive") if name == "expenses" else (name,)
+    largest = 0
+    for shard in shard_router.shards:
+        with shard.engine.connect() as conn:
+            for table in map(_table, names):
+                largest = max(largest, conn.execute(select(func.max(table.c.id))).scalar() or 0)
+    return largest
+
+def _create_sequence(conn: Connection, name: str) -> None:
+    """Primeiro uso do contador: começa depois do maior id existente (dados anteriores ao sharding)."""
+    row = {"name": name, "next_id": _max_id(name) + 1}
+    if conn.dialect.name == "mysql":
+        conn.execute(insert(SEQUENCES).prefix_with("IGNORE"), row)
+        return
+    if conn.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    conn.execute(upsert(SEQUENCES).on_conflict_do_nothing(index_elements=[SEQUENCES.c.name]), row)
+
+def _reserve(conn: Connection, name: str, count: int) -> int:
+    """Reserva `count` ids de `name` na transação de `conn` e devolve o primeiro."""
+    seq = SEQUENCES.c
+    bump = update(SEQUENCES).where(seq.name == name).values(next_id=seq.next_id + count)
+    if conn.execute(bump).rowcount == 0:
+        _create_sequence(conn, name)
+        conn.execute(bump)
+    return conn.execute(select(seq.next_id).where(seq.name == name)).scalar() - count
+
+class GlobalIds:
+    """Ids das tabelas por usuário quando há shards (default das colunas id, models.sharded_id).
+
+    Cada processo reserva faixas de `block` ids em id_sequences (shard 0), numa transação própria e curta, e as
+    consome em memória. Exceção: com o shard 0 em SQLite, uma transação que já escreveu nele trava o arquivo
+    inteiro, e a reserva numa conexão à parte esperaria por ela; ali cada id é reservado na própria transação
+    (e desfeito junto com ela).
+    """
+
+    def __init__(self, block: int):
+        self.block = block
+        self._ranges: Dict[str, range] = {}
+        self._lock = threading.Lock()
+
+    def take(self, name: str, conn: Connection) -> int:
+        if conn.dialect.name == "sqlite" and conn.engine.url.database == engine.url.database:
+            return _reserve(conn, name, 1)
+        with self._lock:
+            ids = self._ranges.get(name)
+            if not ids:
+                with engine.begin() as own:
+                    first = _reserve(own, name, self.block)
+                ids = range(first, first + self.block)
+            self._ranges[name] = ids[1:]
+            return ids[0]
+
+global_ids = GlobalIds(settings.SHARD_ID_BLOCK_SIZE)
+
+# ===== Movimentação entre shards =====
+
+# Tabelas com id próprio, na ordem das chaves estrangeiras, e as colunas que apontam para ids de outra delas.
+# Com shards os ids são globais (GlobalIds): as linhas vão para o destino com os mesmos ids, e os ids que o
+# cliente guarda (e os ETags) continuam valendo depois da movimentação.
+COPY_PLAN = (
+    ("categories", {}),
+    ("recurring_expenses", {"category_id": "categories"}),
+    ("budgets", {"category_id": "categories"}),
+    ("expenses", {"category_id": "categories", "recurring_id": "recurring_expenses"}),
+    ("budget_events", {"budget_id": "budgets"}),
+)
+
+# Remoção no shard de origem, filhas antes das mães
+DELETE_ORDER = (
+    "budget_events", "budgets", "expenses", "expenses_archive", "expense_monthly_rollups", "user_versions",
+    "recurring_expenses", "categories",
+)
+
+# Tabelas sem id próprio (chave = usuário + atributos), copiadas de uma vez
+KEYED_TABLES = ("expense_monthly_rollups", "user_versions")
+
+def _table(name: str) -> Table:
+    return SQLModel.metadata.tables[name]
+
+def _source_rows(src: Session, name: str, user_id: int, after: int, limit: int) -> List[dict]:
+    from app.db import archive
+
+    if name == "expenses":
+        # Despesas arquivadas voltam para `expenses` no destino (o próximo `archive run` as arquiva de novo):
+        # os ids das duas tabelas saem da mesma sequência, e um único fluxo em ordem de id cobre ambas
+        source, _ = archive.expense_source(lambda t: [t.c.user_id == user_id, t.c.id > after], True)
+    else:
+        source = _table(name)
+        source = select(source).where(source.c.user_id == user_id, source.c.id > after).subquery()
+    stmt = select(source).order_by(source.c.id).limit(limit)
+    return [dict(row) for row in src.execute(stmt).mappings()]
+
+def _copied_ids(dst: Session, user_id: int, name: str, ids: set) -> set:
+    if not ids:
+        return set()
+    table = _table(name)
+    return set(dst.execute(select(table.c.id).where(table.c.user_id == user_id, table.c.id.in_(ids))).scalars())
+
+def copy_table(src: Session, dst: Session, user_id: int, name: str, parents: Dict[str, str], batch_size: int) -> int:
+    """Copia as linhas do usuário em lotes, com os mesmos ids; cada lote é uma transação do destino, então uma
+    cópia interrompida retoma do maior id já copiado."""
+    table = _table(name)
+    columns = [c.name for c in table.columns]
+    after = dst.execute(select(func.max(table.c.id)).where(table.c.user_id == user_id)).scalar() or 0
+    copied = 0
+    while True:
+        rows = _source_rows(src, name, user_id, after, batch_size)
+        if not rows:
+            return copied
+        for column, parent in parents.items():
+            # Referência sem linha-mãe (ex.: categoria apagada, no arquivo) fica nula
+            present = _copied_ids(dst, user_id, parent, {r[column] for r in rows if r[column] is not None})
+            for row in rows:
+                if row[column] not in present:
+                    row[column] = None
+        dst.execute(insert(table), [{c: row[c] for c in columns} for row in rows])
+        dst.commit()
+        copied += len(rows)
+        after = rows[-1]["id"]
+
+def copy_keyed(src: Session, dst: Session, user_id: int, name: str) -> int:
+    table = _table(name)
+    rows = [dict(r) for r in src.execute(select(table).where(table.c.user_id == user_id)).mappings()]
+    dst.execute(delete(table).where(table.c.user_id == user_id))
+    if rows:
+        dst.execute(insert(table), rows)
+    dst.commit()
+    return len(rows)
+
+def delete_user_rows(db: Session, user_id: int, batch_size: int, include_user: bool) -> int:
+    """Apaga os dados do usuário num shard, em lotes (transações curtas); `include_user` apaga o espelho de users."""
+    deleted = 0
+    for name in DELETE_ORDER:
+        table = _table(name)
+        if "id" not in table.c:
+            deleted += db.execute(delete(table).where(table.c.user_id == user_id)).rowcount
+            db.commit()
+            continue
+        while True:
+            ids = db.execute(select(table.c.id).where(table.c.user_id == user_id).limit(batch_size)).scalars().all()
+            if not ids:
+                break
+            db.execute(delete(table).where(table.c.id.in_(ids)))
+            db.commit()
+            deleted += len(ids)
+    if include_user:
+        # Pela conexão do próprio shard: na sessão, `users` (tabela global) iria para o shard 0
+        users = User.__table__
+        db.connection().execute(delete(users).where(users.c.id == user_id))
+    db.commit()
+    return deleted
+
+def _wait_since(since: dt.datetime, wait: float, out: Callable[[str], None]) -> None:
+    remaining = wait - (dt.datetime.utcnow() - since).total_seconds()
+    if remaining > 0:
+        out(f"waiting {remaining:.1f}s for directory caches to expire")
+        time.sleep(remaining)
+
+def _entry(db: Session, user_id: int) -> UserShard:
+    if db.get(User, user_id) is None:
+        raise ValueError(f"user {user_id} not found")
+    entry = db.get(UserShard, user_id)
+    if entry is None:  # usuário anterior ao sharding: está no shard 0
+        entry = UserShard(user_id=user_id, shard=0)
+        db.add(entry)
+        db.commit()
+    return entry
+
+def _cleanup(db: Session, entry: UserShard, batch_size: int, wait: float, out: Callable[[str], None]) -> None:
+    # Processos com entrada vencida ainda podem ler o shard antigo: só apaga depois do TTL
+    _wait_since(entry.updated_at, wait, out)
+    with shard_router.shard(entry.move_from).session() as src:
+        deleted = delete_user_rows(src, entry.user_id, batch_size, include_user=entry.move_from != 0)
+    out(f"{deleted} rows removed from shard {entry.move_from}")
+    entry.move_from, entry.updated_at = None, dt.datetime.utcnow()
+    db.commit()
+
+def move_user(user_id: int, target: int, batch_size: int, wait: float, out: Callable[[str], None] = print) -> None:
+    """Move os dados de um usuário para o shard `target`. Pode ser interrompida e repetida: retoma da fase
+    registrada no diretório.
+
+    1. Congela: `move_to` no diretório; escritas do usuário recebem 503 e as leituras seguem na origem.
+       Espera `wait` segundos (os caches do diretório vencem).
+    2. Copia tabela a tabela, em lotes, com os mesmos ids (a cópia retoma de onde parou).
+    3. Vira o diretório para o destino e, depois de outra espera, apaga os dados da origem.
+    """
+    shard_router.shard(target)
+    with SessionLocal() as db:
+        entry = _entry(db, user_id)
+        if entry.move_from is not None:
+            out(f"finishing cleanup of previous move from shard {entry.move_from}")
+            _cleanup(db, entry, batch_size, wait, out)
+        if entry.move_to is None:
+            if entry.shard == target:
+                out(f"user {user_id} is already on shard {target}")
+                return
+            entry.move_to, entry.updated_at = target, dt.datetime.utcnow()
+            db.commit()
+            out(f"user {user_id} frozen for writes on shard {entry.shard}")
+        elif entry.move_to != target:
+            raise ValueError(f"user {user_id} is already moving to shard {entry.move_to}; abort it first")
+        _wait_since(entry.updated_at, wait, out)
+
+        with shard_router.shard(entry.shard).session() as src, shard_router.shard(target).session() as dst:
+            ensure_user(dst.connection(), mirror_row(db.get(User, user_id)))
+            dst.commit()
+            for name, parents in COPY_PLAN:
+                out(f"{name}: {copy_table(src, dst, user_id, name, parents, batch_size)} rows copied")
+            # user_versions vai junto: mesmos ids e mesmos dados, então os ETags da origem valem no destino
+            for name in KEYED_TABLES:
+                out(f"{name}: {copy_keyed(src, dst, user_id, name)} rows copied")
+
+        entry.shard, entry.move_to, entry.move_from = target, None, entry.shard
+        entry.updated_at = dt.datetime.utcnow()
+        db.commit()
+        shard_router.directory.forget(user_id)
+        out(f"user {user_id} now on shard {target}")
+        _cleanup(db, entry, batch_size, wait, out)
+
+def abort_move(user_id: int, batch_size: int, out: Callable[[str], None] = print) -> None:
+    """Desiste de uma movimentação ainda na cópia: apaga a cópia parcial e descongela o usuário na origem."""
+    with SessionLocal() as db:
+        entry = _entry(db, user_id)
+        if entry.move_to is None:
+            raise ValueError(f"user {user_id} has no move in the copy phase")
+        with shard_router.shard(entry.move_to).session() as dst:
+            deleted = delete_user_rows(dst, user_id, batch_size, include_user=entry.move_to != 0)
+        out(f"{deleted} copied rows removed from shard {entry.move_to}")
+        entry.move_to, entry.updated_at = None, dt.datetime.utcnow()
+        db.commit()
+
+def status() -> List[str]:
+    with SessionLocal() as db:
+        users = db.execute(select(func.count()).select_from(User)).scalar()
+        counts = dict(db.execute(select(UserShard.shard, func.count()).group_by(UserShard.shard)).all())
+        moves = db.execute(
+            select(UserShard).where(or_(UserShard.move_to.is_not(None), UserShard.move_from.is_not(None)))
+        ).scalars().all()
+        lines = []
+        for shard in shard_router.shards:
+            n = counts.get(shard.index, 0) + (users - sum(counts.values()) if shard.index == 0 else 0)
+            lines.append(f"{shard.name}: {n} users")
+        for m in moves:
+            phase = f"copying to shard {m.move_to}" if m.move_to is not None else f"cleaning shard {m.move_from}"
+            lines.append(f"user {m.user_id} on shard {m.shard}: {phase} since {m.updated_at.isoformat()}")
+        return lines
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Shards: situação do diretório e movimentação de usuários.")
+    parser.add_argument("command", choices=["status", "move", "abort"])
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--to", type=int, default=None, help="Shard de destino (move).")
+    parser.add_argument("--batch-size", type=int, default=settings.SHARD_MOVE_BATCH_SIZE)
+    parser.add_argument(
+        "--wait", type=float, default=2 * settings.SHARD_DIRECTORY_TTL_SECONDS,
+        help="Espera entre as fases (padrão: o dobro do TTL do diretório; vencem caches e requisições em curso).",
+    )
+    args = parser.parse_args(argv)
+    if args.command == "status":
+        print("\n".join(status()))
+        return 0
+    if args.user_id is None or (args.command == "move" and args.to is None):
+        parser.error("--user-id (and --to for move) are required")
+    try:
+        if args.command == "move":
+            started = time.perf_counter()
+            move_user(args.user_id, args.to, args.batch_size, args.wait)
+            print(f"move finished in {time.perf_counter() - started:.2f}s")
+        else:
+            abort_move(args.user_id, args.batch_size)
+    except (ValueError, RuntimeError) as exc:
+        print(exc)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+from typing import Collection, Iterable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.models import UserVersion
+
+# Versão persistida dos dados de cada usuário (ETags e chaves do cache de relatórios): vale igual para todas as
+# instâncias da API e sobrevive a reinícios.
+# O bump acontece dentro da transação que altera os dados (listener before_commit em app.core.cache).
+
+# Usuários cuja versão a transação já subiu via claim(): o listener não sobe de novo
+BUMPED_KEY = "user_versions_bumped"
+
+def _upsert(conn: Connection, user_ids: Iterable[int], increment: int) -> None:
+    """Cria a linha de cada usuário (versão `increment`) ou soma `increment` à existente."""
+    rows = [{"user_id": u, "version": increment} for u in sorted(user_ids)]
+    if not rows:
+        return
+    table = UserVersion.__table__
+    dialect = conn.dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as upsert
+        stmt = upsert(table)
+        stmt = stmt.on_duplicate_key_update(version=table.c.version + stmt.inserted.version)
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id], set_={"version": table.c.version + stmt.excluded.version}
+        )
+    conn.execute(stmt, rows)
+
+def bump(conn: Connection, user_ids: Iterable[int]) -> None:
+    # Em ordem de user_id: transações concorrentes travam as linhas na mesma ordem
+    _upsert(conn, user_ids, 1)
+
+def statement(user_id: int):
+    return select(UserVersion.version).where(UserVersion.user_id == user_id)
+
+def current(db: Session, user_id: int) -> int:
+    # Sem linha = nenhuma escrita desde a criação da tabela
+    return db.execute(statement(user_id)).scalar() or 0
+
+async def current_async(db: AsyncSession, user_id: int) -> int:
+    return (await db.execute(statement(user_id))).scalar() or 0
+
+def claim(db: Session, user_id: int, expected: Optional[Collection[int]] = None) -> Optional[int]:
+    """Sobe a versão do usuário na transação de `db` e devolve a nova, ou None se ela não está em `expected`.
+
+    A comparação e o bump são um único UPDATE, que trava a linha até o commit: de duas atualizações
+    concorrentes com o mesmo If-Match, só a primeira passa; a segunda espera e não encontra a versão.
+    """
+    conn = db.connection()
+    table = UserVersion.__table__
+    if expected is None:
+        bump(conn, [user_id])
+    else:
+        if 0 in expected:
+            _upsert(conn, [user_id], 0)  # usuário ainda sem linha: cria com a versão 0 para o UPDATE achar
+        stmt = (
+            update(table)
+            .where(table.c.user_id == user_id, table.c.version.in_(sorted(expected)))
+            .values(version=table.c.version + 1)
+        )
+        if not expected or conn.execute(stmt).rowcount != 1:
+            return None
+    db.info.setdefault(BUMPED_KEY, set()).add(user_id)
+    return conn.execute(statement(user_id)).scalar()
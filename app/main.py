@@ -1,13 +1,27 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.core.admission import AdmissionMiddleware
+from app.core.cache import report_cache
 from app.core.config import settings
-from app.routers import auth, categories, expenses
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.principals import principal_cache
+from app.core.security import password_pool
+from app.db.coalescer import coalescers
+from app.db.recurring import recurring_scheduler
+from app.db.replicas import replica_set
+from app.routers import auth, budgets, categories, dashboard, expenses, recurring
+from app.routers import auth_async, budgets_async, categories_async, dashboard_async, expenses_async, recurring_async
 
 openapi_tags = [
     {"name": "Auth", "description": "Rotas de autenticação e identificação do usuário."},
     {"name": "Categories", "description": "CRUD de categorias de despesas do usuário."},
     {"name": "Expenses", "description": "CRUD de despesas e relatórios."},
+    {"name": "Recurring", "description": "Despesas recorrentes (mensais, semanais, parceladas) lançadas pelo agendador."},
+    {"name": "Budgets", "description": "Orçamentos mensais por categoria, situação (gasto x limite) e alertas."},
     {"name": "Reports", "description": "Sumários e agregações para insights financeiros."},
-    {"name": "Health", "description": "Checagens simples de disponibilidade do serviço."},
+    {"name": "Dashboard", "description": "Dados da tela inicial numa única chamada."},
+    {"name": "Health", "description": "Checagens simples de disponibilidade do serviço e métricas."},
 ]
 
 app = FastAPI(
@@ -25,10 +39,69 @@ app = FastAPI(
     openapi_tags=openapi_tags,
 )
 
-app.include_router(auth.router)
-app.include_router(categories.router)
-app.include_router(expenses.router)
+# Admissão por dentro das métricas (o último adicionado é o mais externo): recusas também são medidas
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    registry.register_stats("auth_principal_cache", "Cache de usuários autenticados", principal_cache.stats)
+    registry.register_stats("report_cache", "Cache de relatórios", report_cache.stats)
+
+# bulk_router antes do router de despesas: /expenses/export não pode cair em /expenses/{expense_id}
+app.include_router(expenses.bulk_router)
+if settings.ASYNC_DB:
+    app.include_router(auth_async.router)
+    app.include_router(categories_async.router)
+    app.include_router(expenses_async.router)
+    app.include_router(recurring_async.router)
+    app.include_router(budgets_async.router)
+    app.include_router(dashboard_async.router)
+else:
+    app.include_router(auth.router)
+    app.include_router(categories.router)
+    app.include_router(expenses.router)
+    app.include_router(recurring.router)
+    app.include_router(budgets.router)
+    app.include_router(dashboard.router)
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Nenhuma conexão livre em DB_POOL_TIMEOUT_SECONDS: sobrecarga passageira, não erro interno
+    return JSONResponse(
+        status_code=503, content={"detail": "Database busy, retry later"}, headers={"Retry-After": "1"}
+    )
+
+@app.on_event("startup")
+def start_background_workers():
+    if replica_set is not None:
+        replica_set.start()
+    recurring_scheduler.start()
+
+@app.on_event("shutdown")
+def shutdown_background_workers():
+    password_pool.shutdown()
+    recurring_scheduler.stop()
+    for coalescer in coalescers.values():
+        coalescer.stop()
+    if dashboard.section_pool is not None:
+        dashboard.section_pool.shutdown(wait=False)
+    if replica_set is not None:
+        replica_set.stop()
 
 @app.get("/health", tags=["Health"], summary="Healthcheck", description="Retorna `ok` se o serviço está respondendo.")
 async def health():
     return {"status": "ok"}
+
+if settings.METRICS_ENABLED:
+    @app.get(
+        "/metrics",
+        tags=["Health"],
+        summary="Métricas (Prometheus)",
+        description=(
+            "Latência e contagem de requisições por rota, comandos SQL por requisição, duração dos comandos, "
+            "estado do pool de conexões e estatísticas dos caches, no formato de texto do Prometheus."
+        ),
+        response_class=PlainTextResponse,
+    )
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,13 +1,32 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.core.deps import get_db, get_current_user
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import create_access_token, hash_password_async, verify_password_async
 from app.db.models import User
+from app.db.shards import shard_router
 from app.db.schemas import UserCreate, UserRead, Token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+# register e login são `async def`: o bcrypt (pool de processos) é aguardado sem prender uma thread do
+# threadpool, e só as consultas, curtas, rodam nele (run_in_threadpool) com a sessão síncrona.
+
+def _find_user(db: Session, email: str) -> Optional[User]:
+    user = db.query(User).filter(User.email == email).first()
+    # Devolve a conexão ao pool antes do bcrypt: logins esperando o hash não seguram conexões
+    db.close()
+    return user
+
+def _create_user(db: Session, user: User) -> User:
+    db.add(user)
+    shard_router.assign(db, user)
+    db.commit()
+    db.refresh(user)
+    return user
+
 @router.post(
     "/register",
     response_model=UserRead,
@@ -16,19 +35,17 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
     description="Cria um novo usuário com e-mail único e retorna seus dados básicos.",
     response_description="Dados do usuário criado."
 )
-def register(payload: UserCreate, db: Session = Depends(get_db)):
-    exists = db.query(User).filter(User.email == payload.email).first()
+async def register(payload: UserCreate, db: Session = Depends(get_db)):
+    exists = await run_in_threadpool(_find_user, db, payload.email)
     if exists:
         raise HTTPException(status_code=400, detail="Email already registered")
     user = User(
         email=payload.email,
-        password_hash=get_password_hash(payload.password),
+        password_hash=await hash_password_async(payload.password),
         full_name=payload.full_name,
         is_active=True,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await run_in_threadpool(_create_user, db, user)
     return UserRead(id=user.id, email=user.email, full_name=user.full_name)
 
 @router.post(
@@ -41,11 +58,11 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
     ),
     response_description="Token de acesso (JWT)."
 )
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
-    token = create_access_token(subject=user.email)
+    token = create_access_token(subject=user.email, user_id=user.id)
     return Token(access_token=token)
 
 @router.get(
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import get_async_db, get_current_user_async
+from app.core.security import create_access_token, hash_password_async, verify_password_async
+from app.db.models import User
+from app.db.shards import shard_router
+from app.db.schemas import UserCreate, UserRead, Token
+
+# Versão assíncrona de app/routers/auth.py (ativada com ASYNC_DB); mesmas rotas e contratos.
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+@router.post(
+    "/register",
+    response_model=UserRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Registrar novo usuário",
+    description="Cria um novo usuário com e-mail único e retorna seus dados básicos.",
+    response_description="Dados do usuário criado."
+)
+async def register(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    exists = (await db.execute(select(User).where(User.email == payload.email))).scalars().first()
+    if exists:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    user = User(
+        email=payload.email,
+        password_hash=await hash_password_async(payload.password),
+        full_name=payload.full_name,
+        is_active=True,
+    )
+    db.add(user)
+    await shard_router.assign_async(db, user)
+    await db.commit()
+    await db.refresh(user)
+    return UserRead(id=user.id, email=user.email, full_name=user.full_name)
+
+@router.post(
+    "/login",
+    response_model=Token,
+    summary="Login com e-mail e senha",
+    description=(
+        "Autentica o usuário usando **form-urlencoded** (`username`, `password`) e retorna o token JWT.\n\n"
+        "Use o botão **Authorize** no Swagger e cole `Bearer SEU_TOKEN` para testar rotas protegidas."
+    ),
+    response_description="Token de acesso (JWT)."
+)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.email == form_data.username))).scalars().first()
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    token = create_access_token(subject=user.email, user_id=user.id)
+    return Token(access_token=token)
+
+@router.get(
+    "/me",
+    response_model=UserRead,
+    summary="Dados do usuário autenticado",
+    description="Retorna as informações básicas do usuário associado ao token fornecido.",
+    response_description="Perfil do usuário autenticado."
+)
+async def me(current_user: User = Depends(get_current_user_async)):
+    return UserRead(id=current_user.id, email=current_user.email, full_name=current_user.full_name)
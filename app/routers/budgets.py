@@ -0,0 +1,209 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.core.deps import get_db, get_read_db, get_current_user
+from app.db.budgets import current_spent, threshold_events
+from app.db.models import Budget, BudgetEvent, Category, User
+from app.db.schemas import BudgetCreate, BudgetEventRead, BudgetRead, BudgetStatus, BudgetUpdate
+
+router = APIRouter(prefix="/budgets", tags=["Budgets"])
+
+def validate_budget(payload: BudgetCreate) -> None:
+    if not 1 <= payload.month <= 12:
+        raise HTTPException(status_code=400, detail="month must be between 1 and 12")
+    validate_limit(payload.limit_amount)
+
+def validate_limit(limit_amount: float) -> None:
+    if limit_amount <= 0:
+        raise HTTPException(status_code=400, detail="limit_amount must be > 0")
+
+def duplicate_filter(user_id: int, payload: BudgetCreate) -> list:
+    category = Budget.category_id == payload.category_id
+    if payload.category_id is None:
+        category = Budget.category_id.is_(None)
+    return [
+        Budget.user_id == user_id, Budget.year == payload.year, Budget.month == payload.month,
+        Budget.currency == payload.currency, category,
+    ]
+
+def status_query(user_id: int, year: Optional[int], month: Optional[int]):
+    # Só budgets (pelo índice do usuário) + nome da categoria: o gasto já está em `spent`
+    stmt = (
+        select(Budget, Category.name)
+        .outerjoin(Category, Category.id == Budget.category_id)
+        .where(Budget.user_id == user_id)
+        .order_by(Budget.year, Budget.month, Budget.id)
+    )
+    if year is not None:
+        stmt = stmt.where(Budget.year == year)
+    if month is not None:
+        stmt = stmt.where(Budget.month == month)
+    return stmt
+
+def events_query(user_id: int, after_id: int, limit: int):
+    return (
+        select(BudgetEvent)
+        .where(BudgetEvent.user_id == user_id, BudgetEvent.id > after_id)
+        .order_by(BudgetEvent.id)
+        .limit(limit)
+    )
+
+def to_status(obj: Budget, category_name: Optional[str]) -> BudgetStatus:
+    return BudgetStatus(
+        id=obj.id,
+        category_id=obj.category_id,
+        category_name=category_name,
+        year=obj.year,
+        month=obj.month,
+        currency=obj.currency,
+        limit_amount=obj.limit_amount,
+        spent=round(obj.spent, 2),
+        remaining=round(obj.limit_amount - obj.spent, 2),
+        percent_used=round(obj.spent * 100 / obj.limit_amount, 2),
+    )
+
+def new_limit_events(obj: Budget, old_limit: float) -> List[BudgetEvent]:
+    events = threshold_events(obj.id, obj.user_id, obj.spent, old_limit, obj.spent, obj.limit_amount)
+    return [BudgetEvent(**e) for e in events]
+
+def _get_owned(db: Session, budget_id: int, user_id: int) -> Budget:
+    obj = db.query(Budget).filter(Budget.id == budget_id, Budget.user_id == user_id).first()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    return obj
+
+@router.post(
+    "",
+    response_model=BudgetRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Criar orçamento",
+    description=(
+        "Define o limite de gasto de um mês, para uma categoria ou (sem `category_id`) para todas. O gasto "
+        "inicial é calculado uma vez; depois é mantido a cada escrita em despesas. Um orçamento por "
+        "categoria, mês e moeda."
+    ),
+    response_description="Orçamento criado."
+)
+def create_budget(
+    payload: BudgetCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    validate_budget(payload)
+    owned = Category.id == payload.category_id, Category.user_id == current_user.id
+    if payload.category_id is not None and not db.query(Category.id).filter(*owned).first():
+        raise HTTPException(status_code=404, detail="Category not found")
+    if db.query(Budget.id).filter(*duplicate_filter(current_user.id, payload)).first():
+        raise HTTPException(status_code=400, detail="Budget already exists for this category, month and currency")
+    obj = Budget(user_id=current_user.id, **payload.model_dump())
+    obj.spent = current_spent(db, obj)
+    db.add(obj)
+    db.flush()
+    db.add_all(new_limit_events(obj, float("inf")))
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+@router.get(
+    "",
+    response_model=List[BudgetRead],
+    summary="Listar orçamentos",
+    description="Retorna os orçamentos do usuário autenticado, opcionalmente de um ano/mês.",
+    response_description="Lista de orçamentos."
+)
+def list_budgets(
+    year: Optional[int] = Query(None, description="Filtra por ano."),
+    month: Optional[int] = Query(None, description="Filtra por mês (1-12)."),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return [obj for obj, _ in db.execute(status_query(current_user.id, year, month)).all()]
+
+@router.get(
+    "/status",
+    response_model=List[BudgetStatus],
+    summary="Situação dos orçamentos",
+    description=(
+        "Gasto x limite de cada orçamento (restante e % usado). Lê só a tabela de orçamentos, que guarda o "
+        "gasto acumulado: o custo depende do número de orçamentos, não do de despesas."
+    ),
+    response_description="Situação de cada orçamento."
+)
+def budgets_status(
+    year: Optional[int] = Query(None, description="Filtra por ano."),
+    month: Optional[int] = Query(None, description="Filtra por mês (1-12)."),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return [to_status(obj, name) for obj, name in db.execute(status_query(current_user.id, year, month)).all()]
+
+@router.get(
+    "/events",
+    response_model=List[BudgetEventRead],
+    summary="Alertas de orçamento",
+    description=(
+        "Limiares atingidos (por padrão 80% e 100% do limite), em ordem. Para acompanhar, consulte de tempos "
+        "em tempos passando em `after_id` o maior `id` já recebido."
+    ),
+    response_description="Eventos posteriores a `after_id`."
+)
+def list_budget_events(
+    after_id: int = Query(0, ge=0, description="Retorna só eventos com id maior que este."),
+    limit: int = Query(100, ge=1, le=1000, description="Máximo de eventos por página."),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return db.execute(events_query(current_user.id, after_id, limit)).scalars().all()
+
+@router.get(
+    "/{budget_id}",
+    response_model=BudgetRead,
+    summary="Buscar orçamento por ID",
+    description="Retorna o orçamento correspondente ao `budget_id` do usuário autenticado.",
+    response_description="Orçamento encontrado."
+)
+def get_budget(
+    budget_id: int = Path(..., description="ID do orçamento."),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _get_owned(db, budget_id, current_user.id)
+
+@router.put(
+    "/{budget_id}",
+    response_model=BudgetRead,
+    summary="Atualizar limite do orçamento",
+    description="Altera o limite. Se o gasto atual passar a atingir um limiar, o alerta é registrado.",
+    response_description="Orçamento atualizado."
+)
+def update_budget(
+    budget_id: int = Path(..., description="ID do orçamento."),
+    payload: BudgetUpdate = ...,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    validate_limit(payload.limit_amount)
+    obj = _get_owned(db, budget_id, current_user.id)
+    old_limit, obj.limit_amount = obj.limit_amount, payload.limit_amount
+    db.add_all(new_limit_events(obj, old_limit))
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+@router.delete(
+    "/{budget_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Excluir orçamento",
+    description="Remove o orçamento e seus alertas. As despesas não são afetadas."
+)
+def delete_budget(
+    budget_id: int = Path(..., description="ID do orçamento."),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    obj = _get_owned(db, budget_id, current_user.id)
+    db.execute(delete(BudgetEvent).where(BudgetEvent.budget_id == obj.id))
+    db.delete(obj)
+    db.commit()
+    return None
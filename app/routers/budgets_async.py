@@ -0,0 +1,157 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import get_async_db, get_async_read_db, get_current_user_async
+from app.db.budgets import current_spent
+from app.db.models import Budget, BudgetEvent, Category, User
+from app.db.schemas import BudgetCreate, BudgetEventRead, BudgetRead, BudgetStatus, BudgetUpdate
+from app.routers.budgets import (
+    duplicate_filter, events_query, new_limit_events, status_query, to_status, validate_budget, validate_limit,
+)
+
+# Versão assíncrona de app/routers/budgets.py (ativada com ASYNC_DB); mesmas rotas e contratos.
+router = APIRouter(prefix="/budgets", tags=["Budgets"])
+
+async def _get_owned(db: AsyncSession, budget_id: int, user_id: int) -> Budget:
+    stmt = select(Budget).where(Budget.id == budget_id, Budget.user_id == user_id)
+    obj = (await db.execute(stmt)).scalars().first()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    return obj
+
+@router.post(
+    "",
+    response_model=BudgetRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Criar orçamento",
+    description=(
+        "Define o limite de gasto de um mês, para uma categoria ou (sem `category_id`) para todas. O gasto "
+        "inicial é calculado uma vez; depois é mantido a cada escrita em despesas. Um orçamento por "
+        "categoria, mês e moeda."
+    ),
+    response_description="Orçamento criado."
+)
+async def create_budget(
+    payload: BudgetCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    validate_budget(payload)
+    owned = select(Category.id).where(Category.id == payload.category_id, Category.user_id == current_user.id)
+    if payload.category_id is not None and (await db.execute(owned)).first() is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    if (await db.execute(select(Budget.id).where(*duplicate_filter(current_user.id, payload)))).first():
+        raise HTTPException(status_code=400, detail="Budget already exists for this category, month and currency")
+    obj = Budget(user_id=current_user.id, **payload.model_dump())
+    obj.spent = await db.run_sync(lambda s: current_spent(s, obj))
+    db.add(obj)
+    await db.flush()
+    db.add_all(new_limit_events(obj, float("inf")))
+    await db.commit()
+    await db.refresh(obj)
+    return obj
+
+@router.get(
+    "",
+    response_model=List[BudgetRead],
+    summary="Listar orçamentos",
+    description="Retorna os orçamentos do usuário autenticado, opcionalmente de um ano/mês.",
+    response_description="Lista de orçamentos."
+)
+async def list_budgets(
+    year: Optional[int] = Query(None, description="Filtra por ano."),
+    month: Optional[int] = Query(None, description="Filtra por mês (1-12)."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return [obj for obj, _ in (await db.execute(status_query(current_user.id, year, month))).all()]
+
+@router.get(
+    "/status",
+    response_model=List[BudgetStatus],
+    summary="Situação dos orçamentos",
+    description=(
+        "Gasto x limite de cada orçamento (restante e % usado). Lê só a tabela de orçamentos, que guarda o "
+        "gasto acumulado: o custo depende do número de orçamentos, não do de despesas."
+    ),
+    response_description="Situação de cada orçamento."
+)
+async def budgets_status(
+    year: Optional[int] = Query(None, description="Filtra por ano."),
+    month: Optional[int] = Query(None, description="Filtra por mês (1-12)."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    rows = (await db.execute(status_query(current_user.id, year, month))).all()
+    return [to_status(obj, name) for obj, name in rows]
+
+@router.get(
+    "/events",
+    response_model=List[BudgetEventRead],
+    summary="Alertas de orçamento",
+    description=(
+        "Limiares atingidos (por padrão 80% e 100% do limite), em ordem. Para acompanhar, consulte de tempos "
+        "em tempos passando em `after_id` o maior `id` já recebido."
+    ),
+    response_description="Eventos posteriores a `after_id`."
+)
+async def list_budget_events(
+    after_id: int = Query(0, ge=0, description="Retorna só eventos com id maior que este."),
+    limit: int = Query(100, ge=1, le=1000, description="Máximo de eventos por página."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return (await db.execute(events_query(current_user.id, after_id, limit))).scalars().all()
+
+@router.get(
+    "/{budget_id}",
+    response_model=BudgetRead,
+    summary="Buscar orçamento por ID",
+    description="Retorna o orçamento correspondente ao `budget_id` do usuário autenticado.",
+    response_description="Orçamento encontrado."
+)
+async def get_budget(
+    budget_id: int = Path(..., description="ID do orçamento."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await _get_owned(db, budget_id, current_user.id)
+
+@router.put(
+    "/{budget_id}",
+    response_model=BudgetRead,
+    summary="Atualizar limite do orçamento",
+    description="Altera o limite. Se o gasto atual passar a atingir um limiar, o alerta é registrado.",
+    response_description="Orçamento atualizado."
+)
+async def update_budget(
+    budget_id: int = Path(..., description="ID do orçamento."),
+    payload: BudgetUpdate = ...,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    validate_limit(payload.limit_amount)
+    obj = await _get_owned(db, budget_id, current_user.id)
+    old_limit, obj.limit_amount = obj.limit_amount, payload.limit_amount
+    db.add_all(new_limit_events(obj, old_limit))
+    await db.commit()
+    await db.refresh(obj)
+    return obj
+
+@router.delete(
+    "/{budget_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Excluir orçamento",
+    description="Remove o orçamento e seus alertas. As despesas não são afetadas."
+)
+async def delete_budget(
+    budget_id: int = Path(..., description="ID do orçamento."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    obj = await _get_owned(db, budget_id, current_user.id)
+    await db.execute(delete(BudgetEvent).where(BudgetEvent.budget_id == obj.id))
+    await db.delete(obj)
+    await db.commit()
+    return None
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.deps import get_db, get_current_user
+from app.core import etags
+from app.core.deps import get_db, get_read_db, get_current_user
+from app.db import versions
 from app.db.models import Category, User
 from app.db.schemas import CategoryCreate, CategoryRead, CategoryUpdate
 
@@ -37,41 +39,59 @@ def create_category(
     "",
     response_model=List[CategoryRead],
     summary="Listar categorias",
-    description="Retorna todas as categorias do usuário autenticado, ordenadas por nome.",
+    description=(
+        "Retorna todas as categorias do usuário autenticado, ordenadas por nome.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo."
+    ),
     response_description="Lista de categorias."
 )
 def list_categories(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    etag: str = Depends(etags.user_etag),
 ):
     rows = db.query(Category).filter(Category.user_id == current_user.id).order_by(Category.name).all()
+    etags.tagged(response, etag)
     return [CategoryRead(id=r.id, name=r.name, color=r.color) for r in rows]
 
 @router.get(
     "/{category_id}",
     response_model=CategoryRead,
     summary="Buscar categoria por ID",
-    description="Retorna a categoria correspondente ao `category_id` do usuário autenticado.",
+    description=(
+        "Retorna a categoria correspondente ao `category_id` do usuário autenticado.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo."
+    ),
     response_description="Categoria encontrada."
 )
 def get_category(
+    response: Response,
     category_id: int = Path(..., description="ID da categoria."),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    etag: str = Depends(etags.user_etag),
 ):
     obj = db.query(Category).filter(Category.id == category_id, Category.user_id == current_user.id).first()
     if not obj:
         raise HTTPException(status_code=404, detail="Category not found")
+    etags.tagged(response, etag)
     return CategoryRead(id=obj.id, name=obj.name, color=obj.color)
 
 @router.put(
     "/{category_id}",
     response_model=CategoryRead,
     summary="Atualizar categoria",
-    description="Atualiza **nome** e/ou **cor** de uma categoria.",
+    description=(
+        "Atualiza **nome** e/ou **cor** de uma categoria.\n\n"
+        "Com `If-Match` (o `ETag` de uma leitura), a atualização só acontece se nenhum dado do usuário mudou "
+        "desde então; senão, `412`. A resposta traz o `ETag` novo."
+    ),
     response_description="Categoria atualizada."
 )
 def update_category(
+    request: Request,
+    response: Response,
     category_id: int = Path(..., description="ID da categoria."),
     payload: CategoryUpdate = ...,
     db: Session = Depends(get_db),
@@ -80,6 +100,9 @@ def update_category(
     obj = db.query(Category).filter(Category.id == category_id, Category.user_id == current_user.id).first()
     if not obj:
         raise HTTPException(status_code=404, detail="Category not found")
+    version = versions.claim(db, current_user.id, etags.expected_versions(request, current_user.id))
+    if version is None:
+        raise etags.precondition_failed()
     if payload.name is not None:
         conflict = (
             db.query(Category)
@@ -94,6 +117,7 @@ def update_category(
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    etags.tagged(response, etags.make(current_user.id, version))
     return CategoryRead(id=obj.id, name=obj.name, color=obj.color)
 
 @router.delete(
@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.core import etags
+from app.core.deps import get_async_db, get_async_read_db, get_current_user_async
+from app.db import versions
+from app.db.models import Category, User
+from app.db.schemas import CategoryCreate, CategoryRead, CategoryUpdate
+
+# Versão assíncrona de app/routers/categories.py (ativada com ASYNC_DB); mesmas rotas e contratos.
+router = APIRouter(prefix="/categories", tags=["Categories"])
+
+async def _get_owned(db: AsyncSession, category_id: int, user_id: int) -> Category:
+    stmt = select(Category).where(Category.id == category_id, Category.user_id == user_id)
+    obj = (await db.execute(stmt)).scalars().first()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return obj
+
+@router.post(
+    "",
+    response_model=CategoryRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Criar categoria",
+    description="Cria uma nova categoria **única por usuário**.",
+    response_description="Categoria criada."
+)
+async def create_category(
+    payload: CategoryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    stmt = select(Category).where(Category.user_id == current_user.id, Category.name == payload.name)
+    if (await db.execute(stmt)).scalars().first():
+        raise HTTPException(status_code=400, detail="Category with this name already exists")
+    obj = Category(user_id=current_user.id, name=payload.name, color=payload.color)
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    return CategoryRead(id=obj.id, name=obj.name, color=obj.color)
+
+@router.get(
+    "",
+    response_model=List[CategoryRead],
+    summary="Listar categorias",
+    description=(
+        "Retorna todas as categorias do usuário autenticado, ordenadas por nome.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo."
+    ),
+    response_description="Lista de categorias."
+)
+async def list_categories(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: str = Depends(etags.user_etag_async),
+):
+    stmt = select(Category).where(Category.user_id == current_user.id).order_by(Category.name)
+    rows = (await db.execute(stmt)).scalars().all()
+    etags.tagged(response, etag)
+    return [CategoryRead(id=r.id, name=r.name, color=r.color) for r in rows]
+
+@router.get(
+    "/{category_id}",
+    response_model=CategoryRead,
+    summary="Buscar categoria por ID",
+    description=(
+        "Retorna a categoria correspondente ao `category_id` do usuário autenticado.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo."
+    ),
+    response_description="Categoria encontrada."
+)
+async def get_category(
+    response: Response,
+    category_id: int = Path(..., description="ID da categoria."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: str = Depends(etags.user_etag_async),
+):
+    obj = await _get_owned(db, category_id, current_user.id)
+    etags.tagged(response, etag)
+    return CategoryRead(id=obj.id, name=obj.name, color=obj.color)
+
+@router.put(
+    "/{category_id}",
+    response_model=CategoryRead,
+    summary="Atualizar categoria",
+    description=(
+        "Atualiza **nome** e/ou **cor** de uma categoria.\n\n"
+        "Com `If-Match` (o `ETag` de uma leitura), a atualização só acontece se nenhum dado do usuário mudou "
+        "desde então; senão, `412`. A resposta traz o `ETag` novo."
+    ),
+    response_description="Categoria atualizada."
+)
+async def update_category(
+    request: Request,
+    response: Response,
+    category_id: int = Path(..., description="ID da categoria."),
+    payload: CategoryUpdate = ...,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    obj = await _get_owned(db, category_id, current_user.id)
+    version = await db.run_sync(versions.claim, current_user.id, etags.expected_versions(request, current_user.id))
+    if version is None:
+        raise etags.precondition_failed()
+    if payload.name is not None:
+        stmt = select(Category).where(
+            Category.user_id == current_user.id, Category.name == payload.name, Category.id != category_id
+        )
+        if (await db.execute(stmt)).scalars().first():
+            raise HTTPException(status_code=400, detail="Another category with this name already exists")
+        obj.name = payload.name
+    if payload.color is not None:
+        obj.color = payload.color
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    etags.tagged(response, etags.make(current_user.id, version))
+    return CategoryRead(id=obj.id, name=obj.name, color=obj.color)
+
+@router.delete(
+    "/{category_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Excluir categoria",
+    description="Remove a categoria do usuário autenticado. Despesas atreladas ficam com `category_id` nulo (se você configurou assim no banco)."
+)
+async def delete_category(
+    category_id: int = Path(..., description="ID da categoria."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    obj = await _get_owned(db, category_id, current_user.id)
+    await db.delete(obj)
+    await db.commit()
+    return None
@@ -0,0 +1,152 @@
+import contextvars
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core import etags
+from app.core.config import settings
+from app.core.deps import get_current_user, get_read_db
+from app.core.responses import FastJSONResponse
+from app.db.models import Category, User
+from app.db.replicas import read_session
+from app.db.schemas import Dashboard, DashboardSection
+from app.routers.expenses import (
+    ExpenseFilters, by_category_report, cached_report_rows, expense_page, list_statement, monthly_totals_report
+)
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+# Cada seção é uma função da sessão: as independentes rodam ao mesmo tempo, cada uma numa sessão própria
+Loader = Callable[[Session], Any]
+
+# Threads das seções (modo síncrono). A thread da requisição carrega a primeira seção na sessão dela
+section_pool: Optional[ThreadPoolExecutor] = (
+    ThreadPoolExecutor(max_workers=settings.DASHBOARD_WORKERS, thread_name_prefix="dashboard")
+    if settings.DASHBOARD_WORKERS > 0 else None
+)
+
+# ===== Seções =====
+
+def load_categories(db: Session, user_id: int) -> List[dict]:
+    stmt = select(Category.id, Category.name, Category.color).where(Category.user_id == user_id).order_by(Category.name)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+def load_expenses(db: Session, user_id: int, size: int) -> tuple:
+    # Mesma consulta da primeira página de GET /expenses sem filtros
+    filters = ExpenseFilters(None, None, None, None, None, None)
+    archived = db.execute(filters.archive_probe(user_id)).first() is not None
+    stmt = list_statement(filters, user_id, 1, size, None, None, db.get_bind().dialect.name, archived)
+    return expense_page(db.execute(stmt).all(), size, with_cursor=True)
+
+def load_monthly(db: Session, user_id: int, year: Optional[int]) -> List[dict]:
+    # Mesma chave de cache de GET /expenses/summary/monthly: as duas rotas aproveitam o que a outra calculou
+    rows = cached_report_rows(
+        db, user_id, "monthly", {"year": year, "base_currency": None}, lambda: monthly_totals_report(user_id, year)
+    )
+    return [{k: r[k] for k in ("year", "month", "currency", "total_amount")} for r in rows]
+
+def load_by_category(db: Session, user_id: int, start: Optional[dt.date], end: Optional[dt.date]) -> List[dict]:
+    rows = cached_report_rows(
+        db, user_id, "by-category", {"start": start, "end": end, "base_currency": None},
+        lambda: by_category_report(user_id, start, end),
+    )
+    return [{k: r[k] for k in ("category_id", "category_name", "total_amount")} for r in rows]
+
+def section_loaders(
+    user_id: int, include: List[DashboardSection], size: int,
+    year: Optional[int], start: Optional[dt.date], end: Optional[dt.date],
+) -> Dict[DashboardSection, Loader]:
+    loaders = {
+        DashboardSection.CATEGORIES: partial(load_categories, user_id=user_id),
+        DashboardSection.EXPENSES: partial(load_expenses, user_id=user_id, size=size),
+        DashboardSection.MONTHLY: partial(load_monthly, user_id=user_id, year=year),
+        DashboardSection.BY_CATEGORY: partial(load_by_category, user_id=user_id, start=start, end=end),
+    }
+    return {section: loaders[section] for section in dict.fromkeys(include) if section in loaders}
+
+def dashboard_payload(user: User, include: List[DashboardSection], results: Dict[DashboardSection, Any]) -> dict:
+    payload: Dict[str, Any] = {}
+    if DashboardSection.ME in include:
+        payload["me"] = {"id": user.id, "email": user.email, "full_name": user.full_name}
+    for section, result in results.items():
+        if section == DashboardSection.EXPENSES:
+            payload["expenses"], payload["expenses_next_cursor"] = result
+        else:
+            payload[section.value] = result
+    return payload
+
+def _load_in_session(user_id: int, load: Loader) -> Any:
+    with read_session(user_id) as db:
+        return load(db)
+
+def run_sections(db: Session, user_id: int, loaders: Dict[DashboardSection, Loader]) -> Dict[DashboardSection, Any]:
+    """Carrega as seções em paralelo: a primeira na sessão da requisição, as demais no section_pool, cada uma
+    com uma conexão própria. O tempo total fica perto do da seção mais lenta, não da soma."""
+    items = list(loaders.items())
+    if section_pool is None or len(items) < 2:
+        return {section: load(db) for section, load in items}
+    # Cópia do contexto: o SQL das threads conta nas métricas da requisição
+    futures = [
+        (section, section_pool.submit(contextvars.copy_context().run, _load_in_session, user_id, load))
+        for section, load in items[1:]
+    ]
+    first, load = items[0]
+    results = {first: load(db)}
+    for section, future in futures:
+        results[section] = future.result()
+    return results
+
+# ===== Rota =====
+
+DESCRIPTION = (
+    "Junta numa resposta o que a tela inicial busca em cinco chamadas: `me` (`/auth/me`), `categories`, "
+    "`expenses` (primeira página de `/expenses`, com `expenses_next_cursor`), `monthly` "
+    "(`/expenses/summary/monthly`) e `by_category` (`/expenses/summary/by-category`). `include` escolhe as "
+    "seções.\n\n"
+    "O usuário é autenticado uma vez e as seções são consultadas em paralelo, cada uma na própria conexão, "
+    "então a resposta leva o tempo da seção mais lenta, não a soma. Os relatórios usam o mesmo cache das "
+    "rotas de origem.\n\n"
+    "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de qualquer consulta)."
+)
+
+class DashboardQuery:
+    """Parâmetros de GET /dashboard."""
+
+    def __init__(
+        self,
+        include: Optional[List[DashboardSection]] = Query(
+            None, description="Seções a incluir (repita o parâmetro). Padrão: todas."
+        ),
+        size: int = Query(20, ge=1, le=200, description="Tamanho da primeira página de despesas."),
+        year: Optional[int] = Query(None, description="Ano dos totais mensais. Se omitido, todos os anos."),
+        start: Optional[dt.date] = Query(None, description="Data inicial dos totais por categoria."),
+        end: Optional[dt.date] = Query(None, description="Data final dos totais por categoria."),
+    ):
+        self.include = include or list(DashboardSection)
+        self.size = size
+        self.year = year
+        self.start = start
+        self.end = end
+
+    def loaders(self, user_id: int) -> Dict[DashboardSection, Loader]:
+        return section_loaders(user_id, self.include, self.size, self.year, self.start, self.end)
+
+@router.get(
+    "",
+    response_model=Dashboard,
+    response_model_exclude_unset=True,
+    summary="Tela inicial em uma chamada",
+    description=DESCRIPTION,
+    response_description="Seções pedidas.",
+)
+def dashboard(
+    params: DashboardQuery = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(etags.user_etag),
+):
+    results = run_sections(db, current_user.id, params.loaders(current_user.id))
+    return etags.tagged(FastJSONResponse(dashboard_payload(current_user, params.include, results)), etag)
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import etags
+from app.core.deps import get_async_read_db, get_current_user_async
+from app.core.responses import FastJSONResponse
+from app.db.models import User
+from app.db.replicas import async_read_session
+from app.db.schemas import Dashboard, DashboardSection
+from app.routers.dashboard import DESCRIPTION, DashboardQuery, Loader, dashboard_payload
+
+# Versão assíncrona de app/routers/dashboard.py (ativada com ASYNC_DB); mesmas seções e contrato.
+# As seções são tarefas do loop de eventos, cada uma na própria AsyncSession; os carregadores são os mesmos
+# do modo síncrono, rodados com run_sync sobre a conexão assíncrona.
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+async def _load_in_session(user_id: int, load: Loader) -> Any:
+    async with async_read_session(user_id) as db:
+        return await db.run_sync(load)
+
+async def run_sections(
+    db: AsyncSession, user_id: int, loaders: Dict[DashboardSection, Loader]
+) -> Dict[DashboardSection, Any]:
+    items = list(loaders.items())
+    if not items:
+        return {}
+    results = await asyncio.gather(
+        db.run_sync(items[0][1]), *(_load_in_session(user_id, load) for _, load in items[1:])
+    )
+    return {section: result for (section, _), result in zip(items, results)}
+
+@router.get(
+    "",
+    response_model=Dashboard,
+    response_model_exclude_unset=True,
+    summary="Tela inicial em uma chamada",
+    description=DESCRIPTION,
+    response_description="Seções pedidas.",
+)
+async def dashboard(
+    params: DashboardQuery = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: str = Depends(etags.user_etag_async),
+):
+    results = await run_sections(db, current_user.id, params.loaders(current_user.id))
+    return etags.tagged(FastJSONResponse(dashboard_payload(current_user, params.include, results)), etag)
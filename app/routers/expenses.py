@@ -1,23 +1,309 @@
 import datetime as dt
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
-from sqlalchemy import text
+from typing import Callable, List, Optional, Tuple
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Path, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, delete, insert, or_, select, union_all, update
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
-from app.core.deps import get_db, get_current_user
-from app.db.models import Expense, User
+from app.core.config import settings
+from app.core.deps import get_db, get_read_db, get_current_user
+from app.core import etags, exporter
+from app.core.cache import mark_user_dirty, report_cache
+from app.core.importer import SUPPORTED_FORMATS, RawRow, chunked, detect_format, iter_rows
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import FastJSONResponse
+from app.db import archive, budgets, rollups, search, versions
+from app.db.analytics import Series
+from app.db.coalescer import CoalescerOverloaded, expense_writes
+from app.db.fx import FxRateMissing, FxTable, fx_cache
+from app.db.replicas import read_session
+from app.db.shards import SHARD_KEY
+from app.db.models import Category, Expense, User
+from app.db.reports import Report, ReportSpec
 from app.db.schemas import (
     ExpenseCreate, ExpenseRead, ExpenseUpdate,
-    MonthlyTotal, CategorySum
+    ImportReport, ImportRowError,
+    ExpenseBatchSelector, ExpenseBatchUpdate, ExpenseBatchResult,
+    MonthlyTotal, CategorySum, ReportDimension, SummaryRow, ExpenseSeries,
+    PaymentMethod, ExpenseStatus
 )
 
 router = APIRouter(prefix="/expenses", tags=["Expenses"])
+# Operações em massa (importação, exportação, lotes): sempre síncronas, servidas também no modo async (ASYNC_DB)
+bulk_router = APIRouter(prefix="/expenses", tags=["Expenses"])
+
+class ExpenseFilters:
+    """Filtros compartilhados pelas rotas que consultam despesas (listagem, exportação, ...)."""
+
+    def __init__(
+        self,
+        start: Optional[dt.date] = Query(None, description="Data inicial (inclusiva) no formato YYYY-MM-DD.", examples=["2025-10-01"]),
+        end: Optional[dt.date] = Query(None, description="Data final (inclusiva) no formato YYYY-MM-DD.", examples=["2025-10-31"]),
+        category_id: Optional[int] = Query(None, description="Filtra por ID de categoria."),
+        status: Optional[str] = Query(None, description="Filtra por status: PLANNED | PAID | CANCELLED."),
+        min: Optional[float] = Query(None, description="Valor mínimo."),
+        max: Optional[float] = Query(None, description="Valor máximo."),
+    ):
+        self.start = start
+        self.end = end
+        self.category_id = category_id
+        self.status = status
+        self.min = min
+        self.max = max
+
+    def conditions(self, user_id: int, table=archive.HOT) -> list:
+        e = table.c
+        conds = [e.user_id == user_id]
+        if self.start:
+            conds.append(e.date >= self.start)
+        if self.end:
+            conds.append(e.date <= self.end)
+        if self.category_id:
+            conds.append(e.category_id == self.category_id)
+        if self.status:
+            conds.append(e.status == self.status)
+        if self.min is not None:
+            conds.append(e.amount >= self.min)
+        if self.max is not None:
+            conds.append(e.amount <= self.max)
+        return conds
+
+    def archive_probe(self, user_id: int):
+        """Consulta que diz se o período filtrado alcança despesas arquivadas."""
+        hi = self.end + dt.timedelta(days=1) if self.end else None
+        return archive.overlap_statement(user_id, self.start, hi)
+
+def keyset_conditions(cursor: str, table=archive.HOT) -> list:
+    # Seek direto ao último (date, id) visto, usando idx_expenses_user_date
+    last_date, last_id = decode_cursor(cursor)
+    e = table.c
+    return [
+        e.date <= last_date,
+        or_(e.date < last_date, and_(e.date == last_date, e.id < last_id)),
+    ]
+
+def search_clauses(q: str, user_id: int, cursor: Optional[str], dialect_name: str, table=archive.HOT) -> tuple:
+    """(subquery de resultados, ordenação) da busca textual `q` em `table`; o JOIN combina com os demais filtros."""
+    if cursor:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not supported with q; use page")
+    if not search.search_terms(q):
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    hits = search.search_hits(q, user_id, dialect_name, table)
+    return hits, [hits.c.score.desc(), table.c.date.desc(), table.c.id.desc()]
+
+# ===== Leituras por projeção =====
+
+# Colunas de ExpenseRead, na ordem dos campos: as leituras trazem só elas como tuplas (sem objetos ORM)
+# e devolvem FastJSONResponse, sem revalidar cada linha pelo response_model.
+EXPENSE_READ_KEYS = tuple(ExpenseRead.model_fields)
+EXPENSE_READ_COLUMNS = tuple(getattr(Expense, k) for k in EXPENSE_READ_KEYS)
+
+def _archive_list_statement(
+    filters: ExpenseFilters, user_id: int, page: int, size: int,
+    cursor: Optional[str], q: Optional[str], dialect_name: str,
+):
+    # Cada tabela entrega, pelo próprio índice ((user_id, date) ou o de texto, com q), só as primeiras linhas
+    # que podem cair na página; o merge ordena no máximo 2 x (offset + size) linhas
+    top = size if cursor else page * size
+
+    def branch(t):
+        conds = filters.conditions(user_id, t) + (keyset_conditions(cursor, t) if cursor else [])
+        stmt = select(*(t.c[k] for k in EXPENSE_READ_KEYS)).where(*conds)
+        if q is None:
+            return select(stmt.order_by(t.c.date.desc(), t.c.id.desc()).limit(top).subquery())
+        hits, order = search_clauses(q, user_id, cursor, dialect_name, t)
+        stmt = stmt.add_columns(hits.c.score).join(hits, hits.c.id == t.c.id)
+        return select(stmt.order_by(*order).limit(top).subquery())
+
+    merged = union_all(branch(archive.HOT), branch(archive.COLD)).subquery("expenses_all")
+    order = [merged.c.date.desc(), merged.c.id.desc()]
+    if q is not None:
+        order.insert(0, merged.c.score.desc())
+    stmt = select(*(merged.c[k] for k in EXPENSE_READ_KEYS)).order_by(*order)
+    return stmt.offset(0 if cursor else (page - 1) * size).limit(size)
+
+def list_statement(
+    filters: ExpenseFilters, user_id: int, page: int, size: int,
+    cursor: Optional[str], q: Optional[str], dialect_name: str, include_archive: bool = False,
+):
+    if include_archive:
+        return _archive_list_statement(filters, user_id, page, size, cursor, q, dialect_name)
+    stmt = select(*EXPENSE_READ_COLUMNS).where(*filters.conditions(user_id))
+    if q is not None:
+        hits, order = search_clauses(q, user_id, cursor, dialect_name)
+        stmt = stmt.join(hits, hits.c.id == Expense.id).order_by(*order)
+    else:
+        stmt = stmt.order_by(Expense.date.desc(), Expense.id.desc())
+    if cursor:
+        stmt = stmt.where(*keyset_conditions(cursor))
+    else:
+        stmt = stmt.offset((page - 1) * size)
+    return stmt.limit(size)
+
+def expense_page(rows, size: int, with_cursor: bool) -> Tuple[List[dict], Optional[str]]:
+    """Itens da página e o cursor da próxima (None se a página não veio cheia)."""
+    items = [dict(zip(EXPENSE_READ_KEYS, row)) for row in rows]
+    if len(items) == size and with_cursor:
+        return items, encode_cursor(items[-1]["date"], items[-1]["id"])
+    return items, None
+
+def expense_page_response(rows, size: int, with_cursor: bool) -> FastJSONResponse:
+    items, next_cursor = expense_page(rows, size, with_cursor)
+    return FastJSONResponse(items, headers={"X-Next-Cursor": next_cursor} if next_cursor else {})
+
+def expense_statement(expense_id: int, user_id: int, table=archive.HOT):
+    return select(*(table.c[k] for k in EXPENSE_READ_KEYS)).where(table.c.id == expense_id, table.c.user_id == user_id)
+
+def expense_response(row) -> FastJSONResponse:
+    if row is None:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    return FastJSONResponse(dict(zip(EXPENSE_READ_KEYS, row)))
+
+def expense_missing(archived: bool) -> HTTPException:
+    # Arquivadas continuam legíveis, mas não mudam: o rollup e os orçamentos já as contam como estão
+    if archived:
+        return HTTPException(status_code=409, detail="Archived expenses are read-only")
+    return HTTPException(status_code=404, detail="Expense not found")
+
+def _get_owned(db: Session, expense_id: int, user_id: int) -> Expense:
+    obj = db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == user_id).first()
+    if not obj:
+        raise expense_missing(db.execute(archive.archived_statement(expense_id, user_id)).first() is not None)
+    return obj
+
+def build_report(**kwargs) -> Report:
+    try:
+        return Report(ReportSpec(**kwargs))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+class SummaryQuery:
+    """Parâmetros de GET /expenses/summary."""
+
+    def __init__(
+        self,
+        group_by: List[ReportDimension] = Query(..., description="Dimensões de agrupamento."),
+        start: Optional[dt.date] = Query(None, description="Data inicial (inclusiva)."),
+        end: Optional[dt.date] = Query(None, description="Data final (inclusiva)."),
+        year: Optional[int] = Query(None, description="Restringe a um ano."),
+        category_id: Optional[int] = Query(None, description="Filtra por ID de categoria."),
+        payment_method: Optional[PaymentMethod] = Query(None, description="Filtra por meio de pagamento."),
+        status: Optional[ExpenseStatus] = Query(None, description="Filtra por status (padrão: exclui CANCELLED)."),
+        currency: Optional[str] = Query(None, description="Filtra por moeda."),
+        base_currency: Optional[str] = Query(
+            None, min_length=3, max_length=3, description="Converte os valores para esta moeda pelas cotações de fx_rates."
+        ),
+    ):
+        self.params = dict(
+            group_by=[d.value for d in group_by],
+            start=start, end=end, year=year,
+            category_id=category_id,
+            payment_method=payment_method.value if payment_method else None,
+            status=status.value if status else None,
+            currency=currency,
+            base_currency=base_currency.upper() if base_currency else None,
+        )
+
+    def report(self, user_id: int) -> Report:
+        return build_report(user_id=user_id, **self.params)
+
+def monthly_totals_report(user_id: int, year: Optional[int], base_currency: Optional[str] = None) -> Report:
+    # Sem filtros extras (nem conversão), o planner responde pelo rollup mensal
+    return build_report(user_id=user_id, group_by=["month", "currency"], year=year, base_currency=base_currency)
+
+def by_category_report(
+    user_id: int, start: Optional[dt.date], end: Optional[dt.date], base_currency: Optional[str] = None
+) -> Report:
+    return build_report(
+        user_id=user_id, group_by=["category"], start=start, end=end, order_by_total=True, base_currency=base_currency
+    )
+
+def build_series(**kwargs) -> Series:
+    try:
+        return Series(**kwargs)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+class SeriesQuery:
+    """Parâmetros de GET /expenses/analytics/series."""
+
+    def __init__(
+        self,
+        start: Optional[dt.date] = Query(None, description="Data inicial (padrão: 90 dias antes de `end`)."),
+        end: Optional[dt.date] = Query(None, description="Data final, inclusiva (padrão: hoje)."),
+        currency: str = Query("BRL", min_length=3, max_length=3, description="Moeda das despesas consideradas."),
+        category_id: Optional[int] = Query(None, description="Filtra por ID de categoria."),
+        base_currency: Optional[str] = Query(
+            None, min_length=3, max_length=3,
+            description="Considera todas as moedas, convertidas para esta pelas cotações de fx_rates.",
+        ),
+    ):
+        end = end or dt.date.today()
+        self.params = dict(
+            start=start or end - dt.timedelta(days=89),
+            end=end,
+            currency=currency.upper(),
+            category_id=category_id,
+            base_currency=base_currency.upper() if base_currency else None,
+        )
+
+    def series(self, user_id: int) -> Series:
+        return build_series(user_id=user_id, **self.params)
+
+def report_params(params: dict, fx: Optional[FxTable]) -> dict:
+    # Relatórios convertidos dependem também das cotações: recarregar fx_rates muda a chave
+    return {**params, "fx_version": fx.version} if fx is not None else params
+
+def report_rows(report: Report, result, fx: Optional[FxTable]) -> List[dict]:
+    try:
+        return report.rows(result, fx)
+    except FxRateMissing as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+def cached_report_rows(db: Session, user_id: int, name: str, params: dict, build: Callable[[], Report]) -> List[dict]:
+    fx = fx_cache.table(db) if params.get("base_currency") else None
+    # Chave inclui a versão dos dados do usuário: qualquer escrita invalida tudo dele sem varredura
+    key = report_cache.key(user_id, versions.current(db, user_id), name, report_params(params, fx))
+    rows = report_cache.get(key)
+    if rows is None:
+        report = build()
+        # expenses_archive só entra quando o período pedido alcança despesas arquivadas
+        if report.archive_probe is not None and db.execute(report.archive_probe).first():
+            report = report.with_archive()
+        rows = report_cache.set(key, report_rows(report, db.execute(report.statement), fx))
+    return rows
+
+def coalesced_row(payload: ExpenseCreate, user_id: int) -> dict:
+    now = dt.datetime.utcnow()
+    return {"user_id": user_id, **payload.model_dump(), "created_at": now, "updated_at": now}
+
+def rejected_expense(exc: Exception) -> HTTPException:
+    """Despesa recusada pelo banco (IntegrityError/DataError), com ou sem coalescência. A mensagem não repete
+    o erro do driver, que expõe nomes de tabelas e restrições."""
+    if isinstance(exc, IntegrityError):
+        return HTTPException(status_code=400, detail="Expense rejected: invalid category or constraint violation")
+    return HTTPException(status_code=400, detail="Expense rejected: value out of range for its column")
+
+def coalesce_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, CoalescerOverloaded):
+        return HTTPException(
+            status_code=503, detail="Too many pending writes, retry shortly", headers={"Retry-After": "1"}
+        )
+    return rejected_expense(exc)
 
 @router.post(
     "",
     response_model=ExpenseRead,
     status_code=status.HTTP_201_CREATED,
     summary="Criar despesa",
-    description="Cria uma nova despesa associada ao usuário autenticado.",
+    description=(
+        "Cria uma nova despesa associada ao usuário autenticado.\n\n"
+        "Com a coalescência ativada para esta rota (`WRITE_COALESCING`), criações concorrentes são gravadas "
+        "juntas num INSERT multi-linha por janela; a resposta sai após o commit do lote, com o `id` gerado. "
+        "Uma despesa recusada pelo banco (ex.: categoria inexistente) recebe `400`, com ou sem coalescência, sem "
+        "afetar as demais do lote; fila cheia, `503`."
+    ),
     response_description="Despesa criada."
 )
 def create_expense(
@@ -25,84 +311,258 @@ def create_expense(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    if expense_writes is not None:
+        shard = db.info.get(SHARD_KEY, 0)
+        db.close()  # não segura uma conexão do pool enquanto o lote não sai
+        try:
+            expense_id = expense_writes.submit(coalesced_row(payload, current_user.id), shard).result()
+        except (CoalescerOverloaded, IntegrityError, DataError) as exc:
+            raise coalesce_error(exc)
+        return ExpenseRead(id=expense_id, **payload.model_dump())
     obj = Expense(user_id=current_user.id, **payload.model_dump())
     db.add(obj)
-    db.commit()
+    try:
+        db.commit()
+    except (IntegrityError, DataError) as exc:
+        db.rollback()
+        raise rejected_expense(exc)
     db.refresh(obj)
     return ExpenseRead(**obj.model_dump())
 
+def _insert_rows(db: Session, rows: List[dict]) -> None:
+    # INSERT via Core não dispara os eventos do ORM: rollup mensal, orçamentos e versão do cache são tratados aqui
+    db.execute(insert(Expense.__table__), rows)
+    deltas = rollups.new_deltas()
+    for row in rows:
+        budgets.add_contribution(deltas, row, +1)
+        mark_user_dirty(db, row["user_id"])
+    rollups.apply_deltas(db.connection(), rollups.by_month(deltas))
+    budgets.apply_deltas(db.connection(), deltas)
+
+def _import_batch(db: Session, user_id: int, chunk: List[RawRow], report: ImportReport) -> None:
+    # Resolve nomes de categoria -> id uma única vez por lote
+    names = {data["category"] for _, data, _ in chunk if data and data.get("category") and not data.get("category_id")}
+    by_name = {}
+    if names:
+        by_name = dict(
+            db.query(Category.name, Category.id)
+            .filter(Category.user_id == user_id, Category.name.in_(names))
+            .all()
+        )
+
+    now = dt.datetime.utcnow()
+    rows, line_nums = [], []
+    for line_num, data, error in chunk:
+        if error:
+            report.errors.append(ImportRowError(row=line_num, error=error))
+            continue
+        name = data.pop("category", None)
+        if name and not data.get("category_id"):
+            if name not in by_name:
+                report.errors.append(ImportRowError(row=line_num, error=f"Unknown category: {name}"))
+                continue
+            data["category_id"] = by_name[name]
+        try:
+            item = ExpenseCreate.model_validate(data)
+        except ValidationError as exc:
+            msg = "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors())
+            report.errors.append(ImportRowError(row=line_num, error=msg))
+            continue
+        rows.append({"user_id": user_id, **item.model_dump(), "created_at": now, "updated_at": now})
+        line_nums.append(line_num)
+
+    if not rows:
+        return
+    try:
+        _insert_rows(db, rows)
+        db.commit()
+        report.inserted += len(rows)
+    except SQLAlchemyError:
+        db.rollback()
+        # O lote falhou no banco (ex.: FK/CHECK): regrava linha a linha para isolar as rejeitadas
+        for line_num, row in zip(line_nums, rows):
+            try:
+                _insert_rows(db, [row])
+                db.commit()
+                report.inserted += 1
+            except SQLAlchemyError as exc:
+                db.rollback()
+                report.errors.append(ImportRowError(row=line_num, error=str(getattr(exc, "orig", None) or exc)))
+
+@bulk_router.post(
+    "/import",
+    response_model=ImportReport,
+    summary="Importar despesas em massa (CSV / NDJSON)",
+    description=(
+        "Importa despesas a partir de um arquivo **CSV** (com cabeçalho) ou **NDJSON** (um objeto por linha), "
+        "com os mesmos campos de `ExpenseCreate`. Em vez de `category_id`, a linha pode trazer `category` "
+        "com o **nome** da categoria.\n\n"
+        "O arquivo é lido de forma incremental e gravado em lotes (`IMPORT_BATCH_SIZE`), com um INSERT "
+        "multi-linha e um commit por lote. Linhas inválidas são reportadas sem abortar o restante do arquivo."
+    ),
+    response_description="Relatório da importação com erros por linha."
+)
+def import_expenses(
+    file: UploadFile = File(..., description="Arquivo CSV ou NDJSON."),
+    format: Optional[str] = Query(None, description="csv | ndjson. Se omitido, é inferido pelo nome/tipo do arquivo."),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported import format (use csv or ndjson)")
+
+    report = ImportReport(inserted=0, failed=0)
+    for chunk in chunked(iter_rows(file.file, fmt), settings.IMPORT_BATCH_SIZE):
+        _import_batch(db, current_user.id, chunk, report)
+    report.failed = len(report.errors)
+    return report
+
 @router.get(
     "",
     response_model=List[ExpenseRead],
     summary="Listar despesas com filtros",
     description=(
         "Retorna despesas do usuário autenticado, com suporte a filtros de **período**, **categoria**, "
-        "**status** e **faixa de valores**, além de **paginação**."
+        "**status** e **faixa de valores**, além de **paginação**.\n\n"
+        "Quando a página vem cheia, o header `X-Next-Cursor` traz o cursor da próxima página. "
+        "Envie-o em `cursor` para paginar por keyset (recomendado para páginas profundas); "
+        "`page` continua disponível como fallback.\n\n"
+        "Com `q`, busca os termos na descrição usando o índice de texto (FULLTEXT/FTS5) e ordena por "
+        "relevância; nesse caso a paginação é só por `page`.\n\n"
+        "Despesas arquivadas entram quando o período filtrado alcança os meses arquivados, também na busca `q`.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de ler as despesas)."
     ),
     response_description="Lista de despesas."
 )
 def list_expenses(
-    start: Optional[dt.date] = Query(None, description="Data inicial (inclusiva) no formato YYYY-MM-DD.", examples=["2025-10-01"]),
-    end: Optional[dt.date] = Query(None, description="Data final (inclusiva) no formato YYYY-MM-DD.", examples=["2025-10-31"]),
-    category_id: Optional[int] = Query(None, description="Filtra por ID de categoria."),
-    status: Optional[str] = Query(None, description="Filtra por status: PLANNED | PAID | CANCELLED."),
-    min: Optional[float] = Query(None, description="Valor mínimo."),
-    max: Optional[float] = Query(None, description="Valor máximo."),
-    page: int = Query(1, description="Página (base 1).", ge=1),
+    filters: ExpenseFilters = Depends(),
+    page: int = Query(1, description="Página (base 1). Ignorado quando `cursor` é informado.", ge=1),
     size: int = Query(20, description="Tamanho da página.", ge=1, le=200),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em `X-Next-Cursor` pela página anterior."),
+    q: Optional[str] = Query(None, description="Busca textual na descrição (todos os termos, por prefixo); ordena por relevância.", examples=["uber"]),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    etag: str = Depends(etags.user_etag),
 ):
-    q = db.query(Expense).filter(Expense.user_id == current_user.id)
-    if start:
-        q = q.filter(Expense.date >= start)
-    if end:
-        q = q.filter(Expense.date <= end)
-    if category_id:
-        q = q.filter(Expense.category_id == category_id)
-    if status:
-        q = q.filter(Expense.status == status)
-    if min is not None:
-        q = q.filter(Expense.amount >= min)
-    if max is not None:
-        q = q.filter(Expense.amount <= max)
-
-    items = q.order_by(Expense.date.desc(), Expense.id.desc()).offset((page - 1) * size).limit(size).all()
-    return [ExpenseRead(**i.model_dump()) for i in items]
+    archived = db.execute(filters.archive_probe(current_user.id)).first() is not None
+    stmt = list_statement(filters, current_user.id, page, size, cursor, q, db.get_bind().dialect.name, archived)
+    return etags.tagged(expense_page_response(db.execute(stmt).all(), size, with_cursor=q is None), etag)
+
+EXPORT_COLUMNS = (
+    "id", "date", "amount", "currency", "category_id", "description", "paid_at", "payment_method", "status",
+)
+
+def _stream_export(user_id: int, filters: ExpenseFilters, fmt: str):
+    # Sessão própria: o gerador é consumido depois que a sessão de get_db já foi fechada
+    with read_session(user_id) as db:
+        archived = db.execute(filters.archive_probe(user_id)).first() is not None
+        src, conds = archive.expense_source(lambda t: filters.conditions(user_id, t), archived, EXPORT_COLUMNS)
+        stmt = (
+            select(*(src.c[c] for c in EXPORT_COLUMNS))
+            .where(*conds)
+            .order_by(src.c.date, src.c.id)
+            .execution_options(yield_per=settings.EXPORT_YIELD_PER)
+        )
+        result = db.execute(stmt)
+        yield from exporter.ENCODERS[fmt](EXPORT_COLUMNS, result.partitions())
+
+@bulk_router.get(
+    "/export",
+    summary="Exportar despesas (CSV / NDJSON)",
+    description=(
+        "Exporta **todas** as despesas do usuário que atendem aos filtros (os mesmos de `GET /expenses`), "
+        "sem limite de tamanho. As linhas são lidas do banco com cursor no servidor (`EXPORT_YIELD_PER` por vez) "
+        "e enviadas em streaming, com uso de memória constante."
+    ),
+    response_description="Arquivo CSV ou NDJSON em streaming.",
+    response_class=StreamingResponse,
+)
+def export_expenses(
+    filters: ExpenseFilters = Depends(),
+    format: str = Query("csv", description="csv | ndjson.", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_user),
+):
+    return StreamingResponse(
+        _stream_export(current_user.id, filters, format),
+        media_type=exporter.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="expenses.{format}"'},
+    )
+
+# Declarada antes de /{expense_id} para não ser capturada por ele
+@router.get(
+    "/summary",
+    response_model=List[SummaryRow],
+    response_model_exclude_unset=True,
+    tags=["Reports"],
+    summary="Relatório agregado configurável",
+    description=(
+        "Soma valores e conta despesas agrupando por qualquer combinação de `group_by`: um grão de tempo "
+        "(`day`, `week`, `month` ou `year`) e/ou `category`, `payment_method`, `status`, `currency`.\n\n"
+        "Os filtros de data viram intervalos semiabertos em `date` (aproveitando os índices). "
+        "Sem `status`, despesas canceladas ficam de fora. Só os campos agrupados aparecem na resposta.\n\n"
+        "Com `base_currency`, cada despesa é convertida pela cotação de fx_rates do seu dia (ou do último dia "
+        "anterior com cotação); sem cotação disponível, a resposta é 422.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de consultar o relatório)."
+    ),
+    response_description="Linhas agregadas."
+)
+def summary(
+    response: Response,
+    params: SummaryQuery = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(etags.report_etag),
+):
+    rows = cached_report_rows(db, current_user.id, "summary", params.params, lambda: params.report(current_user.id))
+    etags.tagged(response, etag)
+    return [SummaryRow(**r) for r in rows]
 
 @router.get(
     "/{expense_id}",
     response_model=ExpenseRead,
     summary="Buscar despesa por ID",
-    description="Retorna a despesa correspondente ao `expense_id` do usuário autenticado.",
+    description=(
+        "Retorna a despesa correspondente ao `expense_id` do usuário autenticado.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo."
+    ),
     response_description="Despesa encontrada."
 )
 def get_expense(
     expense_id: int = Path(..., description="ID da despesa."),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    etag: str = Depends(etags.user_etag),
 ):
-    obj = db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == current_user.id).first()
-    if not obj:
-        raise HTTPException(status_code=404, detail="Expense not found")
-    return ExpenseRead(**obj.model_dump())
+    row = db.execute(expense_statement(expense_id, current_user.id)).first()
+    if row is None:
+        row = db.execute(expense_statement(expense_id, current_user.id, archive.COLD)).first()
+    return etags.tagged(expense_response(row), etag)
 
 @router.put(
     "/{expense_id}",
     response_model=ExpenseRead,
     summary="Atualizar despesa",
-    description="Atualiza campos específicos da despesa (parcial) para o `expense_id` informado.",
+    description=(
+        "Atualiza campos específicos da despesa (parcial) para o `expense_id` informado. "
+        "Despesas arquivadas são somente leitura (409).\n\n"
+        "Com `If-Match` (o `ETag` de uma leitura), a atualização só acontece se nenhum dado do usuário mudou "
+        "desde então; senão, `412`. A resposta traz o `ETag` novo."
+    ),
     response_description="Despesa atualizada."
 )
 def update_expense(
+    request: Request,
+    response: Response,
     expense_id: int = Path(..., description="ID da despesa."),
     payload: ExpenseUpdate = ...,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    obj = db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == current_user.id).first()
-    if not obj:
-        raise HTTPException(status_code=404, detail="Expense not found")
+    obj = _get_owned(db, expense_id, current_user.id)
+    version = versions.claim(db, current_user.id, etags.expected_versions(request, current_user.id))
+    if version is None:
+        raise etags.precondition_failed()
 
     data = payload.model_dump(exclude_unset=True)
     for k, v in data.items():
@@ -110,66 +570,130 @@ def update_expense(
     db.add(obj)
     db.commit()
     db.refresh(obj)
+    etags.tagged(response, etags.make(current_user.id, version))
     return ExpenseRead(**obj.model_dump())
 
 @router.delete(
     "/{expense_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Excluir despesa",
-    description="Remove a despesa do usuário autenticado."
+    description="Remove a despesa do usuário autenticado. Despesas arquivadas são somente leitura (409)."
 )
 def delete_expense(
     expense_id: int = Path(..., description="ID da despesa."),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    obj = db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == current_user.id).first()
-    if not obj:
-        raise HTTPException(status_code=404, detail="Expense not found")
+    obj = _get_owned(db, expense_id, current_user.id)
     db.delete(obj)
     db.commit()
     return None
 
-# ===== Reports (lendo suas views) =====
+# ===== Operações em lote =====
+
+# Colunas que aceitam NULL; nas demais um `null` explícito é ignorado em vez de violar NOT NULL
+NULLABLE_CHANGES = {"category_id", "description", "paid_at"}
+
+def _batch_conditions(selector: ExpenseBatchSelector, user_id: int) -> list:
+    if (selector.ids is None) == (selector.filters is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'ids' or 'filters'")
+    if selector.ids is not None:
+        return [Expense.user_id == user_id, Expense.id.in_(selector.ids)]
+    f = selector.filters.model_dump()
+    if f["status"] is not None:
+        f["status"] = f["status"].value
+    return ExpenseFilters(**f).conditions(user_id)
+
+def _apply_bulk_side_effects(db: Session, user_id: int, conds: list, changes: Optional[dict]) -> None:
+    # UPDATE/DELETE set-based não passam pelo ORM: rollup, orçamentos e versão do cache são tratados aqui
+    deltas = rollups.bulk_change_deltas(db, conds, changes)
+    rollups.apply_deltas(db.connection(), rollups.by_month(deltas))
+    budgets.apply_deltas(db.connection(), deltas)
+    mark_user_dirty(db, user_id)
+
+@bulk_router.patch(
+    "/batch",
+    response_model=ExpenseBatchResult,
+    summary="Atualizar despesas em lote",
+    description=(
+        "Aplica as mesmas alterações (`changes`, com as regras de `ExpenseUpdate`) a todas as despesas "
+        "selecionadas por `ids` **ou** por `filters` (os mesmos de `GET /expenses`), com um único "
+        "`UPDATE` set-based em uma transação. Ex.: fechamento do mês, PLANNED → PAID com `paid_at`."
+    ),
+    response_description="Quantidade de despesas afetadas."
+)
+def batch_update_expenses(
+    payload: ExpenseBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    conds = _batch_conditions(payload, current_user.id)
+    changes = {
+        k: v for k, v in payload.changes.model_dump(exclude_unset=True).items()
+        if v is not None or k in NULLABLE_CHANGES
+    }
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes provided")
+
+    _apply_bulk_side_effects(db, current_user.id, conds, changes)
+    result = db.execute(update(Expense).where(*conds).values(**changes).execution_options(synchronize_session=False))
+    db.commit()
+    return ExpenseBatchResult(affected=result.rowcount)
+
+@bulk_router.post(
+    "/batch-delete",
+    response_model=ExpenseBatchResult,
+    summary="Excluir despesas em lote",
+    description=(
+        "Remove todas as despesas selecionadas por `ids` **ou** por `filters` (os mesmos de `GET /expenses`) "
+        "com um único `DELETE` set-based."
+    ),
+    response_description="Quantidade de despesas removidas."
+)
+def batch_delete_expenses(
+    payload: ExpenseBatchSelector,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    conds = _batch_conditions(payload, current_user.id)
+    _apply_bulk_side_effects(db, current_user.id, conds, None)
+    result = db.execute(delete(Expense).where(*conds).execution_options(synchronize_session=False))
+    db.commit()
+    return ExpenseBatchResult(affected=result.rowcount)
+
+# ===== Reports =====
 
 @router.get(
     "/summary/monthly",
     response_model=List[MonthlyTotal],
     tags=["Reports"],
     summary="Totais mensais por ano",
-    description="Retorna a soma dos valores **por mês** e **moeda**, filtrável por ano.",
+    description=(
+        "Retorna a soma dos valores **por mês** e **moeda**, filtrável por ano. "
+        "Com `base_currency`, converte cada despesa pela cotação do seu dia e devolve um total por mês "
+        "nessa moeda.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de consultar o relatório)."
+    ),
     response_description="Lista de totais mensais."
 )
 def monthly_totals(
+    response: Response,
     year: Optional[int] = Query(None, description="Ano alvo. Se omitido, retorna todos os anos."),
-    db: Session = Depends(get_db),
+    base_currency: Optional[str] = Query(
+        None, min_length=3, max_length=3, description="Converte os valores para esta moeda pelas cotações de fx_rates."
+    ),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    etag: str = Depends(etags.report_etag),
 ):
-    sql = """
-        SELECT EXTRACT(YEAR FROM date) AS year,
-               EXTRACT(MONTH FROM date) AS month,
-               currency,
-               SUM(amount) AS total_amount
-        FROM v_expenses_basic
-        WHERE user_id = :user_id
-          AND status <> 'CANCELLED'
-          {year_clause}
-        GROUP BY EXTRACT(YEAR FROM date), EXTRACT(MONTH FROM date), currency
-        ORDER BY year, month
-    """
-    year_clause = "AND EXTRACT(YEAR FROM date) = :year" if year else ""
-    q = text(sql.format(year_clause=year_clause))
-    params = {"user_id": current_user.id}
-    if year:
-        params["year"] = year
-    rows = db.execute(q, params).mappings().all()
+    base = base_currency.upper() if base_currency else None
+    rows = cached_report_rows(
+        db, current_user.id, "monthly", {"year": year, "base_currency": base},
+        lambda: monthly_totals_report(current_user.id, year, base),
+    )
+    etags.tagged(response, etag)
     return [
-        MonthlyTotal(
-            year=int(r["year"]),
-            month=int(r["month"]),
-            currency=r["currency"],
-            total_amount=float(r["total_amount"])
-        )
+        MonthlyTotal(year=r["year"], month=r["month"], currency=r["currency"], total_amount=r["total_amount"])
         for r in rows
     ]
 
@@ -178,42 +702,52 @@ def monthly_totals(
     response_model=List[CategorySum],
     tags=["Reports"],
     summary="Totais por categoria (período)",
-    description="Soma valores **por categoria** em um intervalo opcional de datas (`start`, `end`).",
+    description=(
+        "Soma valores **por categoria** em um intervalo opcional de datas (`start`, `end`). "
+        "Com `base_currency`, soma os valores convertidos para essa moeda.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de consultar o relatório)."
+    ),
     response_description="Lista de totais por categoria."
 )
 def by_category(
+    response: Response,
     start: Optional[dt.date] = Query(None, description="Data inicial (YYYY-MM-DD)."),
     end: Optional[dt.date] = Query(None, description="Data final (YYYY-MM-DD)."),
-    db: Session = Depends(get_db),
+    base_currency: Optional[str] = Query(
+        None, min_length=3, max_length=3, description="Converte os valores para esta moeda pelas cotações de fx_rates."
+    ),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    etag: str = Depends(etags.report_etag),
 ):
-    sql = """
-        SELECT e.category_id,
-               b.category_name,
-               SUM(e.amount) AS total_amount
-        FROM v_expenses_basic b
-        JOIN expenses e ON e.id = b.id
-        WHERE e.user_id = :user_id
-          AND e.status <> 'CANCELLED'
-          {start_clause}
-          {end_clause}
-        GROUP BY e.category_id, b.category_name
-        ORDER BY total_amount DESC
-    """
-    start_clause = "AND e.date >= :start" if start else ""
-    end_clause = "AND e.date <= :end" if end else ""
-    q = text(sql.format(start_clause=start_clause, end_clause=end_clause))
-    params = {"user_id": current_user.id}
-    if start:
-        params["start"] = start
-    if end:
-        params["end"] = end
-    rows = db.execute(q, params).mappings().all()
+    base = base_currency.upper() if base_currency else None
+    rows = cached_report_rows(
+        db, current_user.id, "by-category", {"start": start, "end": end, "base_currency": base},
+        lambda: by_category_report(current_user.id, start, end, base),
+    )
+    etags.tagged(response, etag)
     return [
-        CategorySum(
-            category_id=r["category_id"],
-            category_name=r["category_name"],
-            total_amount=float(r["total_amount"])
-        )
+        CategorySum(category_id=r["category_id"], category_name=r["category_name"], total_amount=r["total_amount"])
         for r in rows
     ]
+
+@router.get(
+    "/analytics/series",
+    response_model=ExpenseSeries,
+    tags=["Reports"],
+    summary="Série diária com estatísticas",
+    description=(
+        "Gasto por dia entre `start` e `end` (despesas não canceladas), com acumulado, médias móveis de 7 e 30 "
+        "dias, variação mês a mês e a projeção linear do total do mês de `end`.\n\n"
+        "Uma consulta agregada por dia alimenta todos os cálculos, feitos em lote (NumPy). As médias dos "
+        "primeiros dias e a variação do primeiro mês usam os dados anteriores a `start`."
+    ),
+    response_description="Série diária, meses e projeção."
+)
+def analytics_series(
+    params: SeriesQuery = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    series = params.series(current_user.id)
+    return FastJSONResponse(cached_report_rows(db, current_user.id, "series", params.params, lambda: series))
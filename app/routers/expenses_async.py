@@ -0,0 +1,308 @@
+import asyncio
+import datetime as dt
+from typing import Callable, List, Optional
+from fastapi import APIRouter, Depends, Query, Path, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import etags
+from app.core.cache import report_cache
+from app.core.deps import get_async_db, get_async_read_db, get_current_user_async
+from app.core.responses import FastJSONResponse
+from app.db import archive, versions
+from app.db.coalescer import CoalescerOverloaded, expense_writes
+from app.db.models import Expense, User
+from app.db.fx import fx_cache
+from app.db.reports import Report
+from app.db.shards import SHARD_KEY
+from app.db.schemas import (
+    ExpenseCreate, ExpenseRead, ExpenseUpdate,
+    MonthlyTotal, CategorySum, SummaryRow, ExpenseSeries
+)
+from app.routers.expenses import (
+    ExpenseFilters, SeriesQuery, SummaryQuery, by_category_report, coalesce_error, coalesced_row, expense_missing,
+    expense_page_response, expense_response, expense_statement, list_statement, monthly_totals_report,
+    rejected_expense, report_params, report_rows
+)
+
+# Versão assíncrona de app/routers/expenses.py (ativada com ASYNC_DB); mesmas rotas e contratos.
+# Importação/exportação continuam em app.routers.expenses.bulk_router nos dois modos.
+router = APIRouter(prefix="/expenses", tags=["Expenses"])
+
+async def _cached_report_rows(db: AsyncSession, user_id: int, name: str, params: dict, build: Callable[[], Report]) -> List[dict]:
+    fx = await db.run_sync(fx_cache.table) if params.get("base_currency") else None
+    key = report_cache.key(user_id, await versions.current_async(db, user_id), name, report_params(params, fx))
+    rows = report_cache.get(key)
+    if rows is None:
+        report = build()
+        if report.archive_probe is not None and (await db.execute(report.archive_probe)).first():
+            report = report.with_archive()
+        rows = report_cache.set(key, report_rows(report, await db.execute(report.statement), fx))
+    return rows
+
+async def _get_owned(db: AsyncSession, expense_id: int, user_id: int) -> Expense:
+    stmt = select(Expense).where(Expense.id == expense_id, Expense.user_id == user_id)
+    obj = (await db.execute(stmt)).scalars().first()
+    if not obj:
+        archived = (await db.execute(archive.archived_statement(expense_id, user_id))).first() is not None
+        raise expense_missing(archived)
+    return obj
+
+@router.post(
+    "",
+    response_model=ExpenseRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Criar despesa",
+    description=(
+        "Cria uma nova despesa associada ao usuário autenticado.\n\n"
+        "Com a coalescência ativada para esta rota (`WRITE_COALESCING`), criações concorrentes são gravadas "
+        "juntas num INSERT multi-linha por janela; a resposta sai após o commit do lote, com o `id` gerado. "
+        "Uma despesa recusada pelo banco (ex.: categoria inexistente) recebe `400`, com ou sem coalescência, sem "
+        "afetar as demais do lote; fila cheia, `503`."
+    ),
+    response_description="Despesa criada."
+)
+async def create_expense(
+    payload: ExpenseCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    if expense_writes is not None:
+        shard = db.info.get(SHARD_KEY, 0)
+        await db.close()  # não segura uma conexão do pool enquanto o lote não sai
+        try:
+            row = coalesced_row(payload, current_user.id)
+            expense_id = await asyncio.wrap_future(expense_writes.submit(row, shard))
+        except (CoalescerOverloaded, IntegrityError, DataError) as exc:
+            raise coalesce_error(exc)
+        return ExpenseRead(id=expense_id, **payload.model_dump())
+    obj = Expense(user_id=current_user.id, **payload.model_dump())
+    db.add(obj)
+    try:
+        await db.commit()
+    except (IntegrityError, DataError) as exc:
+        await db.rollback()
+        raise rejected_expense(exc)
+    await db.refresh(obj)
+    return ExpenseRead(**obj.model_dump())
+
+@router.get(
+    "",
+    response_model=List[ExpenseRead],
+    summary="Listar despesas com filtros",
+    description=(
+        "Retorna despesas do usuário autenticado, com suporte a filtros de **período**, **categoria**, "
+        "**status** e **faixa de valores**, além de **paginação**.\n\n"
+        "Quando a página vem cheia, o header `X-Next-Cursor` traz o cursor da próxima página. "
+        "Envie-o em `cursor` para paginar por keyset (recomendado para páginas profundas); "
+        "`page` continua disponível como fallback.\n\n"
+        "Com `q`, busca os termos na descrição usando o índice de texto (FULLTEXT/FTS5) e ordena por "
+        "relevância; nesse caso a paginação é só por `page`.\n\n"
+        "Despesas arquivadas entram quando o período filtrado alcança os meses arquivados, também na busca `q`.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de ler as despesas)."
+    ),
+    response_description="Lista de despesas."
+)
+async def list_expenses(
+    filters: ExpenseFilters = Depends(),
+    page: int = Query(1, description="Página (base 1). Ignorado quando `cursor` é informado.", ge=1),
+    size: int = Query(20, description="Tamanho da página.", ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em `X-Next-Cursor` pela página anterior."),
+    q: Optional[str] = Query(None, description="Busca textual na descrição (todos os termos, por prefixo); ordena por relevância.", examples=["uber"]),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: str = Depends(etags.user_etag_async),
+):
+    archived = (await db.execute(filters.archive_probe(current_user.id))).first() is not None
+    stmt = list_statement(filters, current_user.id, page, size, cursor, q, db.bind.dialect.name, archived)
+    return etags.tagged(expense_page_response((await db.execute(stmt)).all(), size, with_cursor=q is None), etag)
+
+# Declarada antes de /{expense_id} para não ser capturada por ele
+@router.get(
+    "/summary",
+    response_model=List[SummaryRow],
+    response_model_exclude_unset=True,
+    tags=["Reports"],
+    summary="Relatório agregado configurável",
+    description=(
+        "Soma valores e conta despesas agrupando por qualquer combinação de `group_by`: um grão de tempo "
+        "(`day`, `week`, `month` ou `year`) e/ou `category`, `payment_method`, `status`, `currency`.\n\n"
+        "Os filtros de data viram intervalos semiabertos em `date` (aproveitando os índices). "
+        "Sem `status`, despesas canceladas ficam de fora. Só os campos agrupados aparecem na resposta.\n\n"
+        "Com `base_currency`, cada despesa é convertida pela cotação de fx_rates do seu dia (ou do último dia "
+        "anterior com cotação); sem cotação disponível, a resposta é 422.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de consultar o relatório)."
+    ),
+    response_description="Linhas agregadas."
+)
+async def summary(
+    response: Response,
+    params: SummaryQuery = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: str = Depends(etags.report_etag_async),
+):
+    rows = await _cached_report_rows(db, current_user.id, "summary", params.params, lambda: params.report(current_user.id))
+    etags.tagged(response, etag)
+    return [SummaryRow(**r) for r in rows]
+
+@router.get(
+    "/{expense_id}",
+    response_model=ExpenseRead,
+    summary="Buscar despesa por ID",
+    description=(
+        "Retorna a despesa correspondente ao `expense_id` do usuário autenticado.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo."
+    ),
+    response_description="Despesa encontrada."
+)
+async def get_expense(
+    expense_id: int = Path(..., description="ID da despesa."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: str = Depends(etags.user_etag_async),
+):
+    row = (await db.execute(expense_statement(expense_id, current_user.id))).first()
+    if row is None:
+        row = (await db.execute(expense_statement(expense_id, current_user.id, archive.COLD))).first()
+    return etags.tagged(expense_response(row), etag)
+
+@router.put(
+    "/{expense_id}",
+    response_model=ExpenseRead,
+    summary="Atualizar despesa",
+    description=(
+        "Atualiza campos específicos da despesa (parcial) para o `expense_id` informado. "
+        "Despesas arquivadas são somente leitura (409).\n\n"
+        "Com `If-Match` (o `ETag` de uma leitura), a atualização só acontece se nenhum dado do usuário mudou "
+        "desde então; senão, `412`. A resposta traz o `ETag` novo."
+    ),
+    response_description="Despesa atualizada."
+)
+async def update_expense(
+    request: Request,
+    response: Response,
+    expense_id: int = Path(..., description="ID da despesa."),
+    payload: ExpenseUpdate = ...,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    obj = await _get_owned(db, expense_id, current_user.id)
+    version = await db.run_sync(versions.claim, current_user.id, etags.expected_versions(request, current_user.id))
+    if version is None:
+        raise etags.precondition_failed()
+    data = payload.model_dump(exclude_unset=True)
+    for k, v in data.items():
+        setattr(obj, k, v)
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    etags.tagged(response, etags.make(current_user.id, version))
+    return ExpenseRead(**obj.model_dump())
+
+@router.delete(
+    "/{expense_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Excluir despesa",
+    description="Remove a despesa do usuário autenticado. Despesas arquivadas são somente leitura (409)."
+)
+async def delete_expense(
+    expense_id: int = Path(..., description="ID da despesa."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    obj = await _get_owned(db, expense_id, current_user.id)
+    await db.delete(obj)
+    await db.commit()
+    return None
+
+# ===== Reports =====
+
+@router.get(
+    "/summary/monthly",
+    response_model=List[MonthlyTotal],
+    tags=["Reports"],
+    summary="Totais mensais por ano",
+    description=(
+        "Retorna a soma dos valores **por mês** e **moeda**, filtrável por ano. "
+        "Com `base_currency`, converte cada despesa pela cotação do seu dia e devolve um total por mês "
+        "nessa moeda.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de consultar o relatório)."
+    ),
+    response_description="Lista de totais mensais."
+)
+async def monthly_totals(
+    response: Response,
+    year: Optional[int] = Query(None, description="Ano alvo. Se omitido, retorna todos os anos."),
+    base_currency: Optional[str] = Query(
+        None, min_length=3, max_length=3, description="Converte os valores para esta moeda pelas cotações de fx_rates."
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: str = Depends(etags.report_etag_async),
+):
+    base = base_currency.upper() if base_currency else None
+    rows = await _cached_report_rows(
+        db, current_user.id, "monthly", {"year": year, "base_currency": base},
+        lambda: monthly_totals_report(current_user.id, year, base),
+    )
+    etags.tagged(response, etag)
+    return [
+        MonthlyTotal(year=r["year"], month=r["month"], currency=r["currency"], total_amount=r["total_amount"])
+        for r in rows
+    ]
+
+@router.get(
+    "/summary/by-category",
+    response_model=List[CategorySum],
+    tags=["Reports"],
+    summary="Totais por categoria (período)",
+    description=(
+        "Soma valores **por categoria** em um intervalo opcional de datas (`start`, `end`). "
+        "Com `base_currency`, soma os valores convertidos para essa moeda.\n\n"
+        "Responde com `ETag`; com `If-None-Match` igual, devolve `304` sem corpo (antes de consultar o relatório)."
+    ),
+    response_description="Lista de totais por categoria."
+)
+async def by_category(
+    response: Response,
+    start: Optional[dt.date] = Query(None, description="Data inicial (YYYY-MM-DD)."),
+    end: Optional[dt.date] = Query(None, description="Data final (YYYY-MM-DD)."),
+    base_currency: Optional[str] = Query(
+        None, min_length=3, max_length=3, description="Converte os valores para esta moeda pelas cotações de fx_rates."
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+    etag: str = Depends(etags.report_etag_async),
+):
+    base = base_currency.upper() if base_currency else None
+    rows = await _cached_report_rows(
+        db, current_user.id, "by-category", {"start": start, "end": end, "base_currency": base},
+        lambda: by_category_report(current_user.id, start, end, base),
+    )
+    etags.tagged(response, etag)
+    return [
+        CategorySum(category_id=r["category_id"], category_name=r["category_name"], total_amount=r["total_amount"])
+        for r in rows
+    ]
+
+@router.get(
+    "/analytics/series",
+    response_model=ExpenseSeries,
+    tags=["Reports"],
+    summary="Série diária com estatísticas",
+    description=(
+        "Gasto por dia entre `start` e `end` (despesas não canceladas), com acumulado, médias móveis de 7 e 30 "
+        "dias, variação mês a mês e a projeção linear do total do mês de `end`.\n\n"
+        "Uma consulta agregada por dia alimenta todos os cálculos, feitos em lote (NumPy). As médias dos "
+        "primeiros dias e a variação do primeiro mês usam os dados anteriores a `start`."
+    ),
+    response_description="Série diária, meses e projeção."
+)
+async def analytics_series(
+    params: SeriesQuery = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    series = params.series(current_user.id)
+    return FastJSONResponse(await _cached_report_rows(db, current_user.id, "series", params.params, lambda: series))
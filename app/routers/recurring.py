@@ -0,0 +1,151 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.deps import get_db, get_read_db, get_current_user
+from app.db.models import Expense, RecurrenceFrequency, RecurringExpense, User
+from app.db.recurring import first_date, occurrence_date
+from app.db.schemas import RecurringExpenseCreate, RecurringExpenseRead, RecurringExpenseUpdate
+
+router = APIRouter(prefix="/recurring-expenses", tags=["Recurring"])
+
+def validate_schedule(payload: RecurringExpenseCreate) -> None:
+    if payload.frequency == RecurrenceFrequency.INSTALLMENTS:
+        if not payload.installments or payload.installments < 1:
+            raise HTTPException(status_code=400, detail="installments must be >= 1 for INSTALLMENTS")
+    elif payload.installments is not None:
+        raise HTTPException(status_code=400, detail="installments is only allowed for INSTALLMENTS")
+    if payload.end_date is not None and payload.end_date < payload.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+
+def apply_changes(obj: RecurringExpense, payload: RecurringExpenseUpdate) -> None:
+    data = payload.model_dump(exclude_unset=True)
+    if data.get("end_date") is not None and data["end_date"] < obj.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    for k, v in data.items():
+        setattr(obj, k, v)
+    # As próximas ocorrências seguem os novos valores; as já lançadas não mudam
+    obj.next_date = occurrence_date(obj.frequency, obj.start_date, obj.end_date, obj.installments, obj.next_occurrence)
+
+def to_read(obj: RecurringExpense) -> RecurringExpenseRead:
+    return RecurringExpenseRead(
+        id=obj.id,
+        category_id=obj.category_id,
+        amount=obj.amount,
+        currency=obj.currency,
+        description=obj.description,
+        payment_method=obj.payment_method,
+        frequency=obj.frequency,
+        start_date=obj.start_date,
+        end_date=obj.end_date,
+        installments=obj.installments,
+        occurrences_created=obj.next_occurrence,
+        next_date=obj.next_date,
+    )
+
+def _get_owned(db: Session, recurring_id: int, user_id: int) -> RecurringExpense:
+    obj = (
+        db.query(RecurringExpense)
+        .filter(RecurringExpense.id == recurring_id, RecurringExpense.user_id == user_id)
+        .first()
+    )
+    if not obj:
+        raise HTTPException(status_code=404, detail="Recurring expense not found")
+    return obj
+
+@router.post(
+    "",
+    response_model=RecurringExpenseRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Criar despesa recorrente",
+    description=(
+        "Cadastra uma recorrência mensal, semanal ou um parcelamento em N vezes. O agendador lança cada ocorrência "
+        "vencida em `expenses` como **PLANNED**, inclusive as de datas já passadas."
+    ),
+    response_description="Recorrência criada."
+)
+def create_recurring_expense(
+    payload: RecurringExpenseCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    validate_schedule(payload)
+    obj = RecurringExpense(user_id=current_user.id, **payload.model_dump())
+    obj.next_date = first_date(obj)
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return to_read(obj)
+
+@router.get(
+    "",
+    response_model=List[RecurringExpenseRead],
+    summary="Listar despesas recorrentes",
+    description="Retorna as recorrências do usuário autenticado, inclusive as encerradas (`next_date` nulo).",
+    response_description="Lista de recorrências."
+)
+def list_recurring_expenses(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    rows = (
+        db.query(RecurringExpense)
+        .filter(RecurringExpense.user_id == current_user.id)
+        .order_by(RecurringExpense.id)
+        .all()
+    )
+    return [to_read(r) for r in rows]
+
+@router.get(
+    "/{recurring_id}",
+    response_model=RecurringExpenseRead,
+    summary="Buscar despesa recorrente por ID",
+    description="Retorna a recorrência correspondente ao `recurring_id` do usuário autenticado.",
+    response_description="Recorrência encontrada."
+)
+def get_recurring_expense(
+    recurring_id: int = Path(..., description="ID da recorrência."),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return to_read(_get_owned(db, recurring_id, current_user.id))
+
+@router.put(
+    "/{recurring_id}",
+    response_model=RecurringExpenseRead,
+    summary="Atualizar despesa recorrente",
+    description=(
+        "Altera valor, moeda, descrição, categoria, meio de pagamento ou data final. Vale para as próximas "
+        "ocorrências; as despesas já lançadas não mudam."
+    ),
+    response_description="Recorrência atualizada."
+)
+def update_recurring_expense(
+    recurring_id: int = Path(..., description="ID da recorrência."),
+    payload: RecurringExpenseUpdate = ...,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    obj = _get_owned(db, recurring_id, current_user.id)
+    apply_changes(obj, payload)
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return to_read(obj)
+
+@router.delete(
+    "/{recurring_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Excluir despesa recorrente",
+    description="Encerra e remove a recorrência. As despesas já lançadas continuam, desvinculadas dela."
+)
+def delete_recurring_expense(
+    recurring_id: int = Path(..., description="ID da recorrência."),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    obj = _get_owned(db, recurring_id, current_user.id)
+    db.execute(update(Expense).where(Expense.recurring_id == obj.id).values(recurring_id=None))
+    db.delete(obj)
+    db.commit()
+    return None
@@ -0,0 +1,111 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import get_async_db, get_async_read_db, get_current_user_async
+from app.db.models import Expense, RecurringExpense, User
+from app.db.recurring import first_date
+from app.db.schemas import RecurringExpenseCreate, RecurringExpenseRead, RecurringExpenseUpdate
+from app.routers.recurring import apply_changes, to_read, validate_schedule
+
+# Versão assíncrona de app/routers/recurring.py (ativada com ASYNC_DB); mesmas rotas e contratos.
+router = APIRouter(prefix="/recurring-expenses", tags=["Recurring"])
+
+async def _get_owned(db: AsyncSession, recurring_id: int, user_id: int) -> RecurringExpense:
+    stmt = select(RecurringExpense).where(RecurringExpense.id == recurring_id, RecurringExpense.user_id == user_id)
+    obj = (await db.execute(stmt)).scalars().first()
+    if not obj:
+        raise HTTPException(status_code=404, detail="Recurring expense not found")
+    return obj
+
+@router.post(
+    "",
+    response_model=RecurringExpenseRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Criar despesa recorrente",
+    description=(
+        "Cadastra uma recorrência mensal, semanal ou um parcelamento em N vezes. O agendador lança cada ocorrência "
+        "vencida em `expenses` como **PLANNED**, inclusive as de datas já passadas."
+    ),
+    response_description="Recorrência criada."
+)
+async def create_recurring_expense(
+    payload: RecurringExpenseCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    validate_schedule(payload)
+    obj = RecurringExpense(user_id=current_user.id, **payload.model_dump())
+    obj.next_date = first_date(obj)
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    return to_read(obj)
+
+@router.get(
+    "",
+    response_model=List[RecurringExpenseRead],
+    summary="Listar despesas recorrentes",
+    description="Retorna as recorrências do usuário autenticado, inclusive as encerradas (`next_date` nulo).",
+    response_description="Lista de recorrências."
+)
+async def list_recurring_expenses(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    stmt = select(RecurringExpense).where(RecurringExpense.user_id == current_user.id).order_by(RecurringExpense.id)
+    return [to_read(r) for r in (await db.execute(stmt)).scalars().all()]
+
+@router.get(
+    "/{recurring_id}",
+    response_model=RecurringExpenseRead,
+    summary="Buscar despesa recorrente por ID",
+    description="Retorna a recorrência correspondente ao `recurring_id` do usuário autenticado.",
+    response_description="Recorrência encontrada."
+)
+async def get_recurring_expense(
+    recurring_id: int = Path(..., description="ID da recorrência."),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return to_read(await _get_owned(db, recurring_id, current_user.id))
+
+@router.put(
+    "/{recurring_id}",
+    response_model=RecurringExpenseRead,
+    summary="Atualizar despesa recorrente",
+    description=(
+        "Altera valor, moeda, descrição, categoria, meio de pagamento ou data final. Vale para as próximas "
+        "ocorrências; as despesas já lançadas não mudam."
+    ),
+    response_description="Recorrência atualizada."
+)
+async def update_recurring_expense(
+    recurring_id: int = Path(..., description="ID da recorrência."),
+    payload: RecurringExpenseUpdate = ...,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    obj = await _get_owned(db, recurring_id, current_user.id)
+    apply_changes(obj, payload)
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    return to_read(obj)
+
+@router.delete(
+    "/{recurring_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Excluir despesa recorrente",
+    description="Encerra e remove a recorrência. As despesas já lançadas continuam, desvinculadas dela."
+)
+async def delete_recurring_expense(
+    recurring_id: int = Path(..., description="ID da recorrência."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    obj = await _get_owned(db, recurring_id, current_user.id)
+    await db.execute(update(Expense).where(Expense.recurring_id == obj.id).values(recurring_id=None))
+    await db.delete(obj)
+    await db.commit()
+    return None
@@ -0,0 +1,185 @@
+"""Isolamento entre usuários: p99 de um usuário comum enquanto outro dispara rotas caras sem parar.
+
+Popula um SQLite novo com dois usuários e, com o controle de admissão desligado e ligado, sobe a API no uvicorn
+(um processo por modo, pois Settings é lida na importação) e mede a latência das leituras baratas da vítima
+(listagem, consulta por ID, orçamentos) sozinha e durante o abuso: outro processo mantém `--abusers`
+requisições simultâneas, sem pausa e sem respeitar `Retry-After`, a relatórios sem cache e à exportação.
+O pool é pequeno de propósito, para que o abusador consiga esgotá-lo.
+
+Uso: python -m benchmarks.admission --expenses 20000 --abusers 32 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+ABUSE_ROUTES = (
+    ("/expenses/summary", {"group_by": ["month", "category"]}),
+    ("/expenses/summary/by-category", {}),
+    ("/expenses/export", {"format": "csv"}),
+)
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(p / 100 * len(sorted_values))) - 1]
+
+def summarize(samples: List[tuple]) -> Dict:
+    latencies = sorted(ms for ms, _ in samples)
+    return {
+        "requests": len(samples),
+        "status_codes": {str(k): v for k, v in sorted(Counter(code for _, code in samples).items())},
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+# ===== Clientes =====
+
+async def victim(base_url: str, token: str, expense_ids: List[int], rate: float, duration: float) -> List[tuple]:
+    """Usuário comum: leituras baratas a `rate` req/s (abaixo da cota), medindo cada uma."""
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = ["/expenses", "/budgets/status"] + [f"/expenses/{e}" for e in expense_ids]
+    samples, i = [], 0
+    until = time.perf_counter() + duration
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        while time.perf_counter() < until:
+            started = time.perf_counter()
+            response = await client.get(paths[i % len(paths)], headers=headers)
+            elapsed = time.perf_counter() - started
+            samples.append((elapsed * 1000, response.status_code))
+            i += 1
+            await asyncio.sleep(max(0.0, 1 / rate - elapsed))
+    return samples
+
+async def abuse(base_url: str, token: str, concurrency: int, duration: float) -> Dict[str, int]:
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    statuses: Counter = Counter()
+    until = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        async def worker(offset: int):
+            i = offset
+            while time.perf_counter() < until:
+                path, params = ABUSE_ROUTES[i % len(ABUSE_ROUTES)]
+                statuses[(await client.get(path, params=params, headers=headers)).status_code] += 1
+                i += 1
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return {str(k): v for k, v in sorted(statuses.items())}
+
+# ===== Servidor =====
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(env: Dict[str, str], port: int) -> subprocess.Popen:
+    import httpx
+
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    server = subprocess.Popen(cmd, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+def run_mode(mode: str, db: Path, users: List[Dict], expense_ids: List[int], args: argparse.Namespace) -> Dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db}",
+        "JWT_SECRET": "benchmark-secret",
+        "ADMISSION_ENABLED": "true" if mode == "on" else "false",
+        "DB_POOL_SIZE": str(args.pool_size),
+        "DB_MAX_OVERFLOW": "0",
+        "REPORT_CACHE_BACKEND": "none",
+        "RECURRING_SCHEDULER_SECONDS": "0",
+    }
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(env, port)
+    try:
+        alone = asyncio.run(victim(base_url, users[0]["token"], expense_ids, args.victim_rate, args.duration))
+        abuser = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.admission", "--abuse", base_url, "--token", users[1]["token"],
+             "--abusers", str(args.abusers), "--duration", str(args.duration)],
+            env=env, stdout=subprocess.PIPE, text=True,
+        )
+        time.sleep(1)  # o abusador já saturando quando a medição começa
+        abused = asyncio.run(victim(base_url, users[0]["token"], expense_ids, args.victim_rate, args.duration - 1))
+        abuser_statuses = json.loads(abuser.communicate()[0].strip().splitlines()[-1])
+    finally:
+        server.terminate()
+        server.wait()
+    return {"victim_alone": summarize(alone), "victim_under_abuse": summarize(abused), "abuser": abuser_statuses}
+
+def seed_db(path: Path, expenses: int):
+    from sqlalchemy import create_engine, select
+    from app.core.security import create_access_token
+    from app.db.models import Expense
+    from benchmarks.seed import seed
+
+    engine = create_engine(f"sqlite:///{path}")
+    users = seed(engine, 2, 8, expenses, 3)
+    for u in users:
+        u["token"] = create_access_token(u["email"], user_id=u["user_id"])
+    with engine.connect() as conn:
+        stmt = select(Expense.id).where(Expense.user_id == users[0]["user_id"]).limit(50)
+        expense_ids = list(conn.execute(stmt).scalars())
+    engine.dispose()
+    return users, expense_ids
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="p99 de um usuário com e sem controle de admissão sob abuso de outro.")
+    parser.add_argument("--expenses", type=int, default=20000, help="Despesas de cada um dos dois usuários.")
+    parser.add_argument("--abusers", type=int, default=32, help="Requisições simultâneas do abusador.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de cada fase.")
+    parser.add_argument("--victim-rate", type=float, default=10.0, help="req/s da vítima.")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--abuse", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--token", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.abuse:
+        print(json.dumps(asyncio.run(abuse(args.abuse, args.token, args.abusers, args.duration))))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "admission.db"
+        # Antes de importar `app`; o servidor recebe as mesmas variáveis em run_mode
+        os.environ["DATABASE_URL"] = f"sqlite:///{db}"
+        os.environ["JWT_SECRET"] = "benchmark-secret"
+        users, expense_ids = seed_db(db, args.expenses)
+        results = {mode: run_mode(mode, db, users, expense_ids, args) for mode in ("off", "on")}
+
+    print(f"pool_size={args.pool_size}, {args.abusers} concurrent abusive requests, victim at {args.victim_rate} req/s")
+    for mode, r in results.items():
+        for phase in ("victim_alone", "victim_under_abuse"):
+            s = r[phase]
+            print(
+                f"admission {mode:3s}  {phase:19s} p50 {s['p50_ms']:8.2f}ms  p99 {s['p99_ms']:8.2f}ms  "
+                f"{s['requests']:5d} req  {s['status_codes']}"
+            )
+        print(f"admission {mode:3s}  abuser status codes {r['abuser']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Tempo de GET /expenses/analytics/series sobre vários anos do histórico de um usuário pesado.
+
+Popula um SQLite novo com despesas diárias de um usuário (e de outros, para o índice não ser trivial) e mede,
+separadamente, a consulta agregada por dia e o cálculo das estatísticas (acumulado, médias móveis, variação
+mês a mês e projeção).
+
+Uso: python -m benchmarks.analytics_series --expenses 100000 --years 5
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from app.db.analytics import Series  # noqa: E402
+from app.db.models import Expense, User  # noqa: E402
+from benchmarks.seed import DESCRIPTIONS  # noqa: E402
+
+def build_db(path: Path, expenses: int, years: int, rng: random.Random):
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    first = dt.date.today() - dt.timedelta(days=365 * years)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": f"series{i}@example.com", "password_hash": "x"} for i in range(10)])
+        user_ids = list(conn.execute(select(User.id)).scalars())
+        conn.execute(insert(Expense), [
+            {
+                "user_id": user_ids[0] if i % 2 == 0 else rng.choice(user_ids[1:]),
+                "amount": round(rng.uniform(1, 900), 2),
+                "description": rng.choice(DESCRIPTIONS),
+                "date": first + dt.timedelta(days=rng.randrange(365 * years + 1)),
+                "status": rng.choice(("PAID", "PAID", "PLANNED", "CANCELLED")),
+            }
+            for i in range(expenses * 2)
+        ])
+    return engine, user_ids[0], first
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tempo da série diária com estatísticas para um usuário pesado.")
+    parser.add_argument("--expenses", type=int, default=100000, help="Despesas do usuário medido.")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, user_id, first = build_db(Path(tmp) / "series.db", args.expenses, args.years, random.Random(42))
+        with engine.connect() as conn:
+            query, compute = [], []
+            for _ in range(args.runs):
+                series = Series(user_id, first, dt.date.today())
+                started = time.perf_counter()
+                rows = conn.execute(series.statement).all()
+                query.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                out = series.rows(rows)
+                compute.append((time.perf_counter() - started) * 1000)
+        engine.dispose()
+
+    print(f"{args.expenses} expenses over {args.years} years -> {len(out['days'])} days, {len(out['months'])} months")
+    print(f"query (group by day)   : {statistics.median(query):8.3f} ms")
+    print(f"statistics (NumPy)     : {statistics.median(compute):8.3f} ms")
+    print(f"total                  : {statistics.median(query) + statistics.median(compute):8.3f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
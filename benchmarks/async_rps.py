@@ -0,0 +1,191 @@
+"""Vazão das leituras com os routers síncronos e assíncronos sob clientes concorrentes.
+
+Popula um SQLite novo em disco e, com `ASYNC_DB` desligado e ligado, sobe a API no uvicorn (um processo por modo,
+pois Settings é lida na importação; no modo async a engine usa o aiosqlite) e mede requisições por segundo,
+p50/p99 e códigos de status para cada nível de `--concurrency`. As requisições alternam listagem, consulta por ID,
+categorias e o resumo mensal. A carga sai de outro processo, para que o cliente não dispute o event loop do
+servidor nem o do processo que coordena a medição.
+
+No modo síncrono cada requisição ocupa uma thread do threadpool do Starlette (40 por padrão) até a resposta; acima
+disso as requisições esperam uma thread livre. No assíncrono elas aguardam o banco no event loop.
+
+Uso: python -m benchmarks.async_rps --expenses-per-user 20000 --concurrency 16,64,256 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+MODES = ("sync", "async")
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(p / 100 * len(sorted_values))) - 1]
+
+# ===== Carga (processo filho) =====
+
+async def load(base_url: str, users: List[Dict], concurrency: int, duration: float, warmup: float) -> Dict:
+    import httpx
+
+    paths = []
+    for u in users:
+        headers = {"Authorization": f"Bearer {u['token']}"}
+        paths += [("/expenses", headers), ("/categories", headers), ("/expenses/summary/monthly", headers)]
+        paths += [(f"/expenses/{e}", headers) for e in u["expense_ids"]]
+    samples: List[tuple] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        async def worker(offset: int, until: float, record: bool):
+            i = offset
+            while time.perf_counter() < until:
+                path, headers = paths[i % len(paths)]
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                if record:
+                    samples.append(((time.perf_counter() - started) * 1000, response.status_code))
+                i += 7
+
+        # Aquecimento: abre as conexões HTTP e as do pool, enche o cache de usuários autenticados
+        until = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(n, until, False) for n in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n, started + duration, True) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for ms, _ in samples)
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "status_codes": {str(k): v for k, v in sorted(Counter(code for _, code in samples).items())},
+    }
+
+# ===== Servidor =====
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(env: Dict[str, str], port: int) -> subprocess.Popen:
+    import httpx
+
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    server = subprocess.Popen(cmd, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+def run_mode(mode: str, db: Path, users_file: Path, args: argparse.Namespace) -> Dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db}",
+        "JWT_SECRET": "benchmark-secret",
+        "ASYNC_DB": "true" if mode == "async" else "false",
+        "DB_POOL_SIZE": str(args.pool_size),
+        "DB_MAX_OVERFLOW": "0",
+        "DB_POOL_TIMEOUT_SECONDS": "60",
+        "ADMISSION_ENABLED": "false",
+        "RECURRING_SCHEDULER_SECONDS": "0",
+    }
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(env, port)
+    results = {}
+    try:
+        for concurrency in args.levels:
+            cmd = [
+                sys.executable, "-m", "benchmarks.async_rps", "--load", base_url, "--users-file", str(users_file),
+                "--concurrency", str(concurrency), "--duration", str(args.duration), "--warmup", str(args.warmup),
+            ]
+            out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+            results[concurrency] = json.loads(out.strip().splitlines()[-1])
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+def seed_db(path: Path, args: argparse.Namespace) -> List[Dict]:
+    from sqlalchemy import create_engine, select
+    from app.core.security import create_access_token
+    from app.db.models import Expense
+    from benchmarks.seed import seed
+
+    engine = create_engine(f"sqlite:///{path}")
+    users = seed(engine, args.users, args.categories, args.expenses_per_user, args.years)
+    with engine.connect() as conn:
+        for u in users:
+            stmt = select(Expense.id).where(Expense.user_id == u["user_id"]).limit(20)
+            u["expense_ids"] = list(conn.execute(stmt).scalars())
+    engine.dispose()
+    return [
+        {"token": create_access_token(u["email"], user_id=u["user_id"]), "expense_ids": u["expense_ids"]}
+        for u in users
+    ]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Requisições por segundo dos routers síncronos e assíncronos.")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--expenses-per-user", type=int, default=20000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--concurrency", default="16,64,256", help="Clientes simultâneos (separados por vírgula).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos medidos por nível.")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--load", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--users-file", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.levels = [int(c) for c in args.concurrency.split(",")]
+    if args.load:
+        users = json.loads(Path(args.users_file).read_text())
+        print(json.dumps(asyncio.run(load(args.load, users, args.levels[0], args.duration, args.warmup))))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "async_rps.db"
+        # Antes de importar `app` (o seed reconstrói o rollup pela engine do app); o servidor recebe as mesmas
+        os.environ["DATABASE_URL"] = f"sqlite:///{db}"
+        os.environ["JWT_SECRET"] = "benchmark-secret"
+        users_file = Path(tmp) / "users.json"
+        users_file.write_text(json.dumps(seed_db(db, args)))
+        results = {mode: run_mode(mode, db, users_file, args) for mode in MODES}
+
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"{args.users} users x {args.expenses_per_user} expenses, pool_size={args.pool_size}, {cpus} CPU(s)")
+    for concurrency in args.levels:
+        for mode in MODES:
+            r = results[mode][concurrency]
+            print(
+                f"{concurrency:4d} clients  {mode:5s}  {r['rps']:8.1f} req/s  p50 {r['p50_ms']:8.2f}ms  "
+                f"p99 {r['p99_ms']:8.2f}ms  {r['status_codes']}"
+            )
+    if args.output:
+        Path(args.output).write_text(json.dumps(
+            {"users": args.users, "expenses_per_user": args.expenses_per_user, "pool_size": args.pool_size,
+             "duration_s": args.duration, "results": results},
+            indent=2,
+        ))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
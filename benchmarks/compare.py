@@ -0,0 +1,43 @@
+"""Compara dois resultados de benchmarks.run e aponta regressões.
+
+Uso: python -m benchmarks.compare antes.json depois.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+HIGHER_IS_BETTER = {"throughput_rps"}
+
+def change_pct(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara dois JSON de benchmark.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Piora percentual considerada regressão.")
+    args = parser.parse_args(argv)
+    before = json.loads(Path(args.before).read_text())
+    after = json.loads(Path(args.after).read_text())
+    print(f"before: {before['meta']['git']}  after: {after['meta']['git']}")
+
+    regressions = 0
+    for name in sorted(before["scenarios"].keys() & after["scenarios"].keys()):
+        b, a = before["scenarios"][name], after["scenarios"][name]
+        cells = []
+        for metric in METRICS:
+            delta = change_pct(b[metric], a[metric])
+            worse = -delta if metric in HIGHER_IS_BETTER else delta
+            flag = " !" if worse > args.threshold else ""
+            regressions += bool(flag)
+            cells.append(f"{metric} {b[metric]:.2f} -> {a[metric]:.2f} ({delta:+.1f}%){flag}")
+        print(f"{name:22s} " + " | ".join(cells))
+    for name in sorted(before["scenarios"].keys() ^ after["scenarios"].keys()):
+        print(f"{name:22s} only in {'before' if name in before['scenarios'] else 'after'}")
+    print(f"{regressions} metric(s) worse than {args.threshold:.0f}%" if regressions else "no regressions")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Tela inicial: as cinco chamadas em sequência contra uma chamada a GET /dashboard.
+
+Popula um SQLite novo em disco e, com os routers síncronos e assíncronos (um processo por modo, pois Settings
+é lida na importação), mede a latência de carregar a tela inicial de `--users` usuários contra o `app` real em
+processo (cliente ASGI do `httpx`):
+- five_sequential: /auth/me, /categories, /expenses, /expenses/summary/monthly e /expenses/summary/by-category,
+  uma após a outra (cada uma autentica e abre a própria sessão);
+- five_parallel: as mesmas cinco disparadas juntas pelo cliente;
+- dashboard: GET /dashboard com todas as seções.
+O cache de relatórios fica desligado: mede-se as consultas. No SQLite o módulo sqlite3 solta o GIL durante a
+consulta, então seções em conexões diferentes rodam em paralelo, mas só com mais de um núcleo: as consultas locais
+não esperam I/O, e num núcleo só o dashboard fica perto da soma das seções (a saída mostra os núcleos disponíveis).
+
+Uso: python -m benchmarks.dashboard --expenses-per-user 50000 --years 3 --runs 50
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+MODES = ("sync", "async")
+FIVE_CALLS = (
+    "/auth/me", "/categories", "/expenses", "/expenses/summary/monthly", "/expenses/summary/by-category",
+)
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(p / 100 * len(sorted_values))) - 1]
+
+def summarize(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    return {"p50_ms": round(statistics.median(ordered), 2), "p95_ms": round(percentile(ordered, 95), 2)}
+
+# ===== Processo filho: um modo =====
+
+async def run_mode(args: argparse.Namespace) -> Dict:
+    import httpx
+    from app.core.security import create_access_token
+    from app.main import app
+
+    users = json.loads(Path(args.db + ".json").read_text())
+    headers = [{"Authorization": f"Bearer {create_access_token(u['email'], user_id=u['user_id'])}"} for u in users]
+    statuses: Dict[str, int] = {}
+    per_call: Dict[str, List[float]] = {path: [] for path in FIVE_CALLS}
+
+    def check(response) -> None:
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    async def five_sequential(client, h):
+        for path in FIVE_CALLS:
+            started = time.perf_counter()
+            check(await client.get(path, headers=h))
+            per_call[path].append((time.perf_counter() - started) * 1000)
+
+    async def five_parallel(client, h):
+        for response in await asyncio.gather(*(client.get(path, headers=h) for path in FIVE_CALLS)):
+            check(response)
+
+    async def dashboard(client, h):
+        check(await client.get("/dashboard", headers=h))
+
+    scenarios = {"five_sequential": five_sequential, "five_parallel": five_parallel, "dashboard": dashboard}
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Aquece cache de usuários autenticados, diretório e pools antes de medir
+        for h in headers:
+            for load in scenarios.values():
+                await load(client, h)
+        for samples in per_call.values():
+            samples.clear()
+        for name, load in scenarios.items():
+            samples = []
+            for i in range(args.runs):
+                started = time.perf_counter()
+                await load(client, headers[i % len(headers)])
+                samples.append((time.perf_counter() - started) * 1000)
+            results[name] = summarize(samples)
+    # Referências: o dashboard deve ficar perto da chamada mais lenta, não da soma das cinco
+    medians = [statistics.median(samples) for samples in per_call.values()]
+    results["slowest_call_p50_ms"] = round(max(medians), 2)
+    results["sum_of_calls_p50_ms"] = round(sum(medians), 2)
+    results["status_codes"] = statuses
+    return results
+
+def child(args: argparse.Namespace) -> int:
+    from app.core.security import password_pool
+    from app.routers.dashboard import section_pool
+
+    try:
+        print(json.dumps(asyncio.run(run_mode(args))))
+    finally:
+        if section_pool is not None:
+            section_pool.shutdown()
+        password_pool.shutdown()
+    return 0
+
+# ===== Processo pai =====
+
+def seed_db(path: Path, args: argparse.Namespace) -> None:
+    from sqlalchemy import create_engine
+    from benchmarks.seed import seed
+
+    engine = create_engine(f"sqlite:///{path}")
+    users = seed(engine, args.users, args.categories, args.expenses_per_user, args.years)
+    engine.dispose()
+    Path(str(path) + ".json").write_text(json.dumps([{"user_id": u["user_id"], "email": u["email"]} for u in users]))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cinco chamadas da tela inicial contra GET /dashboard.")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--expenses-per-user", type=int, default=50000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=50, help="Carregamentos medidos por cenário.")
+    parser.add_argument("--db", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.mode:
+        return child(args)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "dashboard.db"
+        # Antes de importar `app` (o seed reconstrói o rollup pela engine do app); os filhos herdam as variáveis
+        os.environ["DATABASE_URL"] = f"sqlite:///{db}"
+        os.environ["JWT_SECRET"] = "benchmark-secret"
+        seed_db(db, args)
+        for mode in MODES:
+            env = {
+                **os.environ,
+                "ASYNC_DB": "true" if mode == "async" else "false",
+                "REPORT_CACHE_BACKEND": "none",
+                "ADMISSION_ENABLED": "false",
+                "RECURRING_SCHEDULER_SECONDS": "0",
+            }
+            cmd = [
+                sys.executable, "-m", "benchmarks.dashboard", "--db", str(db), "--mode", mode,
+                "--runs", str(args.runs),
+            ]
+            out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+            results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(
+        f"{args.users} users x {args.expenses_per_user} expenses over {args.years} years, {args.runs} loads each, "
+        f"{len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()} CPU(s)"
+    )
+    for mode, r in results.items():
+        for name in ("five_sequential", "five_parallel", "dashboard"):
+            print(f"{mode:5s}  {name:15s}  p50 {r[name]['p50_ms']:8.2f}ms  p95 {r[name]['p95_ms']:8.2f}ms")
+        print(
+            f"{mode:5s}  slowest of the five calls p50 {r['slowest_call_p50_ms']:8.2f}ms  "
+            f"sum of the five p50 {r['sum_of_calls_p50_ms']:8.2f}ms  status codes {r['status_codes']}"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Memória do servidor durante GET /expenses/export: o RSS deve ficar plano enquanto as linhas saem.
+
+Popula um SQLite novo com dois usuários (`--rows` despesas e um décimo disso), sobe a API no uvicorn e exporta
+o histórico inteiro de cada um por HTTP, descartando o corpo conforme chega. Um thread lê o RSS do processo do
+servidor (/proc/<pid>/status, só Linux) durante a exportação. O cliente fica em outro processo: o que se mede é
+a memória do worker da API, não a do corpo acumulado.
+
+Uso: python -m benchmarks.export_rss --rows 1000000 --format csv
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.admission import free_port, start_server
+
+SAMPLE_SECONDS = 0.05
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError(f"VmRSS not found for pid {pid}")
+
+class RssSampler(threading.Thread):
+    """Lê o RSS de `pid` a cada SAMPLE_SECONDS até stop(); guarda (segundos, MB)."""
+
+    def __init__(self, pid: int):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.samples: List[tuple] = []
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        while not self._done.wait(SAMPLE_SECONDS):
+            self.samples.append((time.perf_counter() - started, rss_mb(self.pid)))
+
+    def stop(self) -> List[tuple]:
+        self._done.set()
+        self.join()
+        return self.samples
+
+def export(base_url: str, token: str, fmt: str, pid: int) -> Dict:
+    import httpx
+
+    sampler = RssSampler(pid)
+    before = rss_mb(pid)
+    received = lines = 0
+    started = time.perf_counter()
+    sampler.start()
+    params = {"format": fmt, "start": "1970-01-01"}
+    headers = {"Authorization": f"Bearer {token}"}
+    with httpx.stream("GET", f"{base_url}/expenses/export", params=params, headers=headers, timeout=None) as r:
+        r.raise_for_status()
+        for chunk in r.iter_bytes():
+            received += len(chunk)
+            lines += chunk.count(b"\n")
+    elapsed = time.perf_counter() - started
+    samples = sampler.stop()
+    rss = [mb for _, mb in samples] or [before]
+    # RSS a cada décimo da exportação: plano = não cresce com as linhas já enviadas
+    deciles = [rss[min(len(rss) - 1, len(rss) * i // 10)] for i in range(1, 11)]
+    return {
+        "rows": lines - (1 if fmt == "csv" else 0),
+        "mb_sent": round(received / 2**20, 1),
+        "seconds": round(elapsed, 2),
+        "rss_before_mb": round(before, 1),
+        "rss_peak_mb": round(max(rss), 1),
+        "rss_deciles_mb": [round(mb, 1) for mb in deciles],
+    }
+
+def seed_db(path: Path, rows: int) -> List[Dict]:
+    from sqlalchemy import create_engine, insert, select
+    from app.core.security import create_access_token
+    from app.db.models import Expense
+    from benchmarks.seed import seed
+
+    engine = create_engine(f"sqlite:///{path}")
+    small, large = seed(engine, 2, 8, rows // 10, 5)
+    # O usuário grande recebe nove cópias do próprio histórico: gerar 1M de linhas aleatórias em Python
+    # levaria minutos e não muda o que se mede (a exportação não olha os valores)
+    table = Expense.__table__
+    columns = [c.name for c in table.c if c.name != "id"]
+    copy = select(*(table.c[c] for c in columns)).where(table.c.user_id == large["user_id"]).limit(rows // 10)
+    with engine.begin() as conn:
+        for _ in range(9):
+            conn.execute(insert(table).from_select(columns, copy))
+    engine.dispose()
+    return [
+        {"name": "small", "token": create_access_token(small["email"], user_id=small["user_id"])},
+        {"name": "large", "token": create_access_token(large["email"], user_id=large["user_id"])},
+    ]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="RSS do servidor durante a exportação em streaming.")
+    parser.add_argument("--rows", type=int, default=1000000, help="Despesas do usuário grande (o pequeno tem 1/10).")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args(argv)
+    if not sys.platform.startswith("linux"):
+        parser.error("reads the server RSS from /proc: Linux only")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "export.db"
+        # Antes de importar `app` (o seed reconstrói o rollup pela engine do app); o servidor herda as variáveis
+        os.environ["DATABASE_URL"] = f"sqlite:///{db}"
+        os.environ["JWT_SECRET"] = "benchmark-secret"
+        users = seed_db(db, args.rows)
+        env = {**os.environ, "ADMISSION_ENABLED": "false", "RECURRING_SCHEDULER_SECONDS": "0"}
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(env, port)
+        try:
+            export(base_url, users[0]["token"], args.format, server.pid)  # aquece imports, pools e caches
+            results = {u["name"]: export(base_url, u["token"], args.format, server.pid) for u in users}
+        finally:
+            server.terminate()
+            server.wait()
+
+    for name, r in results.items():
+        print(
+            f"{name:5s}  {r['rows']:8d} rows  {r['mb_sent']:7.1f}MB in {r['seconds']:6.2f}s  "
+            f"server RSS before {r['rss_before_mb']:6.1f}MB  peak {r['rss_peak_mb']:6.1f}MB"
+        )
+        print(f"{'':5s}  RSS per tenth of the export (MB): {r['rss_deciles_mb']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Custo de converter o histórico inteiro de um usuário (GET /expenses/summary/monthly?base_currency=).
+
+Popula um SQLite novo com despesas em várias moedas e cotações diárias (com buracos de fim de semana)
+e mede, separadamente, a consulta agrupada por dia/moeda e a conversão em lote + reagregação por mês.
+
+Uso: python -m benchmarks.fx_conversion --expenses 50000 --years 10
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from app.db.fx import FxTable  # noqa: E402
+from app.db.models import Expense, FxRate, User  # noqa: E402
+from app.db.reports import Report, ReportSpec  # noqa: E402
+from benchmarks.seed import CURRENCIES, DESCRIPTIONS  # noqa: E402
+
+def build_db(path: Path, expenses: int, years: int, rng: random.Random):
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    first = dt.date.today() - dt.timedelta(days=365 * years)
+    days = [first + dt.timedelta(days=i) for i in range(365 * years + 1)]
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(email="fx@example.com", password_hash="x")).inserted_primary_key[0]
+        conn.execute(insert(Expense), [
+            {
+                "user_id": user_id,
+                "amount": round(rng.uniform(1, 900), 2),
+                "currency": rng.choice(CURRENCIES),
+                "description": rng.choice(DESCRIPTIONS),
+                "date": rng.choice(days),
+            }
+            for _ in range(expenses)
+        ])
+        conn.execute(insert(FxRate), [
+            {"date": day, "currency": cur, "rate": round(rng.uniform(4, 7), 4)}
+            for day in days if day.weekday() < 5
+            for cur in CURRENCIES if cur != "BRL"
+        ])
+    return engine, user_id
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tempo de conversão de moeda do histórico completo de um usuário.")
+    parser.add_argument("--expenses", type=int, default=50000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, user_id = build_db(Path(tmp) / "fx.db", args.expenses, args.years, rng)
+        with engine.connect() as conn:
+            started = time.perf_counter()
+            fx = FxTable(conn.execute(select(FxRate.date, FxRate.currency, FxRate.rate)).all(), "BRL")
+            load_ms = (time.perf_counter() - started) * 1000
+
+            query, convert = [], []
+            for _ in range(args.runs):
+                report = Report(ReportSpec(user_id, ["month", "currency"], base_currency="USD"))
+                started = time.perf_counter()
+                rows = conn.execute(report.statement).all()
+                query.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                months = report.rows(rows, fx)
+                convert.append((time.perf_counter() - started) * 1000)
+        engine.dispose()
+
+    print(f"{args.expenses} expenses over {args.years} years, {len(rows)} (day, currency) groups -> {len(months)} months")
+    print(f"load fx_rates          : {load_ms:8.3f} ms (once per FX_CACHE_TTL_SECONDS)")
+    print(f"query (group by day)   : {statistics.median(query):8.3f} ms")
+    print(f"convert + re-aggregate : {statistics.median(convert):8.3f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Tempestade de logins: p99 de GET /expenses de um usuário enquanto outros fazem login sem parar.
+
+Popula um SQLite novo e, com o bcrypt inline (PASSWORD_HASH_WORKERS=0, numa thread do threadpool) e no pool de
+processos, sobe a API no uvicorn (um processo por modo, pois Settings é lida na importação) e mede a latência de
+`GET /expenses` sozinha e durante a tempestade: outro processo mantém `--logins` logins simultâneos com bcrypt de
+custo `--bcrypt-rounds`. Com o pool, as rotas de login aguardam o hash sem ocupar threads, e o excedente da fila
+recebe 503 na hora.
+
+Uso: python -m benchmarks.login_storm --logins 64 --duration 10 --bcrypt-rounds 12
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.admission import free_port, start_server, summarize
+
+MODES = {"inline": "0", "pool": None}
+
+async def reader(base_url: str, token: str, rate: float, duration: float) -> List[tuple]:
+    """Usuário comum: GET /expenses a `rate` req/s, medindo cada uma."""
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    samples = []
+    until = time.perf_counter() + duration
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        while time.perf_counter() < until:
+            started = time.perf_counter()
+            response = await client.get("/expenses", params={"size": 20}, headers=headers)
+            elapsed = time.perf_counter() - started
+            samples.append((elapsed * 1000, response.status_code))
+            await asyncio.sleep(max(0.0, 1 / rate - elapsed))
+    return samples
+
+async def storm(base_url: str, emails: List[str], password: str, concurrency: int, duration: float) -> Dict[str, int]:
+    import httpx
+
+    statuses: Counter = Counter()
+    until = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        async def worker(offset: int):
+            i = offset
+            while time.perf_counter() < until:
+                form = {"username": emails[i % len(emails)], "password": password}
+                statuses[(await client.post("/auth/login", data=form)).status_code] += 1
+                i += 1
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return {str(k): v for k, v in sorted(statuses.items())}
+
+def run_mode(mode: str, users: List[Dict], args: argparse.Namespace) -> Dict:
+    env = {
+        **os.environ,
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "ADMISSION_ENABLED": "false",
+        "RECURRING_SCHEDULER_SECONDS": "0",
+    }
+    if MODES[mode] is not None:
+        env["PASSWORD_HASH_WORKERS"] = MODES[mode]
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(env, port)
+    try:
+        alone = asyncio.run(reader(base_url, users[0]["token"], args.rate, args.duration))
+        stormer = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.login_storm", "--storm", base_url,
+             "--emails", ",".join(u["email"] for u in users[1:]),
+             "--logins", str(args.logins), "--duration", str(args.duration)],
+            env=env, stdout=subprocess.PIPE, text=True,
+        )
+        time.sleep(1)  # a tempestade já em curso quando a medição começa
+        stormed = asyncio.run(reader(base_url, users[0]["token"], args.rate, args.duration - 1))
+        storm_statuses = json.loads(stormer.communicate()[0].strip().splitlines()[-1])
+    finally:
+        server.terminate()
+        server.wait()
+    return {"reader_alone": summarize(alone), "reader_during_storm": summarize(stormed), "logins": storm_statuses}
+
+def seed_db(path: Path, users: int, expenses: int) -> List[Dict]:
+    from sqlalchemy import create_engine
+    from app.core.security import create_access_token
+    from benchmarks.seed import seed
+
+    engine = create_engine(f"sqlite:///{path}")
+    seeded = seed(engine, users, 8, expenses, 3)
+    engine.dispose()
+    return [{"email": u["email"], "token": create_access_token(u["email"], user_id=u["user_id"])} for u in seeded]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="p99 de GET /expenses durante uma tempestade de logins.")
+    parser.add_argument("--logins", type=int, default=64, help="Logins simultâneos da tempestade.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de cada fase.")
+    parser.add_argument("--rate", type=float, default=20.0, help="req/s do leitor.")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--expenses", type=int, default=5000, help="Despesas do leitor.")
+    parser.add_argument("--storm", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--emails", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.storm:
+        from benchmarks.seed import BENCH_PASSWORD
+
+        emails = args.emails.split(",")
+        print(json.dumps(asyncio.run(storm(args.storm, emails, BENCH_PASSWORD, args.logins, args.duration))))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "login_storm.db"
+        # Antes de importar `app`; o servidor herda as mesmas variáveis
+        os.environ["DATABASE_URL"] = f"sqlite:///{db}"
+        os.environ["JWT_SECRET"] = "benchmark-secret"
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+        users = seed_db(db, 9, args.expenses)
+        results = {mode: run_mode(mode, users, args) for mode in MODES}
+
+    print(f"{args.logins} concurrent logins at bcrypt cost {args.bcrypt_rounds}, reader at {args.rate} req/s")
+    for mode, r in results.items():
+        for phase in ("reader_alone", "reader_during_storm"):
+            s = r[phase]
+            print(
+                f"bcrypt {mode:6s}  {phase:19s} p50 {s['p50_ms']:8.2f}ms  p99 {s['p99_ms']:8.2f}ms  "
+                f"{s['requests']:5d} req  {s['status_codes']}"
+            )
+        print(f"bcrypt {mode:6s}  login status codes {r['logins']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Tempo de uma execução do agendador de despesas recorrentes (app.db.recurring.materialize_due).
+
+Popula um SQLite novo com recorrências (mensais, semanais e parceladas) espalhadas entre usuários, todas
+com uma ocorrência vencida, e mede a execução que as lança em `expenses`. Uma segunda execução no
+mesmo dia mede o custo quando não há nada a fazer (deve ser só a varredura do índice).
+
+Uso: python -m benchmarks.recurring_scheduler --schedules 200000 --users 1000
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from app.db.models import Expense, RecurringExpense, User  # noqa: E402
+from app.db.recurring import materialize_due  # noqa: E402
+from benchmarks.seed import DESCRIPTIONS  # noqa: E402
+
+def build_db(path: Path, schedules: int, users: int, today: dt.date, rng: random.Random):
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": f"rec{i}@example.com", "password_hash": "x"} for i in range(users)])
+        user_ids = list(conn.execute(select(User.id)).scalars())
+        rows = []
+        for i in range(schedules):
+            frequency = rng.choice(("MONTHLY", "MONTHLY", "WEEKLY", "INSTALLMENTS"))
+            start = today - dt.timedelta(days=rng.randrange(6))
+            rows.append({
+                "user_id": rng.choice(user_ids),
+                "amount": round(rng.uniform(10, 3000), 2),
+                "description": rng.choice(DESCRIPTIONS),
+                "frequency": frequency,
+                "start_date": start,
+                "installments": rng.randint(2, 24) if frequency == "INSTALLMENTS" else None,
+                "next_occurrence": 0,
+                "next_date": start,
+            })
+        conn.execute(insert(RecurringExpense), rows)
+    return engine
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Duração de uma execução do agendador de despesas recorrentes.")
+    parser.add_argument("--schedules", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    today = dt.date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_db(Path(tmp) / "recurring.db", args.schedules, args.users, today, random.Random(42))
+        with Session(engine) as db:
+            started = time.perf_counter()
+            created = materialize_due(db, today, batch_size=args.batch_size)
+            first = time.perf_counter() - started
+            started = time.perf_counter()
+            again = materialize_due(db, today, batch_size=args.batch_size)
+            idle = time.perf_counter() - started
+            total = db.scalar(select(func.count()).select_from(Expense))
+        engine.dispose()
+
+    print(f"{args.schedules} schedules, batch {args.batch_size}")
+    print(f"due run : {created} expenses in {first:.2f}s ({created / first:,.0f} rows/s)")
+    print(f"idle run: {again} expenses in {idle * 1000:.1f}ms (expenses table: {total} rows)")
+    return 0 if again == 0 and total == created else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
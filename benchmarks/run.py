@@ -0,0 +1,225 @@
+"""Benchmark da API: popula um SQLite local e dispara os cenários contra o `app` real, em processo.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.run --users 20 --expenses-per-user 5000 --concurrency 16 --requests 500
+    python -m benchmarks.compare benchmarks/results/antes.json benchmarks/results/depois.json
+"""
+import argparse
+import asyncio
+import datetime as dt
+import json
+import math
+import os
+import platform
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark reprodutível da Expense API.")
+    data = parser.add_argument_group("dados")
+    data.add_argument("--db", default=str(BENCH_DIR / ".data" / "bench.db"), help="Arquivo SQLite do benchmark.")
+    data.add_argument("--users", type=int, default=10)
+    data.add_argument("--categories", type=int, default=8, help="Categorias por usuário.")
+    data.add_argument("--expenses-per-user", type=int, default=2000)
+    data.add_argument("--years", type=int, default=3, help="Anos de histórico das despesas.")
+    data.add_argument("--seed", type=int, default=42)
+    data.add_argument("--reseed", action="store_true", help="Recria o banco mesmo se os parâmetros forem os mesmos.")
+    load = parser.add_argument_group("carga")
+    load.add_argument("--scenarios", default="all", help="Lista separada por vírgulas (padrão: todos).")
+    load.add_argument("--requests", type=int, default=200, help="Requisições medidas por cenário.")
+    load.add_argument("--warmup", type=int, default=10, help="Requisições descartadas antes de medir.")
+    load.add_argument("--concurrency", type=int, default=8)
+    app_opts = parser.add_argument_group("aplicação")
+    app_opts.add_argument("--async-db", action="store_true", help="Roda com ASYNC_DB=true (routers async).")
+    app_opts.add_argument("--bcrypt-rounds", type=int, default=12)
+    app_opts.add_argument("--no-report-cache", action="store_true", help="REPORT_CACHE_BACKEND=none.")
+    parser.add_argument("--output", default=None, help="JSON de saída (padrão: benchmarks/results/<data>-<commit>.json).")
+    return parser.parse_args(argv)
+
+def configure_env(args: argparse.Namespace) -> None:
+    # Precisa acontecer antes de qualquer import de `app` (Settings lê o ambiente na importação)
+    Path(args.db).parent.mkdir(parents=True, exist_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(args.db).resolve()}"
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+    os.environ["ASYNC_DB"] = "true" if args.async_db else "false"
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    # Poucos usuários disparando centenas de requisições esgotariam as cotas: mede-se a API, não o limitador
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    if args.no_report_cache:
+        os.environ["REPORT_CACHE_BACKEND"] = "none"
+
+def git_revision() -> Dict[str, object]:
+    def git(*cmd):
+        return subprocess.run(["git", *cmd], cwd=BENCH_DIR, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+# ===== Dados =====
+
+def ensure_seeded(args: argparse.Namespace) -> List[Dict]:
+    from app.db.engine import engine
+    from benchmarks.seed import seed
+
+    params = {k: getattr(args, k) for k in ("users", "categories", "expenses_per_user", "years", "seed")}
+    meta_path = Path(args.db + ".json")
+    if not args.reseed and meta_path.exists() and Path(args.db).exists():
+        meta = json.loads(meta_path.read_text())
+        if meta["params"] == params:
+            return meta["users"]
+    engine.dispose()
+    for path in (Path(args.db), meta_path):
+        if path.exists():
+            path.unlink()
+    started = time.perf_counter()
+    users = seed(engine, args.users, args.categories, args.expenses_per_user, args.years, args.seed)
+    print(f"seeded {args.users} users x {args.expenses_per_user} expenses in {time.perf_counter() - started:.1f}s")
+    meta_path.write_text(json.dumps({"params": params, "users": users}))
+    return users
+
+def build_context(seeded: List[Dict], args: argparse.Namespace):
+    from sqlalchemy import select
+    from app.core.pagination import encode_cursor
+    from app.core.security import create_access_token
+    from app.db.engine import get_session
+    from app.db.models import Expense
+    from benchmarks.scenarios import BenchUser, Context
+
+    rng = random.Random(args.seed)
+    users = []
+    with get_session() as db:
+        for u in seeded:
+            ids = list(db.execute(select(Expense.id).where(Expense.user_id == u["user_id"])).scalars())
+            deep_page = max(1, int(len(ids) * 0.9) // 20)
+            row = db.execute(
+                select(Expense.date, Expense.id)
+                .where(Expense.user_id == u["user_id"])
+                .order_by(Expense.date.desc(), Expense.id.desc())
+                .offset(max(0, (deep_page - 1) * 20 - 1))
+                .limit(1)
+            ).first()
+            users.append(BenchUser(
+                email=u["email"],
+                user_id=u["user_id"],
+                token=create_access_token(u["email"], user_id=u["user_id"]),
+                category_ids=u["category_ids"],
+                expense_ids=rng.sample(ids, min(len(ids), 1000)),
+                deep_page=deep_page,
+                deep_cursor=encode_cursor(row.date, row.id) if row else "",
+            ))
+    return Context(users=users, rng=rng)
+
+# ===== Execução =====
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss é em KiB no Linux e em bytes no macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+async def run_phase(client, ctx, scenario, requests: int, concurrency: int) -> List[tuple]:
+    """Dispara `requests` chamadas com até `concurrency` em voo; devolve [(latência em ms, status)]."""
+    remaining = iter(range(requests))
+    samples: List[tuple] = []
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await scenario(client, ctx)
+            samples.append(((time.perf_counter() - started) * 1000, response.status_code))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+async def run_scenario(client, ctx, scenario, requests: int, warmup: int, concurrency: int) -> Dict:
+    await run_phase(client, ctx, scenario, warmup, concurrency)
+    started = time.perf_counter()
+    samples = await run_phase(client, ctx, scenario, requests, concurrency)
+    wall = time.perf_counter() - started
+
+    latencies = sorted(ms for ms, _ in samples)
+    statuses = Counter(code for _, code in samples)
+    return {
+        "requests": len(latencies),
+        "errors": sum(n for code, n in statuses.items() if code >= 400),
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+async def run_all(args: argparse.Namespace, ctx) -> Dict[str, Dict]:
+    import httpx
+    from app.main import app
+    from benchmarks.scenarios import SCENARIOS
+
+    names = list(SCENARIOS) if args.scenarios == "all" else [s.strip() for s in args.scenarios.split(",")]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown scenario(s): {', '.join(unknown)}; available: {', '.join(SCENARIOS)}")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name in names:
+            results[name] = await run_scenario(
+                client, ctx, SCENARIOS[name], args.requests, args.warmup, args.concurrency
+            )
+            r = results[name]
+            print(
+                f"{name:22s} {r['throughput_rps']:9.1f} req/s  p50 {r['p50_ms']:8.2f}ms  "
+                f"p95 {r['p95_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms  errors {r['errors']}"
+            )
+    return results
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_env(args)
+    seeded = ensure_seeded(args)
+    ctx = build_context(seeded, args)
+
+    from app.core.security import password_pool
+    try:
+        results = asyncio.run(run_all(args, ctx))
+    finally:
+        password_pool.shutdown()
+
+    revision = git_revision()
+    report = {
+        "meta": {
+            "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "git": revision,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "params": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "scenarios": results,
+    }
+    output = Path(args.output) if args.output else (
+        BENCH_DIR / "results" / f"{dt.datetime.now():%Y%m%d-%H%M%S}-{revision['commit'] or 'nogit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"results written to {output}")
+    return 1 if any(r["errors"] for r in results.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import datetime as dt
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Tuple
+import httpx
+from benchmarks.seed import BENCH_PASSWORD
+
+@dataclass
+class BenchUser:
+    email: str
+    user_id: int
+    token: str
+    category_ids: List[int]
+    expense_ids: List[int]
+    deep_page: int
+    deep_cursor: str
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+@dataclass
+class Context:
+    users: List[BenchUser]
+    rng: random.Random
+    # Despesas criadas por `create_expense`, consumidas por `delete_expense` (o volume de dados fica estável)
+    created: List[Tuple[BenchUser, int]] = field(default_factory=list)
+
+    def user(self) -> BenchUser:
+        return self.rng.choice(self.users)
+
+Scenario = Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]
+
+def _expense_payload(ctx: Context, user: BenchUser) -> dict:
+    return {
+        "category_id": ctx.rng.choice(user.category_ids) if user.category_ids else None,
+        "amount": round(ctx.rng.uniform(5, 500), 2),
+        "currency": "BRL",
+        "description": "Benchmark",
+        "date": "2025-06-15",
+        "status": "PAID",
+    }
+
+def _recent_years() -> List[int]:
+    year = dt.date.today().year
+    return [year, year - 1]
+
+async def login(client, ctx):
+    return await client.post("/auth/login", data={"username": ctx.user().email, "password": BENCH_PASSWORD})
+
+async def list_first_page(client, ctx):
+    return await client.get("/expenses", params={"size": 20}, headers=ctx.user().headers)
+
+async def list_deep_page(client, ctx):
+    user = ctx.user()
+    return await client.get("/expenses", params={"size": 20, "page": user.deep_page}, headers=user.headers)
+
+async def list_deep_cursor(client, ctx):
+    user = ctx.user()
+    return await client.get("/expenses", params={"size": 20, "cursor": user.deep_cursor}, headers=user.headers)
+
+async def search(client, ctx):
+    return await client.get("/expenses", params={"q": ctx.rng.choice(["uber", "mercado", "farmacia"])}, headers=ctx.user().headers)
+
+async def get_expense(client, ctx):
+    user = ctx.user()
+    return await client.get(f"/expenses/{ctx.rng.choice(user.expense_ids)}", headers=user.headers)
+
+async def create_expense(client, ctx):
+    user = ctx.user()
+    response = await client.post("/expenses", json=_expense_payload(ctx, user), headers=user.headers)
+    if response.status_code == 201:
+        ctx.created.append((user, response.json()["id"]))
+    return response
+
+async def update_expense(client, ctx):
+    user = ctx.user()
+    return await client.put(
+        f"/expenses/{ctx.rng.choice(user.expense_ids)}",
+        json={"amount": round(ctx.rng.uniform(5, 500), 2)},
+        headers=user.headers,
+    )
+
+async def delete_expense(client, ctx):
+    if not ctx.created:
+        await create_expense(client, ctx)
+    user, expense_id = ctx.created.pop()
+    return await client.delete(f"/expenses/{expense_id}", headers=user.headers)
+
+async def summary_monthly(client, ctx):
+    return await client.get("/expenses/summary/monthly", params={"year": ctx.rng.choice(_recent_years())}, headers=ctx.user().headers)
+
+async def summary_by_category(client, ctx):
+    return await client.get("/expenses/summary/by-category", headers=ctx.user().headers)
+
+async def summary_grouped(client, ctx):
+    return await client.get("/expenses/summary", params={"group_by": ["month", "category"]}, headers=ctx.user().headers)
+
+async def export_csv(client, ctx):
+    return await client.get("/expenses/export", params={"format": "csv"}, headers=ctx.user().headers)
+
+# Ordem de execução padrão (create antes de delete)
+SCENARIOS: Dict[str, Scenario] = {
+    "login": login,
+    "list_first_page": list_first_page,
+    "list_deep_page": list_deep_page,
+    "list_deep_cursor": list_deep_cursor,
+    "search": search,
+    "get_expense": get_expense,
+    "create_expense": create_expense,
+    "update_expense": update_expense,
+    "delete_expense": delete_expense,
+    "summary_monthly": summary_monthly,
+    "summary_by_category": summary_by_category,
+    "summary_grouped": summary_grouped,
+    "export_csv": export_csv,
+}
@@ -0,0 +1,105 @@
+"""Escalabilidade da busca textual (GET /expenses?q=): índice FTS5 vs. varredura com LIKE.
+
+Para cada volume de despesas por usuário, popula um SQLite novo com `--users` usuários que compartilham as
+mesmas descrições (os termos comuns casam em milhares de despesas de todos eles) e mede, para um único usuário,
+a consulta usada pela rota. Com o índice, o tempo deve acompanhar o número de resultados do usuário, não o
+tamanho da tabela nem o de resultados dos demais.
+
+Uso: python -m benchmarks.search_scaling --users 20 --sizes 1000,10000,50000 --output resultados.json
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from app.db.models import Expense, User  # noqa: E402
+from app.routers.expenses import ExpenseFilters, list_statement  # noqa: E402
+from benchmarks.seed import DESCRIPTIONS, INSERT_CHUNK  # noqa: E402
+
+# Termo raro (MATCHES despesas por usuário) e prefixo comum ("Mercado do bairro", em ~1/19 das despesas)
+TERMS = ("quitanda", "merc")
+MATCHES = 50
+NO_FILTERS = ExpenseFilters(None, None, None, None, None, None)
+
+def build_db(path: Path, users: int, size: int, rng: random.Random):
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    today = dt.date.today()
+    user_ids = []
+    with engine.begin() as conn:
+        for n in range(users):
+            user_id = conn.execute(
+                insert(User).values(email=f"scale{n}@example.com", password_hash="x")
+            ).inserted_primary_key[0]
+            user_ids.append(user_id)
+            marked = set(rng.sample(range(size), min(MATCHES, size)))
+            for chunk in range(0, size, INSERT_CHUNK):
+                conn.execute(insert(Expense), [
+                    {
+                        "user_id": user_id,
+                        "amount": 10,
+                        "description": f"Feira na {TERMS[0]}" if i in marked else rng.choice(DESCRIPTIONS),
+                        "date": today - dt.timedelta(days=rng.randrange(3650)),
+                    }
+                    for i in range(chunk, min(chunk + INSERT_CHUNK, size))
+                ])
+    return engine, user_ids[users // 2]
+
+def timed(engine, stmt, runs: int) -> float:
+    samples = []
+    with engine.connect() as conn:
+        conn.execute(stmt).all()  # aquece o cache de páginas
+        for _ in range(runs):
+            started = time.perf_counter()
+            conn.execute(stmt).all()
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tempo da busca textual conforme o volume de despesas cresce.")
+    parser.add_argument("--users", type=int, default=20, help="Usuários com as mesmas descrições.")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Despesas por usuário (separadas por vírgula).")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",")):
+            engine, user_id = build_db(Path(tmp) / f"scale-{size}.db", args.users, size, rng)
+            for term in TERMS:
+                indexed = list_statement(NO_FILTERS, user_id, 1, 20, None, term, "sqlite")
+                scan = (
+                    select(Expense.id).where(Expense.user_id == user_id, Expense.description.like(f"%{term}%"))
+                    .order_by(Expense.date.desc(), Expense.id.desc()).limit(20)
+                )
+                row = {"expenses_per_user": size, "total_expenses": size * args.users, "term": term,
+                       "fts_ms": round(timed(engine, indexed, args.runs), 3),
+                       "like_scan_ms": round(timed(engine, scan, args.runs), 3)}
+                rows.append(row)
+                print(
+                    f"{size:>9d} expenses/user ({row['total_expenses']:>9d} total)  q={term:9s} "
+                    f"fts {row['fts_ms']:8.3f}ms  like scan {row['like_scan_ms']:8.3f}ms"
+                )
+            engine.dispose()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(
+            {"users": args.users, "rare_term_matches": MATCHES, "results": rows}, indent=2
+        ))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import datetime as dt
+import random
+from typing import Dict, List
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel
+from app.core.security import get_password_hash
+from app.db import rollups
+from app.db.engine import get_session
+from app.db.models import Category, Expense, User
+
+# Distribuições simples, mas com a mesma forma dos dados reais: maioria em BRL, poucas
+# descrições muito repetidas (boas para a busca textual) e status majoritariamente PAID.
+CURRENCIES = ("BRL",) * 8 + ("USD", "EUR")
+STATUSES = ("PAID",) * 7 + ("PLANNED",) * 2 + ("CANCELLED",)
+PAYMENT_METHODS = ("CARD", "CARD", "PIX", "PIX", "CASH", "TRANSFER")
+CATEGORY_NAMES = (
+    "Alimentação", "Transporte", "Moradia", "Saúde", "Lazer", "Educação", "Assinaturas", "Viagens",
+    "Pets", "Presentes", "Impostos", "Vestuário",
+)
+DESCRIPTIONS = (
+    "Supermercado Extra", "Uber para o trabalho", "Uber Eats jantar", "Padaria", "Farmácia", "Restaurante",
+    "Cinema", "Conta de luz", "Internet fibra", "Academia", "Combustível posto", "Aluguel", "Streaming",
+    "Mercado do bairro", "Estacionamento", "Livraria", "Pet shop ração", "Presente aniversário", None,
+)
+
+BENCH_PASSWORD = "bench-password"
+INSERT_CHUNK = 5000
+
+def bench_email(i: int) -> str:
+    return f"bench{i}@example.com"
+
+def seed(
+    engine: Engine,
+    users: int,
+    categories: int,
+    expenses_per_user: int,
+    years: int,
+    rng_seed: int = 42,
+) -> List[Dict]:
+    """Cria o schema e popula o banco; devolve [{email, user_id, category_ids}] dos usuários criados."""
+    rng = random.Random(rng_seed)
+    SQLModel.metadata.create_all(engine)
+    password_hash = get_password_hash(BENCH_PASSWORD)  # mesma senha para todos: um único bcrypt
+    today = dt.date.today()
+    span_days = 365 * years
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": bench_email(i), "password_hash": password_hash, "full_name": f"Bench {i}", "is_active": True}
+            for i in range(users)
+        ])
+        ids = dict(conn.execute(
+            select(User.email, User.id).where(User.email.in_([bench_email(i) for i in range(users)]))
+        ).all())
+
+        seeded = []
+        for i in range(users):
+            user_id = ids[bench_email(i)]
+            conn.execute(insert(Category), [
+                {"user_id": user_id, "name": CATEGORY_NAMES[c % len(CATEGORY_NAMES)] + (f" {c}" if c >= len(CATEGORY_NAMES) else "")}
+                for c in range(categories)
+            ])
+            category_ids = list(conn.execute(select(Category.id).where(Category.user_id == user_id)).scalars())
+            seeded.append({"email": bench_email(i), "user_id": user_id, "category_ids": category_ids})
+
+            remaining = expenses_per_user
+            while remaining > 0:
+                n = min(remaining, INSERT_CHUNK)
+                remaining -= n
+                conn.execute(insert(Expense), [
+                    {
+                        "user_id": user_id,
+                        "category_id": rng.choice(category_ids) if category_ids and rng.random() < 0.9 else None,
+                        "amount": round(rng.lognormvariate(3.5, 1.0), 2),
+                        "currency": rng.choice(CURRENCIES),
+                        "description": rng.choice(DESCRIPTIONS),
+                        "date": today - dt.timedelta(days=rng.randrange(span_days)),
+                        "payment_method": rng.choice(PAYMENT_METHODS),
+                        "status": rng.choice(STATUSES),
+                    }
+                    for _ in range(n)
+                ])
+
+    # Inserts Core não passam pelos listeners do ORM: o rollup é reconstruído de uma vez
+    with get_session() as db:
+        rollups.rebuild(db)
+    return seeded
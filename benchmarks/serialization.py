@@ -0,0 +1,103 @@
+"""Microbenchmark do caminho de leitura de GET /expenses numa página de 200 linhas.
+
+Compara o caminho antigo (objetos ORM → model_dump → ExpenseRead → validação e serialização pelo
+response_model → json) com a projeção de colunas + FastJSONResponse. Mede tempo de CPU por requisição
+(consulta incluída) e confere que os dois corpos JSON são iguais.
+
+Uso: python -m benchmarks.serialization --rows 200 --iterations 500
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+from app.core import responses  # noqa: E402
+from app.db.models import Expense, User  # noqa: E402
+from app.db.schemas import ExpenseRead  # noqa: E402
+from app.routers.expenses import EXPENSE_READ_COLUMNS, expense_page_response  # noqa: E402
+from benchmarks.seed import CURRENCIES, DESCRIPTIONS, PAYMENT_METHODS, STATUSES  # noqa: E402
+
+READ_ADAPTER = TypeAdapter(List[ExpenseRead])
+
+def old_path(db: Session, user_id: int, size: int) -> bytes:
+    items = (
+        db.query(Expense).filter(Expense.user_id == user_id)
+        .order_by(Expense.date.desc(), Expense.id.desc()).limit(size).all()
+    )
+    content = [ExpenseRead(**i.model_dump()) for i in items]
+    # o que o FastAPI faz com o retorno quando há response_model
+    return JSONResponse(READ_ADAPTER.dump_python(READ_ADAPTER.validate_python(content), mode="json")).body
+
+def new_path(db: Session, user_id: int, size: int) -> bytes:
+    stmt = (
+        select(*EXPENSE_READ_COLUMNS).where(Expense.user_id == user_id)
+        .order_by(Expense.date.desc(), Expense.id.desc()).limit(size)
+    )
+    return expense_page_response(db.execute(stmt).all(), size, with_cursor=True).body
+
+def cpu_ms_per_call(fn, engine, user_id: int, size: int, iterations: int) -> float:
+    with Session(engine) as db:
+        fn(db, user_id, size)  # aquecimento (cache de statements compilados)
+        started = time.process_time()
+        for _ in range(iterations):
+            fn(db, user_id, size)
+            db.expunge_all()  # como numa requisição nova: sem reaproveitar objetos do identity map
+        return (time.process_time() - started) / iterations * 1000
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="CPU por requisição: ORM + response_model vs. projeção + orjson.")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'serialization.db'}")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            user_id = conn.execute(insert(User).values(email="ser@example.com", password_hash="x")).inserted_primary_key[0]
+            conn.execute(insert(Expense), [
+                {
+                    "user_id": user_id,
+                    "amount": round(rng.uniform(1, 900), 2),
+                    "currency": rng.choice(CURRENCIES),
+                    "description": rng.choice(DESCRIPTIONS),
+                    "date": dt.date(2025, 1, 1) + dt.timedelta(days=i % 365),
+                    "paid_at": dt.datetime(2025, 1, 1, 12, 30) if i % 2 else None,
+                    "payment_method": rng.choice(PAYMENT_METHODS),
+                    "status": rng.choice(STATUSES),
+                }
+                for i in range(args.rows)
+            ])
+
+        with Session(engine) as db:
+            if json.loads(old_path(db, user_id, args.rows)) != json.loads(new_path(db, user_id, args.rows)):
+                print("response bodies differ")
+                return 1
+
+        old = cpu_ms_per_call(old_path, engine, user_id, args.rows, args.iterations)
+        new = cpu_ms_per_call(new_path, engine, user_id, args.rows, args.iterations)
+        engine.dispose()
+
+    encoder = "orjson" if responses.orjson is not None else "json (stdlib)"
+    print(f"{args.rows} rows/page, encoder: {encoder}")
+    print(f"ORM + response_model : {old:7.3f} ms CPU/request")
+    print(f"projection + fast JSON: {new:7.3f} ms CPU/request  ({(1 - new / old) * 100:.0f}% less)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Vazão de POST /expenses com e sem coalescência de escritas (WRITE_COALESCING).
+
+Cria um SQLite novo em disco e dispara `--requests` criações com `--concurrency` em voo, distribuídas entre
+`--users` usuários, contra o `app` real em processo (cliente ASGI do `httpx`). Cada modo roda num processo
+próprio (Settings é lida na importação): caminho normal (um commit + refresh por requisição) e coalescido com
+durabilidade "full" e "relaxed".
+
+Uso: python -m benchmarks.write_coalescing --requests 5000 --concurrency 64 --window-ms 5 --max-rows 500
+"""
+import argparse
+import asyncio
+import datetime as dt
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+MODES = ("plain", "coalesced_full", "coalesced_relaxed")
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(p / 100 * len(sorted_values))) - 1]
+
+# ===== Processo filho: um modo =====
+
+async def run_mode(args: argparse.Namespace) -> Dict:
+    import httpx
+    from sqlalchemy import func, select
+    from app.core.security import create_access_token
+    from app.db.engine import get_session
+    from app.db.models import Expense
+    from app.main import app
+
+    users = json.loads(Path(args.db + ".json").read_text())
+    headers = [{"Authorization": f"Bearer {create_access_token(u['email'], user_id=u['user_id'])}"} for u in users]
+    rng = random.Random(42)
+    today = dt.date.today()
+    remaining = iter(range(args.requests))
+    samples: List[tuple] = []
+
+    async def worker(client):
+        for _ in remaining:
+            body = {
+                "amount": round(rng.uniform(1, 500), 2),
+                "date": (today - dt.timedelta(days=rng.randrange(60))).isoformat(),
+                "description": "card transaction",
+                "status": "PAID",
+            }
+            started = time.perf_counter()
+            response = await client.post("/expenses", json=body, headers=rng.choice(headers))
+            samples.append(((time.perf_counter() - started) * 1000, response.status_code))
+
+    # Erros do app (ex.: "database is locked" no caminho normal sob concorrência) contam como respostas 500
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Aquece o cache de usuários autenticados: mede-se a escrita, não o primeiro login de cada usuário
+        for h in headers:
+            await client.get("/auth/me", headers=h)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    with get_session() as db:
+        stored = db.execute(select(func.count()).select_from(Expense)).scalar()
+    latencies = sorted(ms for ms, _ in samples)
+    return {
+        "throughput_rps": round(len(samples) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "status_codes": {str(k): v for k, v in sorted(Counter(code for _, code in samples).items())},
+        "stored": stored,
+    }
+
+def child(args: argparse.Namespace) -> int:
+    from app.core.security import password_pool
+    from app.db.coalescer import coalescers
+
+    try:
+        print(json.dumps(asyncio.run(run_mode(args))))
+    finally:
+        for coalescer in coalescers.values():
+            coalescer.stop()
+        password_pool.shutdown()
+    return 0
+
+# ===== Processo pai =====
+
+def create_db(path: Path, users: int) -> None:
+    from sqlalchemy import create_engine, insert, select
+    from sqlmodel import SQLModel
+    from app.db.models import User
+
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": f"webhook{i}@example.com", "password_hash": "x"} for i in range(users)])
+        rows = conn.execute(select(User.id, User.email)).all()
+    engine.dispose()
+    Path(str(path) + ".json").write_text(json.dumps([{"user_id": i, "email": e} for i, e in rows]))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Vazão de POST /expenses com e sem coalescência de escritas.")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-rows", type=int, default=500)
+    parser.add_argument("--db", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.mode:
+        return child(args)
+
+    results = {}
+    for mode in MODES:
+        # Um banco novo por modo: todos começam com a tabela vazia
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Path(tmp) / "coalescing.db"
+            os.environ["DATABASE_URL"] = f"sqlite:///{db}"
+            os.environ["JWT_SECRET"] = "benchmark-secret"
+            create_db(db, args.users)
+            env = {
+                **os.environ,
+                # Um cliente (o webhook) disparando milhares de req/s: mede-se a escrita, não o limitador
+                "ADMISSION_ENABLED": "false",
+                "WRITE_COALESCING": json.dumps({} if mode == "plain" else {"create_expense": {
+                    "window_ms": args.window_ms, "max_rows": args.max_rows, "durability": mode.split("_")[1],
+                }}),
+            }
+            cmd = [
+                sys.executable, "-m", "benchmarks.write_coalescing", "--db", str(db), "--mode", mode,
+                "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+            ]
+            out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+            results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(
+        f"{args.requests} POST /expenses, concurrency {args.concurrency}, "
+        f"window {args.window_ms}ms / {args.max_rows} rows"
+    )
+    for mode, r in results.items():
+        print(
+            f"{mode:18s} {r['throughput_rps']:9.1f} req/s  p50 {r['p50_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms  "
+            f"stored {r['stored']}  {r['status_codes']}"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -47,9 +47,12 @@ CREATE TABLE IF NOT EXISTS expenses (
   paid_at         DATETIME         NULL,                      -- quando realmente foi pago
   payment_method  ENUM('CASH','CARD','PIX','TRANSFER') NOT NULL DEFAULT 'CARD',
   status          ENUM('PLANNED','PAID','CANCELLED')   NOT NULL DEFAULT 'PLANNED',
+  recurring_id    BIGINT UNSIGNED  NULL,                      -- recorrência que lançou a despesa (seção 10)
+  occurrence      INT              NULL,
   created_at      DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP,
   updated_at      DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (id),
+  UNIQUE KEY uq_expenses_recurring_occurrence (recurring_id, occurrence),
   CONSTRAINT fk_expenses_user
     FOREIGN KEY (user_id) REFERENCES users(id)
     ON DELETE CASCADE
@@ -61,8 +64,10 @@ CREATE TABLE IF NOT EXISTS expenses (
   CONSTRAINT ck_expenses_amount_positive
     CHECK (amount >= 0),
   INDEX idx_expenses_user_date (user_id, date),
-  INDEX idx_expenses_user_category (user_id, category_id),
-  INDEX idx_expenses_user_status (user_id, status)
+  INDEX idx_expenses_user_category (user_id, category_id, status, amount),   -- cobre as somas por categoria
+  INDEX idx_expenses_user_status (user_id, status),
+  INDEX idx_expenses_user_date_totals (user_id, date, currency, status, amount),   -- séries diárias (seção 12)
+  FULLTEXT INDEX ft_expenses_description (description)       -- busca textual (GET /expenses?q=)
 ) ENGINE=InnoDB;
 
 -- 5) (Opcional) View básica para facilitar relatórios rápidos
@@ -95,3 +100,215 @@ SELECT
 FROM expenses
 WHERE status <> 'CANCELLED'
 GROUP BY user_id, currency, EXTRACT(YEAR FROM date), EXTRACT(MONTH FROM date);
+
+-- 7) Rollup mensal mantido pela API na mesma transação de cada escrita em expenses
+--    (despesas CANCELLED não entram). Reconstrução/verificação: python -m app.db.rollups rebuild|check
+CREATE TABLE IF NOT EXISTS expense_monthly_rollups (
+  user_id         BIGINT UNSIGNED  NOT NULL,
+  year            SMALLINT         NOT NULL,
+  month           TINYINT          NOT NULL,
+  currency        CHAR(3)          NOT NULL,
+  total_amount    DECIMAL(14,2)    NOT NULL DEFAULT 0,
+  expense_count   INT              NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, year, month, currency),
+  CONSTRAINT fk_rollups_user
+    FOREIGN KEY (user_id) REFERENCES users(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT
+) ENGINE=InnoDB;
+
+INSERT IGNORE INTO expense_monthly_rollups (user_id, year, month, currency, total_amount, expense_count)
+SELECT user_id, YEAR(date), MONTH(date), currency, SUM(amount), COUNT(*)
+FROM expenses
+WHERE status <> 'CANCELLED'
+GROUP BY user_id, YEAR(date), MONTH(date), currency;
+
+-- 8) Busca textual em bancos já existentes (a tabela acima já nasce com o índice)
+-- ALTER TABLE expenses ADD FULLTEXT INDEX ft_expenses_description (description);
+
+-- 9) Cotações para relatórios convertidos (base_currency): valor de 1 unidade de `currency`
+--    na moeda de referência (FX_REFERENCE_CURRENCY). Carga: python -m app.db.fx load cotacoes.csv
+CREATE TABLE IF NOT EXISTS fx_rates (
+  date      DATE            NOT NULL,
+  currency  CHAR(3)         NOT NULL,
+  rate      DECIMAL(18,8)   NOT NULL,
+  PRIMARY KEY (date, currency)
+) ENGINE=InnoDB;
+
+-- 10) Despesas recorrentes (mensais, semanais, parceladas). O agendador da API lança cada ocorrência vencida
+--     em expenses; (recurring_id, occurrence) único impede duplicatas. Execução manual: python -m app.db.recurring run
+CREATE TABLE IF NOT EXISTS recurring_expenses (
+  id               BIGINT UNSIGNED  NOT NULL AUTO_INCREMENT,
+  user_id          BIGINT UNSIGNED  NOT NULL,
+  category_id      BIGINT UNSIGNED  NULL,
+  amount           DECIMAL(12,2)    NOT NULL,
+  currency         CHAR(3)          NOT NULL DEFAULT 'BRL',
+  description      VARCHAR(500)     NULL,
+  payment_method   ENUM('CASH','CARD','PIX','TRANSFER') NOT NULL DEFAULT 'CARD',
+  frequency        ENUM('MONTHLY','WEEKLY','INSTALLMENTS') NOT NULL,
+  start_date       DATE             NOT NULL,
+  end_date         DATE             NULL,
+  installments     INT              NULL,
+  next_occurrence  INT              NOT NULL DEFAULT 0,      -- ocorrências já lançadas
+  next_date        DATE             NULL,                    -- próxima a lançar (NULL = encerrada)
+  created_at       DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at       DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  CONSTRAINT fk_recurring_user
+    FOREIGN KEY (user_id) REFERENCES users(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT,
+  CONSTRAINT fk_recurring_category
+    FOREIGN KEY (category_id) REFERENCES categories(id)
+    ON DELETE SET NULL
+    ON UPDATE RESTRICT,
+  INDEX idx_recurring_next_date (next_date, id),        -- varredura do agendador
+  INDEX idx_recurring_user (user_id)
+) ENGINE=InnoDB;
+
+-- Migração única para bancos criados antes das recorrências (a tabela da seção 4 já nasce com as colunas):
+-- ALTER TABLE expenses
+--   ADD COLUMN recurring_id BIGINT UNSIGNED NULL AFTER status,
+--   ADD COLUMN occurrence   INT             NULL AFTER recurring_id,
+--   ADD UNIQUE KEY uq_expenses_recurring_occurrence (recurring_id, occurrence);
+
+-- A chave estrangeira de expenses.recurring_id só pode ser criada depois da tabela acima; o ALTER roda apenas se
+-- ela ainda não existe, então o script continua podendo ser reexecutado.
+SET @has_fk := (
+  SELECT COUNT(*) FROM information_schema.TABLE_CONSTRAINTS
+  WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = 'expenses' AND CONSTRAINT_NAME = 'fk_expenses_recurring'
+);
+SET @ddl := IF(@has_fk = 0,
+  'ALTER TABLE expenses ADD CONSTRAINT fk_expenses_recurring FOREIGN KEY (recurring_id) REFERENCES recurring_expenses(id) ON DELETE SET NULL ON UPDATE RESTRICT',
+  'DO 0');
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- 11) Orçamentos por mês (e opcionalmente por categoria). `spent` é mantido incrementalmente a cada escrita
+--     em expenses; budget_events guarda os limiares atingidos (BUDGET_ALERT_THRESHOLDS) para consulta.
+--     Reparo: python -m app.db.budgets rebuild [--user-id N]
+CREATE TABLE IF NOT EXISTS budgets (
+  id            BIGINT UNSIGNED  NOT NULL AUTO_INCREMENT,
+  user_id       BIGINT UNSIGNED  NOT NULL,
+  category_id   BIGINT UNSIGNED  NULL,                    -- NULL = todas as categorias
+  year          SMALLINT         NOT NULL,
+  month         TINYINT          NOT NULL,
+  currency      CHAR(3)          NOT NULL DEFAULT 'BRL',
+  limit_amount  DECIMAL(14,2)    NOT NULL,
+  spent         DECIMAL(14,2)    NOT NULL DEFAULT 0,
+  created_at    DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at    DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  CONSTRAINT fk_budgets_user
+    FOREIGN KEY (user_id) REFERENCES users(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT,
+  CONSTRAINT fk_budgets_category
+    FOREIGN KEY (category_id) REFERENCES categories(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT,
+  INDEX idx_budgets_user_month (user_id, year, month)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS budget_events (
+  id            BIGINT UNSIGNED  NOT NULL AUTO_INCREMENT,
+  budget_id     BIGINT UNSIGNED  NOT NULL,
+  user_id       BIGINT UNSIGNED  NOT NULL,
+  threshold     INT              NOT NULL,                -- % do limite
+  spent         DECIMAL(14,2)    NOT NULL,
+  limit_amount  DECIMAL(14,2)    NOT NULL,
+  created_at    DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  CONSTRAINT fk_budget_events_budget
+    FOREIGN KEY (budget_id) REFERENCES budgets(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT,
+  CONSTRAINT fk_budget_events_user
+    FOREIGN KEY (user_id) REFERENCES users(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT,
+  INDEX idx_budget_events_user (user_id, id)             -- polling por after_id
+) ENGINE=InnoDB;
+
+-- 12) Índice de cobertura para as séries diárias (GET /expenses/analytics/series): a soma por dia sai
+--     inteira do índice, sem ler as linhas de expenses. Bancos já existentes (a tabela acima já nasce com o índice):
+-- ALTER TABLE expenses ADD INDEX idx_expenses_user_date_totals (user_id, date, currency, status, amount);
+
+-- 13) Arquivo de despesas antigas (mesmas colunas e ids de expenses). python -m app.db.archive run move, em lotes,
+--     os meses anteriores a ARCHIVE_AFTER_MONTHS; as leituras fazem UNION ALL só quando o período alcança o arquivo.
+--     O rollup mensal e os orçamentos continuam contando as despesas arquivadas.
+--     Os ids vêm do AUTO_INCREMENT de expenses; o MySQL 8 persiste o contador, que não volta para max(id) + 1
+--     num restart e não reusa o id de uma despesa arquivada.
+CREATE TABLE IF NOT EXISTS expenses_archive (
+  id              BIGINT UNSIGNED  NOT NULL,
+  user_id         BIGINT UNSIGNED  NOT NULL,
+  category_id     BIGINT UNSIGNED  NULL,
+  amount          DECIMAL(12,2)    NOT NULL,
+  currency        CHAR(3)          NOT NULL DEFAULT 'BRL',
+  description     VARCHAR(500)     NULL,
+  date            DATE             NOT NULL,
+  paid_at         DATETIME         NULL,
+  payment_method  ENUM('CASH','CARD','PIX','TRANSFER') NOT NULL DEFAULT 'CARD',
+  status          ENUM('PLANNED','PAID','CANCELLED') NOT NULL DEFAULT 'PLANNED',
+  recurring_id    BIGINT UNSIGNED  NULL,
+  occurrence      INT              NULL,
+  created_at      DATETIME         NOT NULL,
+  updated_at      DATETIME         NOT NULL,
+  archived_at     DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  CONSTRAINT fk_expenses_archive_user
+    FOREIGN KEY (user_id) REFERENCES users(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT,
+  -- Buscas por (usuário, data) e somas dos relatórios
+  INDEX idx_expenses_archive_user_date (user_id, date, currency, status, amount),
+  FULLTEXT INDEX ft_expenses_archive_description (description)  -- busca textual (GET /expenses?q=)
+) ENGINE=InnoDB;
+
+-- 14) Sharding por usuário (DATABASE_SHARD_URLS). Todas as tabelas acima existem em cada shard; `users` dos shards
+--     1..N guarda só espelhos (sem senha) para as chaves estrangeiras. O diretório fica no shard 0 (DATABASE_URL):
+--     sem linha = shard 0. move_to/move_from marcam uma movimentação em curso (python -m app.db.shards move).
+CREATE TABLE IF NOT EXISTS user_shards (
+  user_id     BIGINT UNSIGNED  NOT NULL,
+  shard       INT              NOT NULL DEFAULT 0,
+  move_to     INT              NULL,                      -- cópia em curso: escritas do usuário recebem 503
+  move_from   INT              NULL,                      -- shard antigo ainda por limpar
+  updated_at  DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (user_id),
+  CONSTRAINT fk_user_shards_user
+    FOREIGN KEY (user_id) REFERENCES users(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT
+) ENGINE=InnoDB;
+
+-- Só no shard 0: contadores globais de ids. Com shards, os ids de categories, expenses, recurring_expenses, budgets
+-- e budget_events vêm daqui (a aplicação reserva faixas) e não do AUTO_INCREMENT de cada shard: nunca se repetem
+-- entre shards, e a movimentação copia as linhas com os mesmos ids. Cada contador começa, no primeiro uso, depois do
+-- maior id existente em todos os shards.
+CREATE TABLE IF NOT EXISTS id_sequences (
+  name        VARCHAR(64)      NOT NULL,
+  next_id     BIGINT UNSIGNED  NOT NULL,
+  PRIMARY KEY (name)
+) ENGINE=InnoDB;
+
+-- 15) Versão dos dados de cada usuário (em cada shard, ao lado dos dados): ETags das leituras e If-Match dos PUTs.
+--     Sobe na mesma transação de toda escrita em despesas/categorias; sem linha = versão 0.
+CREATE TABLE IF NOT EXISTS user_versions (
+  user_id     BIGINT UNSIGNED  NOT NULL,
+  version     BIGINT UNSIGNED  NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id),
+  CONSTRAINT fk_user_versions_user
+    FOREIGN KEY (user_id) REFERENCES users(id)
+    ON DELETE CASCADE
+    ON UPDATE RESTRICT
+) ENGINE=InnoDB;
+
+-- 16) Bancos criados antes de idx_expenses_user_category cobrir status e amount (a tabela da seção 4 já nasce com
+--     ele): as somas por categoria (/expenses/summary/by-category, /dashboard) passam a sair só do índice.
+-- ALTER TABLE expenses
+--   DROP INDEX idx_expenses_user_category,
+--   ADD INDEX idx_expenses_user_category (user_id, category_id, status, amount);
+
+-- 17) Busca textual nas despesas arquivadas em bancos criados antes do índice (a tabela da seção 13 já nasce com ele)
+-- ALTER TABLE expenses_archive ADD FULLTEXT INDEX ft_expenses_archive_description (description);
@@ -0,0 +1,89 @@
+import datetime as dt
+import itertools
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings é lida na importação de `app`: o ambiente dos testes vem antes de qualquer import do pacote.
+# Um SQLite novo em disco por sessão de testes; bcrypt barato e inline; sem agendador em segundo plano.
+_DATA_DIR = tempfile.mkdtemp(prefix="expense-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DATA_DIR}/test.db"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["RECURRING_SCHEDULER_SECONDS"] = "0"
+os.environ["REPLICA_HEALTH_CHECK_SECONDS"] = "0"
+os.environ["ADMISSION_ENABLED"] = "false"
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlmodel import SQLModel
+from app.db import rollups
+from app.db.engine import engine, get_session
+from app.db.models import Category, Expense
+
+SQLModel.metadata.create_all(engine)
+
+PASSWORD = "test-password"
+_emails = itertools.count()
+
+@pytest.fixture(scope="session")
+def data_dir() -> Path:
+    return Path(_DATA_DIR)
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+def new_user(client) -> dict:
+    """Registra e autentica um usuário novo: {"id", "email", "headers"}."""
+    email = f"user{next(_emails)}@example.com"
+    assert client.post("/auth/register", json={"email": email, "password": PASSWORD}).status_code == 201
+    token = client.post("/auth/login", data={"username": email, "password": PASSWORD}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    return {"id": client.get("/auth/me", headers=headers).json()["id"], "email": email, "headers": headers}
+
+@pytest.fixture
+def user(client):
+    return new_user(client)
+
+@pytest.fixture
+def other_user(client):
+    return new_user(client)
+
+def seed_expenses(user_id: int, count: int, days: int = 3 * 365, categories: int = 4, seed: int = 0) -> list:
+    """Insere `count` despesas do usuário em lotes (Core, sem o ORM) e reconstrói o rollup dele.
+
+    Devolve os ids das categorias criadas."""
+    rng = random.Random(seed)
+    today = dt.date.today()
+    with engine.begin() as conn:
+        category_ids = [
+            conn.execute(insert(Category).values(user_id=user_id, name=f"Categoria {i}")).inserted_primary_key[0]
+            for i in range(categories)
+        ]
+        for start in range(0, count, 5000):
+            conn.execute(insert(Expense), [
+                {
+                    "user_id": user_id,
+                    "category_id": rng.choice(category_ids),
+                    "amount": round(rng.uniform(1, 500), 2),
+                    "currency": rng.choice(("BRL", "BRL", "USD")),
+                    "description": rng.choice(("Mercado", "Uber", "Farmácia", None)),
+                    "date": today - dt.timedelta(days=rng.randrange(days)),
+                    "payment_method": rng.choice(("CARD", "PIX", "CASH")),
+                    "status": rng.choice(("PAID", "PAID", "PLANNED", "CANCELLED")),
+                }
+                for _ in range(min(5000, count - start))
+            ])
+    with get_session() as db:
+        rollups.rebuild(db, user_id)
+    return category_ids
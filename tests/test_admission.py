@@ -0,0 +1,43 @@
+import time
+from sqlalchemy import create_engine
+from app.core.admission import PoolPressure
+from app.core.config import settings
+from app.core.metrics import instrument_engine, registry
+
+def test_pool_pressure_follows_time_with_the_pool_exhausted(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", pool_size=2, max_overflow=0)
+    pressure = PoolPressure(half_life=0.05, handoff=0.02)
+    pressure.watch(engine)
+    instrument_engine(engine, "pressure_probe")  # os eventos das métricas não interferem
+
+    first = engine.connect()
+    time.sleep(0.05)
+    assert pressure.current() < 0.01  # com conexão livre, ninguém espera
+    second = engine.connect()
+    time.sleep(0.1)
+    assert pressure.current() >= 0.1
+
+    # Devolvida e retomada logo (por quem esperava): o pool segue esgotado desde o início
+    second.close()
+    second = engine.connect()
+    time.sleep(0.05)
+    assert pressure.current() >= 0.15
+
+    # Devolvida sem ninguém esperando: o período acaba e a média decai
+    second.close()
+    time.sleep(0.05)
+    assert pressure.current() < 0.15
+    time.sleep(0.3)
+    assert pressure.current() < 0.01
+    first.close()
+    engine.dispose()
+
+    assert 'db_pool_checkout_seconds_count{engine="pressure_probe"} 3' in registry.render().splitlines()
+
+def test_pool_without_a_limit_is_not_watched():
+    engine = create_engine("sqlite://")  # SingletonThreadPool: cada thread tem a própria conexão
+    pressure = PoolPressure()
+    pressure.watch(engine)
+    with engine.connect():
+        assert pressure.current() == 0.0
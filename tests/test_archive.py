@@ -0,0 +1,104 @@
+import datetime as dt
+from app.db import archive
+from app.db.engine import get_session
+
+# Despesas de 2000 vão para o arquivo; as dos outros testes (datas recentes) ficam onde estão
+CUTOFF = dt.date(2001, 1, 1)
+
+def _create(client, user, description: str, date: str) -> int:
+    payload = {"amount": 10, "description": description, "date": date, "status": "PAID"}
+    r = client.post("/expenses", json=payload, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+def _archive() -> None:
+    with get_session() as db:
+        assert archive.archive_before(db, CUTOFF) > 0
+
+def _ids(client, user, **params) -> list:
+    r = client.get("/expenses", params=params, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return [e["id"] for e in r.json()]
+
+def test_search_includes_archived_expenses(client, user, other_user):
+    cold = [_create(client, user, f"Aluguel apartamento {n}", f"2000-{1 + n % 12:02d}-10") for n in range(12)]
+    hot = [_create(client, user, "Aluguel garagem", f"2025-{1 + n:02d}-05") for n in range(8)]
+    _create(client, user, "Padaria", "2000-05-01")
+    _create(client, other_user, "Aluguel apartamento", "2000-03-10")
+    _archive()
+
+    assert set(_ids(client, user, q="aluguel", size=50)) == set(cold + hot)
+    assert set(_ids(client, user, q="apartamento", size=50)) == set(cold)
+    # Páginas por `page` sobre o merge das duas tabelas: sem repetir nem perder resultados
+    pages = [_ids(client, user, q="aluguel", size=6, page=p) for p in range(1, 5)]
+    assert [len(p) for p in pages] == [6, 6, 6, 2]
+    assert sorted(sum(pages, [])) == sorted(cold + hot)
+    # Período fora do arquivo: só as despesas de `expenses`
+    assert set(_ids(client, user, q="aluguel", size=50, start="2020-01-01")) == set(hot)
+
+def _walk_cursor(client, user, size: int) -> list:
+    ids, cursor = [], None
+    while True:
+        params = {"size": size, "start": "2000-01-01", **({"cursor": cursor} if cursor else {})}
+        r = client.get("/expenses", params=params, headers=user["headers"])
+        assert r.status_code == 200, r.text
+        ids += [e["id"] for e in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+def _reads(client, user, ids: list) -> dict:
+    """Tudo o que a API devolve sobre as despesas do usuário, pelas rotas de leitura que alcançam o arquivo."""
+    headers = user["headers"]
+
+    def get(path: str, **params):
+        r = client.get(path, params=params, headers=headers)
+        assert r.status_code == 200, (path, r.text)
+        return r.json() if "export" not in path else r.text
+
+    return {
+        "by_id": [get(f"/expenses/{i}") for i in ids],
+        "pages": [get("/expenses", size=4, page=p, start="2000-01-01") for p in range(1, 5)],
+        "period": get("/expenses", start="2000-03-01", end="2000-06-30", size=50),
+        "cursor": _walk_cursor(client, user, 4),
+        "csv": get("/expenses/export", format="csv"),
+        "ndjson": get("/expenses/export", format="ndjson", start="2000-01-01", end="2000-12-31"),
+        "monthly": get("/expenses/summary/monthly"),
+        "monthly_2000": get("/expenses/summary/monthly", year=2000),
+        "by_category": get("/expenses/summary/by-category"),
+        "by_category_2000": get("/expenses/summary/by-category", start="2000-01-01", end="2000-12-31"),
+        "summary": get("/expenses/summary", group_by=["month", "category"], start="2000-01-01"),
+        "summary_status": get("/expenses/summary", group_by=["status"]),
+    }
+
+def test_reads_are_the_same_after_archiving(client, user, monkeypatch):
+    from app.core.cache import NullBackend, report_cache
+
+    # Sem o cache de relatórios (a versão não muda ao arquivar): as duas leituras vão ao banco
+    monkeypatch.setattr(report_cache, "backend", NullBackend())
+    categories = [
+        client.post("/categories", json={"name": name}, headers=user["headers"]).json()["id"]
+        for name in ("Casa", "Lazer")
+    ]
+    ids = []
+    for n in range(14):
+        date = f"2000-{1 + n % 12:02d}-{1 + n:02d}" if n < 9 else f"2025-{n - 8:02d}-15"
+        payload = {"amount": 10 + n, "description": f"Despesa {n}", "date": date,
+                   "status": ("PAID", "PLANNED", "CANCELLED")[n % 3], "category_id": categories[n % 2]}
+        r = client.post("/expenses", json=payload, headers=user["headers"])
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["id"])
+
+    before = _reads(client, user, ids)
+    _archive()
+    assert _reads(client, user, ids) == before
+
+    # Arquivadas são só leitura; as de `expenses` seguem editáveis
+    archived, hot = ids[0], ids[-1]
+    r = client.put(f"/expenses/{archived}", json={"amount": 1}, headers=user["headers"])
+    assert r.status_code == 409, r.text
+    assert client.delete(f"/expenses/{archived}", headers=user["headers"]).status_code == 409
+    assert client.get(f"/expenses/{archived}", headers=user["headers"]).json() == before["by_id"][0]
+    assert client.put(f"/expenses/{hot}", json={"amount": 1}, headers=user["headers"]).status_code == 200
+    assert client.delete(f"/expenses/{hot}", headers=user["headers"]).status_code == 204
+    assert client.get(f"/expenses/{10 ** 9}", headers=user["headers"]).status_code == 404
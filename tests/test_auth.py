@@ -0,0 +1,42 @@
+import re
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.core.principals import principal_cache
+from app.db.engine import engine, get_session
+from app.db.models import User
+
+USERS_TABLE = re.compile(r"\bFROM users\b", re.IGNORECASE)
+
+@contextmanager
+def users_queries():
+    """Lista (preenchida ao sair) dos comandos SQL que leem a tabela users."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if USERS_TABLE.search(statement):
+            seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield seen
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+def test_cache_hit_runs_no_user_query(client, user):
+    principal_cache.invalidate(user["id"])
+    with users_queries() as first:
+        assert client.get("/categories", headers=user["headers"]).status_code == 200
+    hits = principal_cache.stats()["hits"]
+    with users_queries() as second:
+        assert client.get("/categories", headers=user["headers"]).status_code == 200
+        assert client.get("/expenses", headers=user["headers"]).status_code == 200
+    assert len(first) == 1
+    assert second == []
+    assert principal_cache.stats()["hits"] == hits + 2
+
+def test_deactivated_user_is_rejected_despite_cache(client, user):
+    assert client.get("/auth/me", headers=user["headers"]).status_code == 200
+    with get_session() as db:
+        db.get(User, user["id"]).is_active = False
+        db.commit()
+    assert client.get("/auth/me", headers=user["headers"]).status_code == 401
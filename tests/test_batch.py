@@ -0,0 +1,81 @@
+def _expense(client, user, amount: float, date: str = "2025-07-10", **fields) -> int:
+    payload = {"amount": amount, "date": date, "status": "PAID", **fields}
+    r = client.post("/expenses", json=payload, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+def _monthly(client, user) -> list:
+    r = client.get("/expenses/summary/monthly", params={"year": 2025}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return [(m["month"], m["total_amount"]) for m in r.json()]
+
+def _spent(client, user, month: int = 7) -> list:
+    r = client.get("/budgets/status", params={"year": 2025, "month": month}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return [b["spent"] for b in r.json()]
+
+def _patch(client, user, **payload):
+    return client.patch("/expenses/batch", json=payload, headers=user["headers"])
+
+def _delete(client, user, **payload):
+    return client.post("/expenses/batch-delete", json=payload, headers=user["headers"])
+
+def test_batch_update_by_ids_moves_totals_and_version(client, user, other_user):
+    r = client.post("/budgets", json={"year": 2025, "month": 7, "currency": "BRL", "limit_amount": 500},
+                    headers=user["headers"])
+    assert r.status_code == 201, r.text
+    a, b = _expense(client, user, 100), _expense(client, user, 50)
+    c = _expense(client, user, 20, status="PLANNED")
+    foreign = _expense(client, other_user, 70)
+    assert (_monthly(client, user), _spent(client, user)) == ([(7, 170.0)], [170.0])
+    tag = client.get(f"/expenses/{a}", headers=user["headers"]).headers["ETag"]
+
+    # Ids de outro usuário são ignorados, não alterados
+    r = _patch(client, user, ids=[a, c, foreign], changes={"date": "2025-08-05", "status": "PAID"})
+    assert r.status_code == 200 and r.json() == {"affected": 2}, r.text
+    assert _monthly(client, user) == [(7, 50.0), (8, 120.0)]
+    assert _spent(client, user) == [50.0]
+    moved = client.get(f"/expenses/{a}", headers={**user["headers"], "If-None-Match": tag})
+    assert moved.status_code == 200 and moved.json()["date"] == "2025-08-05" and moved.headers["ETag"] != tag
+    assert client.get(f"/expenses/{foreign}", headers=other_user["headers"]).json()["date"] == "2025-07-10"
+    assert _monthly(client, other_user) == [(7, 70.0)]
+
+    # Cancelar tira do orçamento; category_id pode ser limpo (nulo) em lote
+    r = _patch(client, user, ids=[b], changes={"status": "CANCELLED", "category_id": None})
+    assert r.json() == {"affected": 1}
+    assert _spent(client, user) == [0.0]
+
+def test_batch_update_by_filters(client, user):
+    for amount, date in ((10, "2025-07-01"), (20, "2025-07-15"), (30, "2025-08-01")):
+        _expense(client, user, amount, date, status="PLANNED")
+    r = _patch(client, user, filters={"start": "2025-07-01", "end": "2025-07-31", "status": "PLANNED"},
+               changes={"amount": 5})
+    assert r.status_code == 200 and r.json() == {"affected": 2}, r.text
+    assert _monthly(client, user) == [(7, 10.0), (8, 30.0)]
+
+def test_batch_delete_updates_totals_and_budget(client, user, other_user):
+    r = client.post("/budgets", json={"year": 2025, "month": 7, "currency": "BRL", "limit_amount": 500},
+                    headers=user["headers"])
+    assert r.status_code == 201, r.text
+    ids = [_expense(client, user, amount) for amount in (10, 20, 40)]
+    foreign = _expense(client, other_user, 70)
+    tag = client.get("/expenses", headers=user["headers"]).headers["ETag"]
+
+    r = _delete(client, user, ids=ids[:2] + [foreign])
+    assert r.status_code == 200 and r.json() == {"affected": 2}, r.text
+    assert (_monthly(client, user), _spent(client, user)) == ([(7, 40.0)], [40.0])
+    assert client.get(f"/expenses/{ids[0]}", headers=user["headers"]).status_code == 404
+    assert client.get(f"/expenses/{foreign}", headers=other_user["headers"]).status_code == 200
+    assert client.get("/expenses", headers={**user["headers"], "If-None-Match": tag}).status_code == 200
+
+    r = _delete(client, user, filters={"min": 30})
+    assert r.json() == {"affected": 1}
+    assert (_monthly(client, user), _spent(client, user)) == ([], [0.0])
+
+def test_batch_selector_is_validated(client, user):
+    expense_id = _expense(client, user, 10)
+    assert _patch(client, user, changes={"amount": 1}).status_code == 400
+    assert _delete(client, user, ids=[expense_id], filters={"min": 1}).status_code == 400
+    assert _patch(client, user, ids=[expense_id], changes={}).status_code == 400
+    assert _patch(client, user, ids=[expense_id], changes={"status": "UNKNOWN"}).status_code == 422
+    assert client.get(f"/expenses/{expense_id}", headers=user["headers"]).json()["amount"] == 10
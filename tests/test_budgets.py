@@ -0,0 +1,120 @@
+import pytest
+
+def _category(client, user, name: str) -> int:
+    r = client.post("/categories", json={"name": name}, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+def _expense(client, user, amount: float, **fields) -> int:
+    payload = {"amount": amount, "date": "2025-04-10", "status": "PAID", **fields}
+    r = client.post("/expenses", json=payload, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+def _budget(client, user, limit: float, **fields) -> dict:
+    payload = {"year": 2025, "month": 4, "currency": "BRL", "limit_amount": limit, **fields}
+    r = client.post("/budgets", json=payload, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    return r.json()
+
+def _spent(client, user) -> dict:
+    r = client.get("/budgets/status", params={"year": 2025, "month": 4}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return {b["id"]: b["spent"] for b in r.json()}
+
+def _events(client, user, after_id: int = 0) -> list:
+    r = client.get("/budgets/events", params={"after_id": after_id}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return [(e["budget_id"], e["threshold"], e["spent"], e["limit_amount"]) for e in r.json()]
+
+def test_spent_follows_expense_writes(client, user):
+    food, fuel = _category(client, user, "Mercado"), _category(client, user, "Combustível")
+    by_food = _budget(client, user, 1000, category_id=food)["id"]
+    overall = _budget(client, user, 5000)["id"]
+    headers = user["headers"]
+
+    a = _expense(client, user, 100, category_id=food)
+    _expense(client, user, 40, category_id=fuel)
+    # Não contam: outra moeda, cancelada, outro mês
+    _expense(client, user, 999, category_id=food, currency="USD")
+    _expense(client, user, 999, category_id=food, status="CANCELLED")
+    _expense(client, user, 999, category_id=food, date="2025-05-01")
+    assert _spent(client, user) == {by_food: 100, overall: 140}
+
+    assert client.put(f"/expenses/{a}", json={"amount": 130}, headers=headers).status_code == 200
+    assert _spent(client, user) == {by_food: 130, overall: 170}
+    assert client.put(f"/expenses/{a}", json={"category_id": fuel}, headers=headers).status_code == 200
+    assert _spent(client, user) == {by_food: 0, overall: 170}
+    assert client.put(f"/expenses/{a}", json={"date": "2025-03-31"}, headers=headers).status_code == 200
+    assert _spent(client, user) == {by_food: 0, overall: 40}
+    assert client.put(f"/expenses/{a}", json={"date": "2025-04-01", "status": "CANCELLED"}, headers=headers).status_code == 200
+    assert _spent(client, user) == {by_food: 0, overall: 40}
+    assert client.put(f"/expenses/{a}", json={"status": "PLANNED"}, headers=headers).status_code == 200
+    assert _spent(client, user) == {by_food: 0, overall: 170}
+    assert client.delete(f"/expenses/{a}", headers=headers).status_code == 204
+    assert _spent(client, user) == {by_food: 0, overall: 40}
+
+def test_thresholds_are_recorded_once_when_crossed(client, user):
+    budget = _budget(client, user, 100)["id"]
+    _expense(client, user, 50)
+    assert _events(client, user) == []
+    _expense(client, user, 35)
+    assert _events(client, user) == [(budget, 80, 85, 100)]
+    last = client.get("/budgets/events", headers=user["headers"]).json()[-1]["id"]
+    big = _expense(client, user, 20)
+    assert _events(client, user, after_id=last) == [(budget, 100, 105, 100)]
+    # Acima dos dois limiares: nenhum evento novo
+    _expense(client, user, 5)
+    assert len(_events(client, user)) == 2
+    # Volta abaixo de 100% e cruza de novo: outro evento
+    assert client.delete(f"/expenses/{big}", headers=user["headers"]).status_code == 204
+    _expense(client, user, 10)
+    assert _events(client, user)[-1] == (budget, 100, 100, 100)
+
+def test_budget_created_over_the_limit_alerts_at_once(client, user):
+    food = _category(client, user, "Mercado")
+    _expense(client, user, 70, category_id=food)
+    _expense(client, user, 50, category_id=food)
+    _expense(client, user, 500)  # outra categoria
+    budget = _budget(client, user, 100, category_id=food)
+    assert budget["spent"] == 120
+    assert _events(client, user) == [(budget["id"], 80, 120, 100), (budget["id"], 100, 120, 100)]
+
+def test_limit_changes(client, user):
+    budget = _budget(client, user, 100)["id"]
+    _expense(client, user, 70)
+    headers = user["headers"]
+
+    def set_limit(limit: float) -> int:
+        return client.put(f"/budgets/{budget}", json={"limit_amount": limit}, headers=headers).status_code
+
+    # Limite menor: o gasto atual passa a atingir 80%
+    assert set_limit(80) == 200
+    assert _events(client, user) == [(budget, 80, 70, 80)]
+    # Limite maior não gera evento; baixar de novo cruza os dois limiares de uma vez
+    assert set_limit(200) == 200
+    assert len(_events(client, user)) == 1
+    assert set_limit(60) == 200
+    assert _events(client, user)[1:] == [(budget, 80, 70, 60), (budget, 100, 70, 60)]
+    assert _spent(client, user) == {budget: 70}
+    assert set_limit(0) == 400
+
+    # Excluir o orçamento leva os alertas junto; as despesas seguem sem ele
+    assert client.delete(f"/budgets/{budget}", headers=headers).status_code == 204
+    assert _events(client, user) == []
+    assert client.get(f"/budgets/{budget}", headers=headers).status_code == 404
+    _expense(client, user, 10)
+
+@pytest.mark.parametrize("payload,code", [
+    ({"month": 13}, 400),
+    ({"limit_amount": -5}, 400),
+    ({"category_id": 10 ** 9}, 404),
+])
+def test_invalid_budgets_are_rejected(client, user, payload, code):
+    body = {"year": 2025, "month": 4, "currency": "BRL", "limit_amount": 100, **payload}
+    assert client.post("/budgets", json=body, headers=user["headers"]).status_code == code
+
+def test_duplicate_budget_is_rejected(client, user):
+    _budget(client, user, 100)
+    body = {"year": 2025, "month": 4, "currency": "BRL", "limit_amount": 300}
+    assert client.post("/budgets", json=body, headers=user["headers"]).status_code == 400
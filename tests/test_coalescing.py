@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy.exc import DataError, IntegrityError
+from app.db.coalescer import CoalescerOverloaded
+from app.routers.expenses import coalesce_error, rejected_expense
+
+DRIVER_ERRORS = [
+    IntegrityError("INSERT INTO expenses ...", {}, Exception("FOREIGN KEY constraint failed: fk_expenses_category")),
+    DataError("INSERT INTO expenses ...", {}, Exception("Out of range value for column 'amount' at row 1")),
+]
+
+@pytest.mark.parametrize("exc", DRIVER_ERRORS, ids=["integrity", "data"])
+def test_coalesced_rejection_matches_plain_path(exc):
+    coalesced, plain = coalesce_error(exc), rejected_expense(exc)
+    assert (coalesced.status_code, coalesced.detail) == (plain.status_code, plain.detail) == (400, plain.detail)
+    # Nada do texto do driver (tabelas, colunas, restrições) chega ao cliente
+    assert "fk_expenses" not in coalesced.detail and "'amount'" not in coalesced.detail
+
+def test_overloaded_queue_is_503():
+    exc = coalesce_error(CoalescerOverloaded())
+    assert exc.status_code == 503 and exc.headers == {"Retry-After": "1"}
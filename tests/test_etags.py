@@ -0,0 +1,72 @@
+def _create(client, user, amount: float = 10) -> int:
+    payload = {"amount": amount, "date": "2025-06-01", "status": "PAID"}
+    r = client.post("/expenses", json=payload, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+def _get(client, user, path: str, **headers):
+    return client.get(path, headers={**user["headers"], **headers})
+
+def test_if_none_match_returns_304_until_a_write(client, user):
+    expense_id = _create(client, user)
+    for path in ("/expenses", f"/expenses/{expense_id}", "/categories", "/expenses/summary/monthly?year=2025"):
+        first = _get(client, user, path)
+        assert first.status_code == 200, (path, first.text)
+        tag = first.headers["ETag"]
+        assert tag.startswith('W/"') and first.headers["Cache-Control"] == "private, no-cache"
+        cached = _get(client, user, path, **{"If-None-Match": tag})
+        assert cached.status_code == 304 and cached.content == b"" and cached.headers["ETag"] == tag, path
+        # Comparação fraca, e o tag numa lista
+        assert _get(client, user, path, **{"If-None-Match": f'"other", {tag[2:]}'}).status_code == 304
+        assert _get(client, user, path, **{"If-None-Match": '"other"'}).status_code == 200
+
+    before = _get(client, user, "/expenses").headers["ETag"]
+    _create(client, user)
+    after = _get(client, user, "/expenses", **{"If-None-Match": before})
+    assert after.status_code == 200 and after.headers["ETag"] != before
+    # Uma categoria nova também muda o tag das despesas (mesma versão por usuário)
+    assert client.post("/categories", json={"name": "Lazer"}, headers=user["headers"]).status_code == 201
+    assert _get(client, user, "/expenses", **{"If-None-Match": after.headers["ETag"]}).status_code == 200
+
+def test_tags_are_per_user(client, user, other_user):
+    _create(client, user)
+    _create(client, other_user)
+    mine = _get(client, user, "/expenses").headers["ETag"]
+    assert _get(client, other_user, "/expenses", **{"If-None-Match": mine}).status_code == 200
+
+def test_if_match_rejects_stale_updates(client, user, other_user):
+    expense_id = _create(client, user)
+    tag = _get(client, user, f"/expenses/{expense_id}").headers["ETag"]
+
+    r = client.put(f"/expenses/{expense_id}", json={"amount": 20}, headers={**user["headers"], "If-Match": tag})
+    assert r.status_code == 200, r.text
+    new_tag = r.headers["ETag"]
+    assert new_tag != tag and _get(client, user, f"/expenses/{expense_id}").headers["ETag"] == new_tag
+
+    # O tag lido antes da primeira atualização ficou velho: 412 e nada muda
+    r = client.put(f"/expenses/{expense_id}", json={"amount": 30}, headers={**user["headers"], "If-Match": tag})
+    assert r.status_code == 412, r.text
+    assert _get(client, user, f"/expenses/{expense_id}").json()["amount"] == 20
+    # Qualquer escrita do usuário (outra despesa) também invalida o tag
+    _create(client, user)
+    r = client.put(f"/expenses/{expense_id}", json={"amount": 30}, headers={**user["headers"], "If-Match": new_tag})
+    assert r.status_code == 412, r.text
+    # Tag de outro usuário não casa; `*` e a ausência do header não impõem condição
+    _create(client, other_user)
+    foreign = _get(client, other_user, "/expenses").headers["ETag"]
+    r = client.put(f"/expenses/{expense_id}", json={"amount": 30}, headers={**user["headers"], "If-Match": foreign})
+    assert r.status_code == 412, r.text
+    for headers in ({"If-Match": "*"}, {}):
+        r = client.put(f"/expenses/{expense_id}", json={"amount": 40}, headers={**user["headers"], **headers})
+        assert r.status_code == 200, r.text
+
+def test_if_match_on_categories(client, user):
+    r = client.post("/categories", json={"name": "Casa"}, headers=user["headers"])
+    category_id = r.json()["id"]
+    tag = _get(client, user, f"/categories/{category_id}").headers["ETag"]
+    _create(client, user)
+    r = client.put(f"/categories/{category_id}", json={"name": "Lar"}, headers={**user["headers"], "If-Match": tag})
+    assert r.status_code == 412, r.text
+    tag = _get(client, user, f"/categories/{category_id}").headers["ETag"]
+    r = client.put(f"/categories/{category_id}", json={"name": "Lar"}, headers={**user["headers"], "If-Match": tag})
+    assert r.status_code == 200 and r.json()["name"] == "Lar", r.text
@@ -0,0 +1,65 @@
+import datetime as dt
+import pytest
+from app.db import fx
+from app.db.engine import get_session
+from app.db.fx import FxRateMissing, FxTable
+
+D = dt.date
+
+# Cotações em BRL: sexta 01/03 e terça 05/03; sem cotação no fim de semana nem na segunda
+RATES = [(D(2024, 3, 5), "USD", 6.0), (D(2024, 3, 1), "USD", 5.0), (D(2024, 3, 1), "EUR", 5.5)]
+
+def _table() -> FxTable:
+    return FxTable(RATES, "BRL")
+
+def test_rate_is_the_nearest_previous_one():
+    table = _table()
+    days = [D(2024, 3, 1), D(2024, 3, 2), D(2024, 3, 4), D(2024, 3, 5), D(2024, 3, 20)]
+    # No dia exato vale a cotação do dia (não a anterior); nos outros, a mais recente antes dele
+    assert table.rates("USD", [d.toordinal() for d in days]) == [5.0, 5.0, 5.0, 6.0, 6.0]
+    assert table.rates("BRL", [D(1990, 1, 1).toordinal()]) == [1.0]
+
+def test_convert_crosses_through_the_reference_currency():
+    table = _table()
+    dates = [D(2024, 3, 1), D(2024, 3, 4), D(2024, 3, 5)]
+    assert table.convert(dates, ["USD", "BRL", "USD"], [10, 12, 10], "BRL") == [50.0, 12, 60.0]
+    assert table.convert(dates[:1], ["EUR"], [10], "USD") == [pytest.approx(11.0)]
+
+def test_missing_rate_raises():
+    table = _table()
+    with pytest.raises(FxRateMissing, match="on or before 2024-02-29"):
+        table.rates("USD", [D(2024, 2, 29).toordinal(), D(2024, 3, 1).toordinal()])
+    with pytest.raises(FxRateMissing, match="No FX rates for currency JPY"):
+        table.convert([D(2024, 3, 1)], ["JPY"], [10], "BRL")
+
+def test_table_version_follows_content():
+    assert _table().version == FxTable(reversed(RATES), "BRL").version
+    assert _table().version != FxTable([(D(2024, 3, 1), "USD", 5.1)], "BRL").version
+
+# ===== Relatórios convertidos pela API =====
+
+def _monthly(client, user, base: str):
+    return client.get(
+        "/expenses/summary/monthly", params={"year": 2024, "base_currency": base}, headers=user["headers"]
+    )
+
+def test_summary_converts_with_previous_rate_and_rejects_dates_before_the_first(client, user):
+    # XTS é o código ISO reservado para testes: nenhuma outra suíte carrega cotações dele
+    with get_session() as db:
+        fx.load(db, [
+            {"date": D(2024, 3, 1), "currency": "XTS", "rate": 5.0},
+            {"date": D(2024, 3, 5), "currency": "XTS", "rate": 6.0},
+        ])
+    for amount, day in ((10, "2024-03-01"), (1, "2024-03-04"), (2, "2024-03-05")):
+        payload = {"amount": amount, "currency": "XTS", "date": day, "status": "PAID"}
+        assert client.post("/expenses", json=payload, headers=user["headers"]).status_code == 201
+
+    r = _monthly(client, user, "brl")  # base_currency não diferencia maiúsculas
+    assert r.status_code == 200, r.text
+    assert r.json() == [{"year": 2024, "month": 3, "currency": "BRL", "total_amount": 10 * 5.0 + 5.0 + 2 * 6.0}]
+    assert _monthly(client, user, "BRL").json() == r.json()
+
+    payload = {"amount": 1, "currency": "XTS", "date": "2024-02-29", "status": "PAID"}
+    assert client.post("/expenses", json=payload, headers=user["headers"]).status_code == 201
+    r = _monthly(client, user, "Brl")
+    assert r.status_code == 422 and "on or before 2024-02-29" in r.json()["detail"], r.text
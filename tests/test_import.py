@@ -0,0 +1,96 @@
+import json
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.routers import expenses
+
+def _import(client, user, name: str, body: str, content_type: str = "text/plain"):
+    r = client.post("/expenses/import", files={"file": (name, body.encode(), content_type)}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return r.json()
+
+def _listed(client, user) -> list:
+    r = client.get("/expenses", params={"size": 100, "start": "2000-01-01"}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return sorted((e["description"], e["amount"], e["category_id"]) for e in r.json())
+
+def _errors(report: dict) -> dict:
+    return {e["row"]: e["error"] for e in report["errors"]}
+
+def test_csv_reports_rejected_rows_and_keeps_the_rest(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    r = client.post("/categories", json={"name": "Mercado"}, headers=user["headers"])
+    food = r.json()["id"]
+    body = (
+        "date,amount,description,category,status\n"
+        "2025-03-01,10.5,feira,Mercado,PAID\n"       # linha 2
+        "2025-03-02,abc,inválido,,\n"                 # 3: valor não numérico
+        "2025-03-03,7,desconhecida,Lazer,\n"          # 4: categoria inexistente
+        "2025-03-04,3,sem categoria,,\n"              # 5
+        "não-é-data,1,data ruim,,\n"                  # 6
+        "2025-03-05,20,último lote,Mercado,PAID\n"    # 7: mesmo lote da linha 6
+    )
+    report = _import(client, user, "extrato.csv", body)
+    assert (report["inserted"], report["failed"]) == (3, 3), report
+    errors = _errors(report)
+    assert sorted(errors) == [3, 4, 6]
+    assert errors[3].startswith("amount:") and errors[6].startswith("date:")
+    assert errors[4] == "Unknown category: Lazer"
+    assert _listed(client, user) == [("feira", 10.5, food), ("sem categoria", 3.0, None), ("último lote", 20.0, food)]
+
+def test_ndjson_parse_errors_keep_line_numbers(client, user):
+    lines = [
+        json.dumps({"amount": 5, "date": "2025-03-01", "description": "a"}),
+        "",
+        "{quebrado",
+        json.dumps([1, 2]),
+        json.dumps({"amount": 6, "date": "2025-03-02", "description": "b"}),
+    ]
+    report = _import(client, user, "dados.jsonl", "\n".join(lines) + "\n")
+    assert report["inserted"] == 2
+    errors = _errors(report)
+    assert sorted(errors) == [3, 4] and errors[3].startswith("Invalid JSON") and errors[4] == "Expected a JSON object"
+    assert [d for d, _, _ in _listed(client, user)] == ["a", "b"]
+
+def test_unknown_format_is_rejected(client, user):
+    files = {"file": ("extrato.xlsx", b"x", "application/octet-stream")}
+    r = client.post("/expenses/import", files=files, headers=user["headers"])
+    assert r.status_code == 400, r.text
+    files = {"file": ("extrato.txt", b"date,amount\n2025-03-01,1\n", "text/plain")}
+    assert client.post("/expenses/import?format=csv", files=files, headers=user["headers"]).status_code == 200
+
+def test_failed_batch_is_retried_row_by_row(client, user, monkeypatch):
+    # Lote rejeitado pelo banco: as linhas boas do mesmo lote são gravadas uma a uma, a ruim vira erro
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 3)
+    original = expenses._insert_rows
+
+    def insert_rows(db, rows):
+        if any(row["description"] == "viola constraint" for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("CHECK constraint failed"))
+        original(db, rows)
+
+    monkeypatch.setattr(expenses, "_insert_rows", insert_rows)
+    body = "".join(
+        json.dumps({"amount": i + 1, "date": "2025-05-10", "status": "PAID", "description": d}) + "\n"
+        for i, d in enumerate(["x", "viola constraint", "y", "z"])
+    )
+    report = _import(client, user, "dados.ndjson", body)
+    assert report["inserted"] == 3 and _errors(report) == {2: "CHECK constraint failed"}, report
+    assert [d for d, _, _ in _listed(client, user)] == ["x", "y", "z"]
+
+def test_import_updates_rollup_budgets_and_version(client, user):
+    budget = client.post(
+        "/budgets", json={"year": 2025, "month": 5, "currency": "BRL", "limit_amount": 100}, headers=user["headers"]
+    ).json()
+    tag = client.get("/expenses", headers=user["headers"]).headers["ETag"]
+    body = "".join(
+        json.dumps({"amount": a, "date": d, "status": "PAID"}) + "\n"
+        for a, d in ((30, "2025-05-02"), (15, "2025-05-20"), (8, "2025-06-01"))
+    )
+    assert _import(client, user, "dados.ndjson", body)["inserted"] == 3
+
+    monthly = client.get("/expenses/summary/monthly", params={"year": 2025}, headers=user["headers"]).json()
+    assert [(m["month"], m["total_amount"]) for m in monthly] == [(5, 45.0), (6, 8.0)]
+    status = client.get("/budgets/status", params={"year": 2025, "month": 5}, headers=user["headers"]).json()
+    assert [(b["id"], b["spent"]) for b in status] == [(budget["id"], 45.0)]
+    r = client.get("/expenses", headers={**user["headers"], "If-None-Match": tag})
+    assert r.status_code == 200 and r.headers["ETag"] != tag
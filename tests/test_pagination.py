@@ -0,0 +1,74 @@
+import statistics
+import time
+from sqlalchemy import select, text
+from app.core.pagination import encode_cursor
+from app.db.engine import engine
+from app.db.models import Expense
+from app.routers.expenses import ExpenseFilters, list_statement
+from conftest import seed_expenses
+
+SIZE = 50
+NO_FILTERS = ExpenseFilters(None, None, None, None, None, None)
+
+def _row_at(user_id: int, fraction: float):
+    """(date, id) da despesa na posição `fraction` da ordem da listagem (date DESC, id DESC)."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(Expense.date, Expense.id).where(Expense.user_id == user_id)
+            .order_by(Expense.date.desc(), Expense.id.desc())
+        ).all()
+    return rows[int(len(rows) * fraction)]
+
+def _median_ms(stmt, runs: int = 21) -> float:
+    samples = []
+    with engine.connect() as conn:
+        for _ in range(runs):
+            started = time.perf_counter()
+            conn.execute(stmt).all()
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def _deep_cursor_page(user_id: int):
+    # Mesma consulta de GET /expenses?cursor=..., a 90% do histórico do usuário
+    return list_statement(NO_FILTERS, user_id, 1, SIZE, encode_cursor(*_row_at(user_id, 0.9)), None, "sqlite")
+
+def test_cursor_walks_every_expense_once(client, user):
+    seed_expenses(user["id"], 537, days=90)
+    seen, cursor = [], None
+    while True:
+        params = {"size": SIZE, "start": "2000-01-01", **({"cursor": cursor} if cursor else {})}
+        r = client.get("/expenses", params=params, headers=user["headers"])
+        assert r.status_code == 200
+        seen += [(e["date"], e["id"]) for e in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 537
+    assert seen == sorted(seen, reverse=True)
+
+def test_cursor_matches_page_with_filters(client, user):
+    category_ids = seed_expenses(user["id"], 2000, days=365)
+    filters = {"category_id": category_ids[0], "status": "PAID", "min": 50, "max": 400, "start": "2000-01-01"}
+    first = client.get("/expenses", params={**filters, "size": SIZE}, headers=user["headers"])
+    by_page = client.get("/expenses", params={**filters, "size": SIZE, "page": 2}, headers=user["headers"]).json()
+    by_cursor = client.get(
+        "/expenses", params={**filters, "size": SIZE, "cursor": first.headers["X-Next-Cursor"]}, headers=user["headers"]
+    ).json()
+    assert by_cursor == by_page
+    assert all(e["category_id"] == category_ids[0] and e["status"] == "PAID" and 50 <= e["amount"] <= 400
+               for e in by_cursor)
+
+def test_deep_page_latency_stays_flat_as_table_grows(user):
+    # Com 2 mil e com 40 mil despesas: o seek pelo cursor não depende de quantas linhas ficam antes dele
+    # (com OFFSET, o banco percorre e descarta todas elas e o custo cresce junto com o histórico)
+    seed_expenses(user["id"], 2000, seed=1)
+    small = _median_ms(_deep_cursor_page(user["id"]))
+    seed_expenses(user["id"], 38000, seed=2)
+    stmt = _deep_cursor_page(user["id"])
+    large = _median_ms(stmt)
+    assert large < 3 * small + 0.5, f"deep cursor page: {small:.2f}ms with 2k rows, {large:.2f}ms with 40k rows"
+
+    compiled = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + compiled)))
+    assert "USING INDEX idx_expenses_user_date (user_id=? AND date<?)" in plan, plan
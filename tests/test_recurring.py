@@ -0,0 +1,63 @@
+import datetime as dt
+from sqlalchemy import update
+from app.db import recurring
+from app.db.engine import get_session
+from app.db.models import RecurringExpense
+
+def _schedule(client, user, **fields) -> dict:
+    payload = {"amount": 100, "description": "Notebook", **fields}
+    r = client.post("/recurring-expenses", json=payload, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    return r.json()
+
+def _materialize(today: str) -> int:
+    with get_session() as db:
+        return recurring.materialize_due(db, dt.date.fromisoformat(today))
+
+def _generated(client, user) -> list:
+    """Despesas do usuário (cada teste cadastra uma única recorrência e nenhuma outra despesa)."""
+    r = client.get("/expenses", params={"size": 200, "start": "2000-01-01"}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return sorted((e["date"], e["description"], e["status"]) for e in r.json())
+
+def test_month_end_is_clamped_without_drifting():
+    assert recurring.add_months(dt.date(2024, 1, 31), 1) == dt.date(2024, 2, 29)
+    assert recurring.add_months(dt.date(2025, 1, 31), 1) == dt.date(2025, 2, 28)
+    assert recurring.add_months(dt.date(2024, 11, 30), 3) == dt.date(2025, 2, 28)
+    # Cada ocorrência sai da data inicial: depois de fevereiro, volta ao dia 31
+    dates = [recurring.occurrence_date("MONTHLY", dt.date(2024, 1, 31), None, None, n) for n in range(4)]
+    assert dates == [dt.date(2024, 1, 31), dt.date(2024, 2, 29), dt.date(2024, 3, 31), dt.date(2024, 4, 30)]
+    assert recurring.occurrence_date("MONTHLY", dt.date(2024, 1, 31), dt.date(2024, 3, 30), None, 2) is None
+    assert recurring.occurrence_date("WEEKLY", dt.date(2024, 2, 26), None, None, 1) == dt.date(2024, 3, 4)
+
+def test_installments_end_after_the_last_one(client, user):
+    schedule = _schedule(client, user, frequency="INSTALLMENTS", installments=3, start_date="2024-01-31")
+    assert recurring.occurrence_date("INSTALLMENTS", dt.date(2024, 1, 31), None, 3, 3) is None
+    _materialize("2024-12-31")
+    assert _generated(client, user) == [
+        ("2024-01-31", "Notebook (1/3)", "PLANNED"),
+        ("2024-02-29", "Notebook (2/3)", "PLANNED"),
+        ("2024-03-31", "Notebook (3/3)", "PLANNED"),
+    ]
+    r = client.get(f"/recurring-expenses/{schedule['id']}", headers=user["headers"])
+    assert r.status_code == 200 and r.json()["occurrences_created"] == 3 and r.json()["next_date"] is None, r.text
+
+def test_materialize_is_idempotent(client, user):
+    schedule = _schedule(client, user, frequency="MONTHLY", start_date="2023-05-31", end_date="2023-08-31")
+    _materialize("2023-07-15")
+    assert [d for d, _, _ in _generated(client, user)] == ["2023-05-31", "2023-06-30"]
+    # Uma segunda execução com a mesma data não cria nada
+    assert _materialize("2023-07-15") == 0
+    # Instância atrasada, com o estado de antes do lote: a chave única (recurring_id, occurrence) barra as
+    # duplicatas e só a ocorrência nova entra
+    with get_session() as db:
+        db.execute(
+            update(RecurringExpense).where(RecurringExpense.id == schedule["id"])
+            .values(next_occurrence=0, next_date=dt.date(2023, 5, 31))
+        )
+        db.commit()
+    _materialize("2023-12-31")
+    assert [d for d, _, _ in _generated(client, user)] == [
+        "2023-05-31", "2023-06-30", "2023-07-31", "2023-08-31",
+    ]
+    assert _materialize("2023-12-31") == 0
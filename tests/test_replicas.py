@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import insert, text
+from sqlmodel import SQLModel
+from app.db import replicas
+from app.db.models import Category, User
+
+def _names(client, user) -> list:
+    r = client.get("/categories", headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return [c["name"] for c in r.json()]
+
+@pytest.fixture
+def replica_set(data_dir, user, monkeypatch):
+    """Réplica num segundo arquivo SQLite, com uma categoria do usuário que o primário não tem."""
+    path = data_dir / f"replica-{user['id']}.db"
+    replica_set = replicas.ReplicaSet([f"sqlite:///{path}"], "round_robin", 0)
+    engine = replica_set.replicas[0].engine
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=user["id"], email=user["email"], password_hash="x"))
+        conn.execute(insert(Category).values(user_id=user["id"], name="replica-only"))
+    monkeypatch.setattr(replicas, "replica_set", replica_set)
+    yield replica_set
+    engine.dispose()
+
+def test_reads_go_to_replica(client, user, replica_set):
+    assert _names(client, user) == ["replica-only"]
+
+def test_reads_stick_to_primary_after_a_write(client, user, replica_set, monkeypatch):
+    r = client.post("/categories", json={"name": "primary-only"}, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    # Dentro da janela de read-your-writes a leitura vê a escrita (primário)...
+    assert _names(client, user) == ["primary-only"]
+    # ...e, encerrada a janela, volta para a réplica
+    monkeypatch.setattr(replicas.recent_writers, "_until", {})
+    assert _names(client, user) == ["replica-only"]
+
+def test_unhealthy_replica_fails_over_to_primary(client, user, replica_set):
+    engine = replica_set.replicas[0].engine
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE expenses"))
+    replica_set.check_health()
+    assert not replica_set.replicas[0].healthy
+    assert replica_set.pick() is None
+    assert _names(client, user) == []
+
+    SQLModel.metadata.create_all(engine)
+    replica_set.check_health()
+    assert replica_set.replicas[0].healthy
+    assert _names(client, user) == ["replica-only"]
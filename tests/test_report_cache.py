@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import update
+from app.core.cache import CacheBackend, MemoryLRUBackend, ReportCache, report_cache
+from app.db import versions
+from app.db.engine import get_session
+from app.db.models import UserVersion
+
+def _monthly(client, user) -> list:
+    r = client.get("/expenses/summary/monthly", params={"year": 2025}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return r.json()
+
+def _create(client, user, amount: float) -> None:
+    payload = {"amount": amount, "date": "2025-02-10", "status": "PAID"}
+    assert client.post("/expenses", json=payload, headers=user["headers"]).status_code == 201
+
+def test_cache_key_follows_stored_version(client, user):
+    _create(client, user, 10)
+    first = _monthly(client, user)
+    hits = report_cache.hits
+    assert _monthly(client, user) == first
+    assert report_cache.hits == hits + 1
+
+    # Uma escrita sobe a versão em user_versions: a entrada anterior não é mais lida
+    _create(client, user, 5)
+    assert _monthly(client, user)[0]["total_amount"] == first[0]["total_amount"] + 5
+
+def test_version_changed_elsewhere_invalidates(client, user):
+    """Mudança de versão feita por outro processo (outra instância, `shards move`): nenhum estado local a avisar."""
+    _create(client, user, 10)
+    _monthly(client, user)
+    with get_session() as db:
+        before = versions.current(db, user["id"])
+        db.execute(update(UserVersion).where(UserVersion.user_id == user["id"]).values(version=before + 1))
+        db.commit()
+    misses = report_cache.misses
+    _monthly(client, user)
+    assert report_cache.misses == misses + 1
+
+def test_backend_must_implement_get_and_set():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_counters_are_exact_under_concurrent_reads():
+    cache = ReportCache(MemoryLRUBackend(max_entries=10, max_bytes=10000), ttl=60)
+    cache.set("present", {"total": 1})
+
+    def read(n: int) -> None:
+        for _ in range(2000):
+            cache.get("present" if n % 2 else "absent")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(read, range(8)))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (8000, 8000, 0.5)
@@ -0,0 +1,63 @@
+import datetime as dt
+import re
+import pytest
+from sqlalchemy import text
+from app.db.engine import engine
+from app.routers.expenses import build_report, by_category_report, monthly_totals_report
+
+# Varredura completa de uma tabela (a subquery do UNION com o arquivo, `expenses_all`, não conta)
+FULL_SCAN = re.compile(r"\bSCAN (expenses|expenses_archive|categories)\b(?!_)")
+
+def plan(statement) -> list:
+    compiled = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + compiled))]
+
+def searches(steps: list, table: str) -> list:
+    return [s for s in steps if s.startswith(f"SEARCH {table} USING")]
+
+# (parâmetros de GET /expenses/summary, restrição de data esperada no índice)
+SUMMARIES = [
+    (dict(group_by=["day"], year=2024), "date>? AND date<?"),
+    (dict(group_by=["week", "currency"], start=dt.date(2024, 1, 10)), "date>?"),
+    (dict(group_by=["year"], start=dt.date(2024, 3, 5), end=dt.date(2024, 9, 30)), "date>? AND date<?"),
+    (dict(group_by=["category"], start=dt.date(2024, 1, 1), order_by_total=True), "date>?"),
+    (dict(group_by=["status"], status="PAID", start=dt.date(2024, 1, 1), end=dt.date(2024, 1, 31)), "date>? AND date<?"),
+    (dict(group_by=["payment_method", "status"]), None),
+    (dict(group_by=["category"], category_id=3), None),
+]
+
+@pytest.mark.parametrize("include_archive", [False, True], ids=["hot", "with_archive"])
+@pytest.mark.parametrize("params,date_range", SUMMARIES)
+def test_summary_plans_use_user_indexes(params, date_range, include_archive):
+    report = build_report(user_id=1, **params)
+    assert not report.uses_rollup
+    steps = plan((report.with_archive() if include_archive else report).statement)
+    assert not any(FULL_SCAN.search(s) for s in steps), steps
+    tables = ["expenses"] + (["expenses_archive"] if include_archive else [])
+    for table in tables:
+        found = searches(steps, table)
+        assert len(found) == 1 and "INDEX idx_expenses_" in found[0] and "(user_id=?" in found[0], steps
+        if date_range:
+            # Intervalo semiaberto direto em `date`: o índice (user_id, date) delimita as linhas lidas
+            assert f"user_id=? AND {date_range})" in found[0], steps
+    if "category" in params["group_by"]:
+        assert any(s.startswith("SEARCH categories USING INTEGER PRIMARY KEY") for s in steps), steps
+
+def test_monthly_totals_plan_reads_rollup_by_user_and_year():
+    steps = plan(monthly_totals_report(1, 2024).statement)
+    assert len(steps) == 1 and steps[0].startswith("SEARCH expense_monthly_rollups USING"), steps
+    assert "(user_id=? AND year>? AND year<?)" in steps[0], steps
+
+def test_by_category_plan_joins_expenses_once():
+    steps = plan(by_category_report(1, dt.date(2024, 1, 1), dt.date(2024, 12, 31)).statement)
+    assert len(searches(steps, "expenses")) == 1, steps
+    assert "user_id=? AND date>? AND date<?)" in searches(steps, "expenses")[0], steps
+    assert not any(FULL_SCAN.search(s) for s in steps), steps
+
+def test_all_time_by_category_reads_only_the_category_index():
+    steps = plan(by_category_report(1, None, None).statement)
+    found = searches(steps, "expenses")
+    assert len(found) == 1 and "COVERING INDEX idx_expenses_user_category (user_id=?)" in found[0], steps
+    # categories é lida por grupo (depois da agregação), não por despesa
+    assert steps.index(found[0]) < next(i for i, s in enumerate(steps) if s.startswith("SEARCH categories")), steps
@@ -0,0 +1,86 @@
+import datetime as dt
+import json
+import random
+import pytest
+from app.db import rollups
+from app.db.engine import get_session
+
+STATUSES = ("PLANNED", "PAID", "CANCELLED")
+CURRENCIES = ("BRL", "USD", "EUR")
+
+def _random_date(rng: random.Random) -> str:
+    # Poucos meses: as operações caem nas mesmas chaves do rollup e também as trocam de mês
+    return (dt.date(2025, 1, 1) + dt.timedelta(days=rng.randrange(120))).isoformat()
+
+def _random_fields(rng: random.Random) -> dict:
+    return {
+        "amount": round(rng.uniform(0.01, 900), 2),
+        "currency": rng.choice(CURRENCIES),
+        "date": _random_date(rng),
+        "status": rng.choice(STATUSES),
+    }
+
+def _random_filters(rng: random.Random) -> dict:
+    start = dt.date(2025, 1, 1) + dt.timedelta(days=rng.randrange(120))
+    filters = {"start": start.isoformat(), "end": (start + dt.timedelta(days=rng.randrange(1, 40))).isoformat()}
+    if rng.random() < 0.5:
+        filters["status"] = rng.choice(STATUSES)
+    return filters
+
+def _mismatches(user_id: int) -> list:
+    with get_session() as db:
+        return list(rollups.check(db, user_id))
+
+@pytest.mark.parametrize("seed", range(4))
+def test_rollup_matches_raw_aggregate_after_random_writes(client, user, seed):
+    """Sequência aleatória de criações, edições, exclusões, lotes e importações: depois de cada operação,
+    o rollup confere com o GROUP BY sobre as despesas."""
+    rng = random.Random(seed)
+    headers = user["headers"]
+    ids = []
+
+    def create():
+        r = client.post("/expenses", json=_random_fields(rng), headers=headers)
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["id"])
+
+    def update():
+        changes = {k: v for k, v in _random_fields(rng).items() if rng.random() < 0.6}
+        r = client.put(f"/expenses/{rng.choice(ids)}", json=changes or {"amount": 1.0}, headers=headers)
+        assert r.status_code == 200, r.text
+
+    def remove():
+        expense_id = ids.pop(rng.randrange(len(ids)))
+        assert client.delete(f"/expenses/{expense_id}", headers=headers).status_code == 204
+
+    def batch_update():
+        changes = {k: v for k, v in _random_fields(rng).items() if rng.random() < 0.5} or {"status": "PAID"}
+        selector = (
+            {"ids": rng.sample(ids, min(len(ids), rng.randint(1, 5)))} if rng.random() < 0.5
+            else {"filters": _random_filters(rng)}
+        )
+        r = client.patch("/expenses/batch", json={**selector, "changes": changes}, headers=headers)
+        assert r.status_code == 200, r.text
+
+    def batch_delete():
+        r = client.post("/expenses/batch-delete", json={"filters": _random_filters(rng)}, headers=headers)
+        assert r.status_code == 200, r.text
+        listed = client.get("/expenses", params={"size": 200, "start": "2000-01-01"}, headers=headers).json()
+        ids[:] = [e["id"] for e in listed]
+
+    def import_rows():
+        lines = "".join(json.dumps(_random_fields(rng)) + "\n" for _ in range(rng.randint(1, 8)))
+        files = {"file": ("expenses.ndjson", lines.encode(), "application/x-ndjson")}
+        r = client.post("/expenses/import", files=files, headers=headers)
+        assert r.status_code == 200 and r.json()["failed"] == 0, r.text
+        listed = client.get("/expenses", params={"size": 200, "start": "2000-01-01"}, headers=headers).json()
+        ids[:] = [e["id"] for e in listed]
+
+    for _ in range(10):
+        create()
+    operations = (create, update, remove, batch_update, batch_delete, import_rows)
+    weights = (4, 4, 2, 2, 1, 1)
+    for step in range(50):
+        operation = rng.choices(operations, weights)[0] if len(ids) > 5 else create
+        operation()
+        assert _mismatches(user["id"]) == [], f"seed {seed}, step {step}: rollup diverged after {operation.__name__}"
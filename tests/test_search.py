@@ -0,0 +1,46 @@
+from app.db import search
+from app.db.engine import get_session
+
+def _create(client, user, description: str) -> int:
+    payload = {"amount": 10, "description": description, "date": "2025-03-01"}
+    r = client.post("/expenses", json=payload, headers=user["headers"])
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+def _search(client, user, q: str) -> list:
+    r = client.get("/expenses", params={"q": q, "size": 50}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    return [e["id"] for e in r.json()]
+
+def test_search_returns_only_own_expenses(client, user, other_user):
+    mine = {_create(client, user, "Mercado do bairro"), _create(client, user, "Mercadinho da esquina")}
+    for _ in range(3):
+        _create(client, other_user, "Mercado do bairro")
+    _create(client, user, "Padaria")
+    assert set(_search(client, user, "merc")) == mine
+    assert len(_search(client, other_user, "merc")) == 3
+
+def test_search_index_follows_updates_and_deletes(client, user):
+    expense_id = _create(client, user, "Livraria centro")
+    r = client.put(f"/expenses/{expense_id}", json={"description": "Quitanda da esquina"}, headers=user["headers"])
+    assert r.status_code == 200, r.text
+    assert _search(client, user, "quitanda") == [expense_id]
+    assert _search(client, user, "livraria") == []
+    assert client.delete(f"/expenses/{expense_id}", headers=user["headers"]).status_code == 204
+    assert _search(client, user, "quitanda") == []
+
+def test_rebuild_keeps_results(client, user):
+    expense_id = _create(client, user, "Padaria nova")
+    with get_session() as db:
+        search.rebuild(db)
+    assert _search(client, user, "padaria nova") == [expense_id]
+
+def test_dialect_without_index_falls_back_to_scan(client, user, other_user, monkeypatch):
+    # Sem entrada em _HITS_SQL, o SQLite passa pelo mesmo caminho de um dialeto sem índice textual
+    monkeypatch.delitem(search._HITS_SQL, "sqlite")
+    mine = {_create(client, user, "Farmácia 24h"), _create(client, user, "farmacia_popular centro")}
+    _create(client, other_user, "Farmácia 24h")
+    _create(client, user, "Padaria")
+    assert set(_search(client, user, "farmácia")) == {min(mine)}
+    assert set(_search(client, user, "farmacia_popular")) == {max(mine)}
+    assert _search(client, user, "padaria farmácia") == []
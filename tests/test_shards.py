@@ -0,0 +1,268 @@
+"""Sharding com três arquivos SQLite (shard 0 = DATABASE_URL, shards 1 e 2 = DATABASE_SHARD_URLS).
+
+O roteador é montado na importação de `app` a partir de Settings, então cada cenário roda num processo próprio
+(`python -m tests.test_shards <cenário>`) com o ambiente dos shards; o teste só confere o código de saída.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+SHARDS = 3
+
+@pytest.mark.parametrize("scenario", ["placement", "directory", "move", "abort"])
+def test_sharding(scenario, tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path}/shard0.db",
+        "DATABASE_SHARD_URLS": json.dumps([f"sqlite:///{tmp_path}/shard{i}.db" for i in range(1, SHARDS)]),
+        "SHARD_DIRECTORY_TTL_SECONDS": "60",
+    }
+    result = subprocess.run(
+        [sys.executable, "-m", "tests.test_shards", scenario],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+def test_directory_entries_expire_and_evict():
+    from app.db.shards import HOME, Placement, ShardDirectory
+
+    directory = ShardDirectory(ttl=0.05, max_entries=2)
+    assert directory.put(1, None) == HOME
+    assert directory.put(2, (1, 2, None)) == Placement(1, move_to=2)
+    assert directory.get(2).frozen
+    directory.put(3, (2, None, None))
+    assert directory.get(1) is None  # LRU: a entrada mais antiga saiu
+    time.sleep(0.06)
+    assert directory.get(3) is None
+
+# ===== Cenários (processo com DATABASE_SHARD_URLS) =====
+
+PASSWORD = "test-password"
+
+def _client():
+    from fastapi.testclient import TestClient
+    from sqlmodel import SQLModel
+    from app.db.shards import shard_router
+    from app.main import app
+
+    for shard in shard_router.shards:
+        SQLModel.metadata.create_all(shard.engine)
+    return TestClient(app)
+
+def _register(client, email: str) -> dict:
+    assert client.post("/auth/register", json={"email": email, "password": PASSWORD}).status_code == 201
+    token = client.post("/auth/login", data={"username": email, "password": PASSWORD}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    return {"id": client.get("/auth/me", headers=headers).json()["id"], "headers": headers}
+
+def _rows(shard_index: int, table: str, user_id: int) -> int:
+    from sqlalchemy import func, select
+    from sqlmodel import SQLModel
+    from app.db.shards import shard_router
+
+    t = SQLModel.metadata.tables[table]
+    column = t.c.id if table == "users" else t.c.user_id
+    with shard_router.shard(shard_index).engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(t).where(column == user_id)).scalar()
+
+def _entry(user_id: int):
+    from app.db.engine import get_session
+    from app.db.models import UserShard
+
+    with get_session() as db:
+        return db.get(UserShard, user_id)
+
+def _seed(client, user) -> None:
+    category_ids = []
+    for name in ("Mercado", "Transporte"):
+        r = client.post("/categories", json={"name": name}, headers=user["headers"])
+        assert r.status_code == 201, r.text
+        category_ids.append(r.json()["id"])
+    for i in range(10):
+        payload = {"amount": 10 + i, "description": f"despesa {i}", "date": f"2025-0{1 + i % 3}-1{i}",
+                   "category_id": category_ids[i % 3] if i % 3 < 2 else None, "status": "PAID"}
+        assert client.post("/expenses", json=payload, headers=user["headers"]).status_code == 201
+
+def _snapshot(client, user) -> tuple:
+    """Dados do usuário como a API os vê, com os ids (iguais em qualquer shard)."""
+    headers = user["headers"]
+    categories = sorted((c["id"], c["name"]) for c in client.get("/categories", headers=headers).json())
+    r = client.get("/expenses", params={"size": 100, "start": "2000-01-01"}, headers=headers)
+    assert r.status_code == 200, r.text
+    expenses = sorted(
+        (e["id"], e["description"], e["amount"], e["date"], e["category_id"]) for e in r.json()
+    )
+    monthly = client.get("/expenses/summary/monthly", params={"year": 2025}, headers=headers).json()
+    return categories, expenses, monthly
+
+def _ids_are_global() -> None:
+    """Com shards, nenhum id de despesa ou categoria se repete entre shards."""
+    from sqlalchemy import select
+    from sqlmodel import SQLModel
+    from app.db.shards import shard_router
+
+    for table in ("expenses", "categories"):
+        t = SQLModel.metadata.tables[table]
+        ids = []
+        for shard in shard_router.shards:
+            with shard.engine.connect() as conn:
+                ids += conn.execute(select(t.c.id)).scalars().all()
+        assert len(ids) == len(set(ids)), table
+
+class Interrupted(Exception):
+    pass
+
+def _expire_directory(user_id: int) -> None:
+    """O que a espera de `move` (wait, o dobro do TTL) garante nos outros processos; aqui com wait=0."""
+    from app.db.shards import shard_router
+
+    shard_router.directory.forget(user_id)
+
+def _interrupt_copy_after(batches: int):
+    """Faz a cópia de `move` falhar depois de `batches` lotes lidos da origem (processo que cai no meio)."""
+    from app.db import shards
+
+    original = shards._source_rows
+    calls = []
+
+    def source_rows(*args):
+        if len(calls) == batches:
+            raise Interrupted()
+        calls.append(args)
+        return original(*args)
+
+    shards._source_rows = source_rows
+    return lambda: setattr(shards, "_source_rows", original)
+
+def scenario_placement() -> None:
+    from app.db.shards import shard_router
+
+    client = _client()
+    users = [_register(client, f"placement{n}@example.com") for n in range(12)]
+    used = set()
+    for user in users:
+        index = shard_router.place(user["id"])
+        used.add(index)
+        assert _entry(user["id"]).shard == index
+        _seed(client, user)
+        # Dados só no shard do usuário; nos outros, nem o espelho de users
+        for shard in range(SHARDS):
+            assert _rows(shard, "expenses", user["id"]) == (10 if shard == index else 0)
+            assert _rows(shard, "categories", user["id"]) == (2 if shard == index else 0)
+            assert _rows(shard, "users", user["id"]) == (1 if shard in (0, index) else 0)
+        assert len(_snapshot(client, user)[1]) == 10
+    assert used == set(range(SHARDS)), used
+    _ids_are_global()
+
+def scenario_directory() -> None:
+    from app.db.engine import get_session
+    from app.db.models import UserShard
+    from app.db.shards import HOME, shard_router
+
+    client = _client()
+    user = _register(client, "directory@example.com")
+    placement = shard_router.locate(user["id"])
+    assert placement.shard == _entry(user["id"]).shard and not placement.frozen
+    # Usuário sem linha no diretório (anterior ao sharding) fica no shard 0
+    assert shard_router.locate(10 ** 6) == HOME
+    # A entrada em cache vale até o TTL: uma mudança no diretório só aparece depois de forget
+    with get_session() as db:
+        db.get(UserShard, user["id"]).move_to = (placement.shard + 1) % SHARDS
+        db.commit()
+    assert shard_router.locate(user["id"]) == placement
+    shard_router.directory.forget(user["id"])
+    assert shard_router.locate(user["id"]).frozen
+    # Congelado: leituras seguem, escritas recebem 503
+    assert client.get("/expenses", headers=user["headers"]).status_code == 200
+    r = client.post("/categories", json={"name": "Nova"}, headers=user["headers"])
+    assert r.status_code == 503 and r.headers["Retry-After"] == "60", r.text
+
+def scenario_move() -> None:
+    from app.db import shards
+
+    client = _client()
+    user = _register(client, "move@example.com")
+    _seed(client, user)
+    before = _snapshot(client, user)
+    expense_id = before[1][0][0]
+    read = client.get(f"/expenses/{expense_id}", headers=user["headers"])
+    assert read.status_code == 200, read.text
+    source = _entry(user["id"]).shard
+    target = (source + 1) % SHARDS
+    quiet = lambda line: None  # noqa: E731
+
+    # 1ª tentativa cai no meio da cópia das despesas: usuário congelado, cópia parcial no destino
+    restore = _interrupt_copy_after(5)  # categories (2 lotes), recorrências, orçamentos e 1 lote de despesas
+    try:
+        with pytest.raises(Interrupted):
+            shards.move_user(user["id"], target, batch_size=3, wait=0, out=quiet)
+    finally:
+        restore()
+    assert _entry(user["id"]).move_to == target
+    _expire_directory(user["id"])
+    assert _rows(target, "expenses", user["id"]) == 3
+    assert _snapshot(client, user) == before
+    assert client.post("/categories", json={"name": "Nova"}, headers=user["headers"]).status_code == 503
+
+    # 2ª tentativa retoma de onde parou: nenhuma linha duplicada no destino
+    shards.move_user(user["id"], target, batch_size=3, wait=0, out=quiet)
+    entry = _entry(user["id"])
+    assert (entry.shard, entry.move_to, entry.move_from) == (target, None, None)
+    assert _rows(target, "expenses", user["id"]) == 10 and _rows(target, "categories", user["id"]) == 2
+    assert _rows(source, "expenses", user["id"]) == 0 and _rows(source, "categories", user["id"]) == 0
+    assert _rows(source, "users", user["id"]) == (1 if source == 0 else 0)
+    assert _snapshot(client, user) == before
+    # Os ids e a versão do usuário vão junto: o id guardado e o ETag lido antes da movimentação seguem valendo
+    after = client.get(f"/expenses/{expense_id}", headers=user["headers"])
+    assert after.status_code == 200 and after.json() == read.json(), after.text
+    assert after.headers["ETag"] == read.headers["ETag"]
+    r = client.put(
+        f"/expenses/{expense_id}", json={"amount": 99},
+        headers={**user["headers"], "If-Match": read.headers["ETag"]},
+    )
+    assert r.status_code == 200 and r.json()["id"] == expense_id, r.text
+    _ids_are_global()
+    assert client.post("/categories", json={"name": "Nova"}, headers=user["headers"]).status_code == 201
+
+def scenario_abort() -> None:
+    from app.db import shards
+
+    client = _client()
+    user = _register(client, "abort@example.com")
+    _seed(client, user)
+    before = _snapshot(client, user)
+    source = _entry(user["id"]).shard
+    target = (source + 1) % SHARDS
+    quiet = lambda line: None  # noqa: E731
+
+    restore = _interrupt_copy_after(2)  # só as categorias
+    try:
+        with pytest.raises(Interrupted):
+            shards.move_user(user["id"], target, batch_size=3, wait=0, out=quiet)
+    finally:
+        restore()
+    assert _rows(target, "categories", user["id"]) == 2
+
+    shards.abort_move(user["id"], batch_size=3, out=quiet)
+    _expire_directory(user["id"])
+    entry = _entry(user["id"])
+    assert (entry.shard, entry.move_to, entry.move_from) == (source, None, None)
+    for table in ("expenses", "categories"):
+        assert _rows(target, table, user["id"]) == 0, table
+    assert _rows(target, "users", user["id"]) == (1 if target == 0 else 0)
+    assert _rows(source, "expenses", user["id"]) == 10
+    assert _snapshot(client, user) == before
+    assert client.post("/categories", json={"name": "Nova"}, headers=user["headers"]).status_code == 201
+
+    # Depois de desistir, a movimentação pode recomeçar do zero
+    shards.move_user(user["id"], target, batch_size=3, wait=0, out=quiet)
+    assert _entry(user["id"]).shard == target
+    assert _rows(target, "expenses", user["id"]) == 10
+
+if __name__ == "__main__":
+    globals()[f"scenario_{sys.argv[1]}"]()